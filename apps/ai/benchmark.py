@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+"""
+오프라인 벤치마크 스크립트
+
+test_performance.py / test_streaming.py / test_comparison.py는 실행 중인 서버와 실제 OpenAI 호출이 필요해
+결과가 흔들리고 비용이 들며 CI에서 돌릴 수 없습니다. 이 스크립트는 서버 없이 파이프라인 함수를 프로세스 안에서
+직접 호출하고, LLM은 지연 시간과 JSON 응답을 설정할 수 있는 가짜 채팅 모델로 바꿔서 실행합니다.
+
+- 픽스처: 생성한 이미지 / 스캔 PDF(이미지만, 빈 페이지와 중복 페이지 포함) / 텍스트 레이어 PDF
+- 가짜 LLM: 레시피 텍스트의 "이름: 재료" 줄을 메뉴 JSON으로 돌려주고, 번역은 원문에 표시만 붙여 돌려줌.
+  지연 시간은 (시드, 프롬프트)로 정해지므로 같은 설정이면 매번 같음
+- 시나리오: extract (텍스트 추출만), menus (/generate/menus 처리 전체), stream (/generate/menus/stream-parallel 이벤트)
+- 측정: 반복별 전체 시간, 단계별 시간 (요청 트레이스의 span 집계), 처리량 (페이지/초), 메모리 (최대 RSS)
+
+결과 캐시 / 번역 캐시 / 트레이스 파일은 실행마다 새 임시 디렉터리를 사용하므로 캐시 히트가 결과에 섞이지 않습니다.
+OCR(Tesseract)과 PDF 렌더링(pdftoppm)은 실제로 실행하므로 서버와 같은 환경이 필요합니다.
+
+사용 전 준비:
+    1. 가상환경 활성화:
+       source venv/bin/activate
+
+사용법:
+    python benchmark.py [옵션]
+
+예시:
+    python benchmark.py
+    python benchmark.py --scenario stream --pages 10 --concurrency 4
+    python benchmark.py --llm-latency 1.5 --llm-tokens-per-sec 60 --output .cache/benchmark/after.json
+    python benchmark.py --baseline .cache/benchmark/before.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import AsyncIterator, Dict, List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from PIL import Image, ImageDraw, ImageFont
+
+SCENARIOS = ["extract", "menus", "stream"]
+
+# 픽스처 메뉴 이름/재료 (Tesseract가 안정적으로 읽도록 영어만 사용)
+MENU_NAMES = [
+    "Americano", "Cafe Latte", "Vanilla Latte", "Caramel Macchiato", "Cappuccino", "Flat White",
+    "Cold Brew", "Hazelnut Latte", "Mocha", "Green Tea Latte", "Lemon Ade", "Grapefruit Ade",
+    "Peach Iced Tea", "Hot Chocolate", "Honey Black Tea", "Einspanner", "Affogato", "Dolce Latte",
+]
+INGREDIENTS = [
+    "espresso 2 shot", "water 200ml", "milk 250ml", "vanilla syrup 2P", "caramel sauce 30g",
+    "ice 150g", "whipped cream", "cocoa powder 20g", "green tea powder 15g", "lemon syrup 40ml",
+    "sparkling water 200ml", "peach syrup 30ml", "black tea bag", "honey 20g", "hazelnut syrup 2P",
+]
+
+FONT_CANDIDATES = [
+    "DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "Arial.ttf",
+]
+
+
+# --- 가짜 LLM ---
+class FakeChatModel(BaseChatModel):
+    """
+    ChatOpenAI 대신 쓰는 가짜 채팅 모델
+    프롬프트 종류(메뉴 추출 / 일괄 번역 / 단건 번역)를 보고 정해진 형식의 응답을 만들며,
+    지연 시간 = latency ± jitter (프롬프트별 고정) + 출력 토큰 수 / tokens_per_second
+    """
+
+    model_name: str = "fake-chat"
+    latency: float = 0.5
+    jitter: float = 0.0
+    tokens_per_second: float = 0.0  # 0이면 출력 길이와 무관하게 latency만 적용
+    seed: int = 42
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt, output = self._respond(messages)
+        time.sleep(self._first_token_delay(prompt) + self._output_delay(output))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=output))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt, output = self._respond(messages)
+        await asyncio.sleep(self._first_token_delay(prompt) + self._output_delay(output))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=output))])
+
+    async def _astream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        prompt, output = self._respond(messages)
+        await asyncio.sleep(self._first_token_delay(prompt))
+        # 토큰 4개(약 16자) 단위로 나눠 보냄
+        for i in range(0, len(output), 16):
+            piece = output[i:i + 16]
+            await asyncio.sleep(self._output_delay(piece))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+
+    # --- 내부 구현 ---
+    def _respond(self, messages: List[BaseMessage]) -> tuple[str, str]:
+        self.calls += 1
+        prompt = "\n".join(str(message.content) for message in messages)
+        return prompt, fake_completion(prompt)
+
+    def _first_token_delay(self, prompt: str) -> float:
+        digest = hashlib.sha256(f"{self.seed}:{self.model_name}:{prompt}".encode("utf-8")).digest()
+        rng = random.Random(digest)
+        return max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+
+    def _output_delay(self, output: str) -> float:
+        if self.tokens_per_second <= 0:
+            return 0.0
+        return max(1, len(output) // 4) / self.tokens_per_second
+
+
+def fake_completion(prompt: str) -> str:
+    """
+    프롬프트 종류에 맞는 가짜 응답 (openai_stub.py에서도 사용)
+    - 메뉴 추출: 레시피 텍스트의 '이름: 재료' 줄로 만든 {"menus": [...]} JSON
+    - 일괄 번역: 모든 id에 대해 {"translations": [...]} JSON
+    - 단건 번역: 원문에 표시만 붙인 텍스트
+    """
+    if "Items:\n" in prompt and '"translations"' in prompt:
+        items_json = prompt.split("Items:\n", 1)[1].split("\n\njson response:", 1)[0]
+        items = json.loads(items_json)
+        translations = [{"id": item["id"], "text": f"{item['text']} (번역)"} for item in items]
+        return json.dumps({"translations": translations}, ensure_ascii=False)
+
+    if "레시피 텍스트:\n---\n" in prompt:
+        recipe_text = prompt.split("레시피 텍스트:\n---\n", 1)[1].rsplit("\n---", 1)[0]
+        return json.dumps({"menus": menus_from_recipe_text(recipe_text)}, ensure_ascii=False, indent=2)
+
+    text = prompt.split("explanations:\n", 1)[-1]
+    return f"{text.strip()} (번역)"
+
+
+def menus_from_recipe_text(recipe_text: str) -> List[dict]:
+    """'이름: 재료' 형식의 줄을 메뉴로 변환 (중복 이름 제거)"""
+    menus = {}
+    for line in recipe_text.splitlines():
+        if ":" not in line:
+            continue
+        name, ingredients = (part.strip() for part in line.split(":", 1))
+        if sum(char.isalpha() for char in name) < 3 or name in menus:
+            continue
+        menus[name] = {"name": name, "ingredients": ingredients}
+    return list(menus.values())
+
+
+def install_fake_llm(main, args) -> None:
+    """src.main의 LLM 전역 변수를 가짜 모델로 교체 (체인은 호출할 때마다 만들어지므로 바로 적용됨)"""
+    options = dict(
+        latency=args.llm_latency,
+        jitter=args.llm_jitter,
+        tokens_per_second=args.llm_tokens_per_sec,
+        seed=args.seed,
+    )
+    main.llm = FakeChatModel(model_name="fake-menu", **options)
+    main.llm_translate = FakeChatModel(model_name="fake-translate", **options)
+    main.llm_translate_batch = main.llm_translate.bind(response_format={"type": "json_object"})
+
+
+# --- 픽스처 ---
+def load_font(size: int):
+    for candidate in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)  # Pillow 10.1+
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def menu_lines(rng: random.Random, count: int) -> List[str]:
+    names = rng.sample(MENU_NAMES, min(count, len(MENU_NAMES)))
+    return [f"{name}: {', '.join(rng.sample(INGREDIENTS, rng.randint(2, 3)))}" for name in names]
+
+
+def render_page(lines: List[str], width: int = 1240, height: int = 1754) -> Image.Image:
+    """A4 150dpi 크기의 흰 배경 페이지에 메뉴 줄을 그림"""
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    font = load_font(30)
+    y = 120
+    for line in lines:
+        draw.text((100, y), line, fill="black", font=font)
+        y += 60
+    return image
+
+
+def write_text_pdf(path: str, pages: List[List[str]]) -> None:
+    """텍스트 레이어가 있는 최소한의 PDF 작성 (Helvetica, 페이지당 content stream 하나)"""
+    def escape(text: str) -> str:
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects = {
+        1: "<< /Type /Catalog /Pages 2 0 R >>",
+        2: f"<< /Type /Pages /Kids [{' '.join(f'{page_id} 0 R' for page_id in page_ids)}] /Count {len(pages)} >>",
+        3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    for page_id, lines in zip(page_ids, pages):
+        content = "BT /F1 14 Tf 20 TL 72 770 Td " + " ".join(f"({escape(line)}) Tj T*" for line in lines) + " ET"
+        objects[page_id] = (
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        )
+        objects[page_id + 1] = f"<< /Length {len(content)} >>\nstream\n{content}\nendstream"
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(output)
+        output += f"{number} 0 obj\n{objects[number]}\nendobj\n".encode("latin-1")
+
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for number in sorted(objects):
+        output += f"{offsets[number]:010d} 00000 n \n".encode("latin-1")
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+
+    with open(path, "wb") as f:
+        f.write(output)
+
+
+def generate_fixtures(fixtures_dir: str, pages: int, menus_per_page: int, seed: int) -> List[dict]:
+    """
+    픽스처 생성 (같은 시드면 같은 파일)
+    반환: [{"name", "path", "content_type", "pages"}]
+    """
+    os.makedirs(fixtures_dir, exist_ok=True)
+    rng = random.Random(seed)
+    page_lines = [menu_lines(rng, menus_per_page) for _ in range(pages)]
+    fixtures = []
+
+    image_path = os.path.join(fixtures_dir, "menu_photo.jpg")
+    render_page(page_lines[0]).save(image_path, "JPEG", quality=90)
+    fixtures.append({"name": "image", "path": image_path, "content_type": "image/jpeg", "pages": 1})
+
+    # 스캔 PDF: 마지막 두 페이지를 빈 페이지 / 1페이지 중복으로 바꿔 트리아지 경로도 포함
+    scanned_pages = [render_page(lines) for lines in page_lines]
+    if pages >= 4:
+        scanned_pages[-2] = Image.new("RGB", scanned_pages[0].size, "white")
+        scanned_pages[-1] = scanned_pages[0].copy()
+    scanned_path = os.path.join(fixtures_dir, f"scanned_{pages}p.pdf")
+    scanned_pages[0].save(scanned_path, "PDF", save_all=True, append_images=scanned_pages[1:], resolution=150)
+    fixtures.append({"name": f"scanned_pdf_{pages}p", "path": scanned_path, "content_type": "application/pdf", "pages": pages})
+
+    digital_path = os.path.join(fixtures_dir, f"digital_{pages}p.pdf")
+    write_text_pdf(digital_path, page_lines)
+    fixtures.append({"name": f"digital_pdf_{pages}p", "path": digital_path, "content_type": "application/pdf", "pages": pages})
+
+    return fixtures
+
+
+# --- 메모리 측정 ---
+class RssSampler:
+    """백그라운드 스레드에서 현재 RSS를 주기적으로 읽어 최대값 기록 (/proc가 없으면 ru_maxrss 사용)"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.start_bytes = current_rss_bytes()
+        self.peak_bytes = self.start_bytes
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+
+
+def current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # macOS는 bytes, Linux는 KB 단위의 최대 RSS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+# --- 시나리오 실행 ---
+async def run_once(main, scenario: str, fixture: dict, upload, run_id: str) -> dict:
+    """시나리오 1회 실행 후 {"wall_ms", "first_event_ms", "menus", "request_id"} 반환 (요청 하나와 같은 컨텍스트로 실행)"""
+    main.set_request_id(run_id)
+    main.set_request_labels(f"benchmark.{scenario}", fixture["content_type"])
+    cache_key = f"benchmark-{run_id}"  # 실행마다 다른 키 → 결과 캐시 미스
+    first_event_ms = None
+    menus = 0
+
+    start = time.time()
+    with main.start_trace(f"benchmark.{scenario}", fixture=fixture["name"]):
+        if scenario == "extract":
+            page_texts = main.iter_page_texts(fixture["content_type"], upload)
+            await main.collect_page_texts(page_texts)
+        elif scenario == "menus":
+            page_results, _, _ = await main.generate_menus_for_upload(fixture["content_type"], upload, cache_key)
+            menus = sum(len(menu_response.menus) for menu_response in page_results)
+        else:
+            async for event in main.parallel_stream_events(fixture["content_type"], upload, cache_key, start):
+                data = json.loads(event[len("data: "):])
+                if data["type"] == "error":
+                    raise RuntimeError(data["message"])
+                if data["type"] == "progress":
+                    if first_event_ms is None:
+                        first_event_ms = (time.time() - start) * 1000
+                    menus += len(data.get("menus", []))
+    wall_ms = (time.time() - start) * 1000
+
+    return {"wall_ms": wall_ms, "first_event_ms": first_event_ms, "menus": menus, "request_id": run_id}
+
+
+async def run_scenario(main, args, scenario: str, fixture: dict, workdir: str) -> dict:
+    # 서버와 같이 파일 경로로 처리 (픽스처 파일은 지우지 않음)
+    upload = await main.open_upload(fixture["path"])
+
+    runs = []
+    total_iterations = args.warmup + args.iterations
+    with RssSampler() as rss:
+        measured_start = None
+        for iteration in range(total_iterations):
+            if iteration == args.warmup:
+                measured_start = time.time()
+                if args.tracemalloc:
+                    tracemalloc.start()
+
+            # 반복마다 번역 캐시를 새로 만들어 이전 반복의 번역이 히트하지 않게 함
+            main.translation_cache = main.TranslationCache(
+                db_path=os.path.join(workdir, f"translations-{scenario}-{fixture['name']}-{iteration}.sqlite3"),
+                max_memory_entries=50000,
+            )
+            # create_task가 컨텍스트를 복사하므로 동시 실행 간 request ID / 라벨이 섞이지 않음
+            tasks = [
+                asyncio.create_task(run_once(main, scenario, fixture, upload, f"{scenario}-{fixture['name']}-{iteration}-{copy}"))
+                for copy in range(args.concurrency)
+            ]
+            results = await asyncio.gather(*tasks)
+            if iteration >= args.warmup:
+                runs.extend(results)
+        measured_seconds = time.time() - measured_start
+
+        python_peak_bytes = None
+        if args.tracemalloc:
+            python_peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    # 요청 트레이스의 span을 이름별로 모아 단계별 시간 계산 (병렬 span은 겹치므로 합이 전체 시간보다 클 수 있음)
+    stage_durations: Dict[str, List[float]] = {}
+    for run in runs:
+        trace = main.trace_exporter.get(run["request_id"])
+        if trace is None:
+            continue
+        for span in trace["spans"]:
+            if span["parent_id"] is None or span["duration_ms"] is None:
+                continue
+            stage_durations.setdefault(span["name"], []).append(span["duration_ms"])
+
+    wall = [run["wall_ms"] for run in runs]
+    first_events = [run["first_event_ms"] for run in runs if run["first_event_ms"] is not None]
+    processed_pages = fixture["pages"] * len(runs)
+
+    return {
+        "scenario": scenario,
+        "fixture": fixture["name"],
+        "content_type": fixture["content_type"],
+        "pages": fixture["pages"],
+        "iterations": args.iterations,
+        "concurrency": args.concurrency,
+        "menus": runs[-1]["menus"] if runs else 0,
+        "wall_ms": summarize(wall),
+        "first_event_ms": summarize(first_events) if first_events else None,
+        "pages_per_sec": round(processed_pages / measured_seconds, 3) if measured_seconds > 0 else None,
+        "documents_per_sec": round(len(runs) / measured_seconds, 3) if measured_seconds > 0 else None,
+        "stages": {
+            name: {"count": len(durations), **summarize(durations)}
+            for name, durations in sorted(stage_durations.items())
+        },
+        "peak_rss_mb": round(rss.peak_bytes / 1024 / 1024, 1),
+        "rss_growth_mb": round((rss.peak_bytes - rss.start_bytes) / 1024 / 1024, 1),
+        "python_peak_mb": round(python_peak_bytes / 1024 / 1024, 1) if python_peak_bytes is not None else None,
+    }
+
+
+def summarize(values: List[float]) -> dict:
+    if not values:
+        return {"p50": None, "p95": None, "mean": None, "min": None, "max": None}
+    ordered = sorted(values)
+    return {
+        "p50": round(percentile(ordered, 50), 2),
+        "p95": round(percentile(ordered, 95), 2),
+        "mean": round(statistics.fmean(ordered), 2),
+        "min": round(ordered[0], 2),
+        "max": round(ordered[-1], 2),
+    }
+
+
+def percentile(ordered: List[float], percent: float) -> float:
+    """선형 보간 백분위수 (ordered는 정렬된 목록)"""
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * percent / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+# --- 출력 ---
+def print_header(title):
+    """섹션 헤더 출력"""
+    print("\n" + "=" * 60)
+    print(f"  {title}")
+    print("=" * 60)
+
+
+def print_result(result: dict) -> None:
+    print_header(f"{result['scenario']} / {result['fixture']} ({result['pages']}페이지, 동시 {result['concurrency']}개)")
+    wall = result["wall_ms"]
+    print(f"⏱️  전체 시간: p50 {wall['p50']:.0f}ms, p95 {wall['p95']:.0f}ms (min {wall['min']:.0f}, max {wall['max']:.0f})")
+    if result["first_event_ms"]:
+        print(f"⚡ 첫 페이지 결과까지: p50 {result['first_event_ms']['p50']:.0f}ms")
+    print(f"🚀 처리량: {result['pages_per_sec']} 페이지/초, {result['documents_per_sec']} 문서/초")
+    print(f"📋 메뉴: {result['menus']}개")
+    memory = f"💾 최대 RSS: {result['peak_rss_mb']}MB (+{result['rss_growth_mb']}MB)"
+    if result["python_peak_mb"] is not None:
+        memory += f", Python 힙 최대: {result['python_peak_mb']}MB"
+    print(memory)
+
+    if result["stages"]:
+        print(f"\n   {'단계':<32} {'횟수':>6} {'p50(ms)':>10} {'p95(ms)':>10}")
+        for name, stage in result["stages"].items():
+            print(f"   {name:<32} {stage['count']:>6} {stage['p50']:>10.1f} {stage['p95']:>10.1f}")
+
+
+def compare_with_baseline(results: List[dict], baseline_path: str, tolerance: float) -> bool:
+    """
+    기준 결과와 전체 시간 p50 / 처리량 비교
+    반환: 기준보다 tolerance(%) 이상 느려진 항목이 없으면 True
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(item["scenario"], item["fixture"]): item for item in json.load(f)["results"]}
+
+    print_header(f"기준 결과와 비교 ({baseline_path})")
+    ok = True
+    for result in results:
+        before = baseline.get((result["scenario"], result["fixture"]))
+        if before is None:
+            print(f"➖ {result['scenario']} / {result['fixture']}: 기준 결과 없음")
+            continue
+
+        before_ms, after_ms = before["wall_ms"]["p50"], result["wall_ms"]["p50"]
+        change = (after_ms - before_ms) / before_ms * 100 if before_ms else 0.0
+        regressed = change > tolerance
+        ok = ok and not regressed
+        icon = "❌" if regressed else ("✅" if change < -tolerance else "➖")
+        print(f"{icon} {result['scenario']} / {result['fixture']}: p50 {before_ms:.0f}ms → {after_ms:.0f}ms ({change:+.1f}%), "
+              f"처리량 {before['pages_per_sec']} → {result['pages_per_sec']} 페이지/초")
+        if before["menus"] != result["menus"]:
+            print(f"   ⚠️  메뉴 수가 다릅니다: {before['menus']} → {result['menus']}")
+    return ok
+
+
+# --- 진입점 ---
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="가짜 LLM으로 파이프라인을 프로세스 안에서 실행하는 오프라인 벤치마크")
+    parser.add_argument("--scenario", choices=SCENARIOS + ["all"], default="all")
+    parser.add_argument("--fixture", action="append", help="실행할 픽스처 이름 (여러 번 지정 가능, 기본값: 전체)")
+    parser.add_argument("--pages", type=int, default=6, help="PDF 픽스처 페이지 수")
+    parser.add_argument("--menus-per-page", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1, help="측정에서 제외할 초기 반복 수")
+    parser.add_argument("--concurrency", type=int, default=1, help="반복마다 동시에 처리할 문서 수")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="가짜 LLM 첫 토큰까지 지연 (초)")
+    parser.add_argument("--llm-jitter", type=float, default=0.1, help="지연 변동폭 (초, 프롬프트별로 고정)")
+    parser.add_argument("--llm-tokens-per-sec", type=float, default=0.0, help="출력 토큰 생성 속도 (0이면 무시)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fixtures-dir", default=".cache/benchmark/fixtures")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="기준 대비 허용 지연 증가율 (%%)")
+    parser.add_argument("--tracemalloc", action="store_true", help="Python 힙 최대 사용량도 측정 (실행이 느려짐)")
+    parser.add_argument("--verbose", action="store_true", help="서버 로그([PERF] 등) 출력")
+    return parser.parse_args()
+
+
+async def run_benchmark(main, args, fixtures: List[dict], workdir: str) -> List[dict]:
+    scenarios = SCENARIOS if args.scenario == "all" else [args.scenario]
+    results = []
+    for scenario in scenarios:
+        for fixture in fixtures:
+            print(f"▶️  {scenario} / {fixture['name']} 실행 중...")
+            result = await run_scenario(main, args, scenario, fixture, workdir)
+            print_result(result)
+            results.append(result)
+    return results
+
+
+def main_cli() -> int:
+    args = parse_args()
+
+    # src.main을 import하기 전에 캐시/트레이스 경로를 임시 디렉터리로 지정
+    workdir = tempfile.mkdtemp(prefix="recipflash-benchmark-")
+    os.environ["RESULT_CACHE_DIR"] = os.path.join(workdir, "results")
+    os.environ["TRANSLATION_CACHE_DB"] = os.path.join(workdir, "translations.sqlite3")
+    os.environ["JOB_STORE_DB"] = os.path.join(workdir, "jobs.sqlite3")
+    os.environ["JOB_UPLOAD_DIR"] = os.path.join(workdir, "job_uploads")
+    os.environ["TRACE_FILE"] = os.path.join(workdir, "traces.jsonl")
+    os.environ["LOG_LEVEL"] = "INFO" if args.verbose else "WARNING"
+    os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")  # ChatOpenAI 생성용 (호출하지 않음)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import src.main as main
+
+    install_fake_llm(main, args)
+
+    fixtures = generate_fixtures(args.fixtures_dir, args.pages, args.menus_per_page, args.seed)
+    if args.fixture:
+        fixtures = [fixture for fixture in fixtures if fixture["name"] in args.fixture]
+        if not fixtures:
+            print(f"❌ 픽스처를 찾을 수 없습니다: {', '.join(args.fixture)}")
+            return 1
+
+    print_header("오프라인 벤치마크")
+    print(f"📁 픽스처: {args.fixtures_dir} ({', '.join(fixture['name'] for fixture in fixtures)})")
+    print(f"🤖 가짜 LLM: 지연 {args.llm_latency}s ± {args.llm_jitter}s, 토큰 속도 {args.llm_tokens_per_sec or '무제한'}")
+    print(f"🔁 반복: {args.iterations}회 (워밍업 {args.warmup}회), 동시 {args.concurrency}개")
+
+    results = asyncio.run(run_benchmark(main, args, fixtures, workdir))
+
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        report = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.output}")
+
+    if args.baseline:
+        if not compare_with_baseline(results, args.baseline, args.tolerance):
+            print(f"\n❌ 기준 대비 {args.tolerance}% 이상 느려진 항목이 있습니다")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+동시 부하 테스트 스크립트
+
+test_comparison.py는 세 가지 모드를 클라이언트 하나로 한 번씩만 실행하고, test_performance.py는 페이지당 18초라는
+고정된 추정치와 비교합니다. 이 스크립트는 가상 클라이언트 N개가 동시에 /generate/menus, /generate/menus/stream,
+/generate/menus/stream-parallel에 요청을 보내고 다음을 기록합니다.
+
+- 첫 이벤트까지 시간 (SSE 첫 이벤트, /generate/menus는 응답 수신 시점), 첫 페이지 결과까지 시간, 전체 시간
+- p50 / p95 / p99, 오류율 (HTTP 오류, SSE error 이벤트, complete 없이 끊긴 스트림, 타임아웃), 처리량 (요청/초, 메뉴/초)
+
+결과를 JSON으로 저장하고, 저장된 기준 결과보다 p95가 허용 범위 이상 느려지거나 오류율이 늘면 종료 코드 1로 끝납니다.
+기본적으로 요청마다 파일 끝에 고유한 바이트를 붙여 결과 캐시 / 동일 요청 합치기를 우회합니다 (--allow-cache로 끔).
+
+사용 전 준비:
+    1. 가상환경 활성화:
+       source venv/bin/activate
+
+    2. 서버 실행 (다른 터미널, API 비용 없이 하려면 openai_stub.py와 함께):
+       OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=stub uvicorn src.main:app --port 8000
+
+사용법:
+    python load_test.py <파일경로> [<파일경로> ...] [옵션]
+
+예시:
+    python load_test.py test_recipe.pdf --clients 8 --requests 5
+    python load_test.py test_recipe.pdf test_image.jpg --mode stream-parallel --duration 60 --output .cache/load/before.json
+    python load_test.py test_recipe.pdf --clients 8 --baseline .cache/load/before.json
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+import requests
+
+MODES = {
+    "menus": "/generate/menus",
+    "stream": "/generate/menus/stream",
+    "stream-parallel": "/generate/menus/stream-parallel",
+}
+
+
+def get_content_type(file_path: Path) -> str:
+    """파일 확장자로 Content-Type 결정"""
+    ext = file_path.suffix.lower()
+    if ext == '.pdf':
+        return 'application/pdf'
+    elif ext in ['.jpg', '.jpeg']:
+        return 'image/jpeg'
+    elif ext == '.png':
+        return 'image/png'
+    elif ext == '.heic':
+        return 'image/heic'
+    else:
+        return 'application/octet-stream'
+
+
+def unique_payload(content: bytes) -> bytes:
+    """
+    캐시 키(파일 내용 해시)가 요청마다 달라지도록 파일 끝에 고유한 바이트 추가
+    PDF는 %%EOF 뒤 주석, JPEG/PNG는 끝 마커 뒤 데이터로 취급되어 내용에는 영향이 없음
+    """
+    return content + f"\n%load-test {uuid.uuid4().hex}\n".encode("ascii")
+
+
+# --- 요청 1회 ---
+def run_request(server_url: str, mode: str, file_path: Path, content: bytes, timeout: float) -> dict:
+    """
+    요청 1회 실행 후 측정값 반환
+    {"ok", "status_code", "error", "first_event", "first_result", "total", "menus"} (시간은 초)
+    """
+    result = {"ok": False, "status_code": None, "error": None,
+              "first_event": None, "first_result": None, "total": None, "menus": 0}
+    files = {"file": (file_path.name, content, get_content_type(file_path))}
+    start = time.time()
+
+    try:
+        response = requests.post(f"{server_url}{MODES[mode]}", files=files, stream=mode != "menus", timeout=timeout)
+        result["status_code"] = response.status_code
+        if response.status_code != 200:
+            result["error"] = f"HTTP {response.status_code}"
+            response.close()
+            return result
+
+        if mode == "menus":
+            data = response.json()
+            elapsed = time.time() - start
+            result.update(ok=True, first_event=elapsed, first_result=elapsed, total=elapsed, menus=len(data["menus"]))
+            return result
+
+        completed = False
+        with response:
+            for line in response.iter_lines():
+                if not line or not line.startswith(b"data: "):
+                    continue
+                elapsed = time.time() - start
+                if result["first_event"] is None:
+                    result["first_event"] = elapsed
+                data = json.loads(line[6:])
+                if data["type"] == "progress":
+                    if result["first_result"] is None:
+                        result["first_result"] = elapsed
+                    result["menus"] += len(data.get("menus", []))
+                elif data["type"] == "complete":
+                    completed = True
+                elif data["type"] == "error":
+                    result["error"] = f"SSE error: {data.get('message')}"
+                    break
+
+        result["total"] = time.time() - start
+        if result["error"] is None and not completed:
+            result["error"] = "Stream ended without complete event"
+        result["ok"] = result["error"] is None
+    except requests.exceptions.Timeout:
+        result["error"] = "Timeout"
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+# --- 가상 클라이언트 ---
+def run_mode(args, mode: str, files: List[tuple]) -> dict:
+    """가상 클라이언트 args.clients개로 mode 엔드포인트에 부하를 주고 요약 결과 반환"""
+    records = []
+    records_lock = threading.Lock()
+    deadline = time.time() + args.ramp_up + args.duration if args.duration else None
+
+    def client(client_id: int) -> None:
+        # 램프업: 클라이언트 시작 시점을 고르게 분산
+        if args.ramp_up and args.clients > 1:
+            time.sleep(args.ramp_up * client_id / (args.clients - 1))
+        sent = 0
+        while True:
+            if deadline is not None:
+                if time.time() >= deadline:
+                    return
+            elif sent >= args.requests:
+                return
+
+            file_path, content = files[(client_id + sent) % len(files)]
+            payload = content if args.allow_cache else unique_payload(content)
+            record = run_request(args.server, mode, file_path, payload, args.timeout)
+            record["client"] = client_id
+            record["file"] = file_path.name
+            with records_lock:
+                records.append(record)
+                done = len(records)
+            if not record["ok"]:
+                print(f"   ⚠️  클라이언트 {client_id}: {record['error']}")
+            elif done % max(1, args.clients) == 0:
+                print(f"   ✅ {done}건 완료 (최근 {record['total']:.2f}초)")
+            sent += 1
+
+    print_header(f"{mode} ({MODES[mode]}) - 클라이언트 {args.clients}개")
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        list(executor.map(client, range(args.clients)))
+    wall_time = time.time() - start
+
+    return summarize_mode(mode, records, wall_time, args.clients)
+
+
+def summarize_mode(mode: str, records: List[dict], wall_time: float, clients: int) -> dict:
+    succeeded = [record for record in records if record["ok"]]
+    errors = Counter(record["error"] for record in records if not record["ok"])
+    total_menus = sum(record["menus"] for record in succeeded)
+
+    return {
+        "mode": mode,
+        "clients": clients,
+        "requests": len(records),
+        "succeeded": len(succeeded),
+        "errors": len(records) - len(succeeded),
+        "error_rate": round((len(records) - len(succeeded)) / len(records), 4) if records else 0.0,
+        "error_breakdown": dict(errors),
+        "status_codes": dict(Counter(str(record["status_code"]) for record in records)),
+        "wall_time": round(wall_time, 3),
+        "requests_per_sec": round(len(succeeded) / wall_time, 3) if wall_time > 0 else None,
+        "menus_per_sec": round(total_menus / wall_time, 3) if wall_time > 0 else None,
+        "first_event": summarize([record["first_event"] for record in succeeded]),
+        "first_result": summarize([record["first_result"] for record in succeeded if record["first_result"] is not None]),
+        "total": summarize([record["total"] for record in succeeded]),
+    }
+
+
+def summarize(values: List[float]) -> Optional[dict]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        "p50": round(percentile(ordered, 50), 3),
+        "p95": round(percentile(ordered, 95), 3),
+        "p99": round(percentile(ordered, 99), 3),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def percentile(ordered: List[float], percent: float) -> float:
+    """선형 보간 백분위수 (ordered는 정렬된 목록)"""
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * percent / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+# --- 출력 ---
+def format_time(seconds):
+    """초를 보기 좋게 포맷팅"""
+    return f"{seconds:.2f}초" if seconds is not None else "-"
+
+
+def print_header(title):
+    """섹션 헤더 출력"""
+    print("\n" + "=" * 60)
+    print(f"  {title}")
+    print("=" * 60)
+
+
+def print_summary(summary: dict) -> None:
+    print(f"\n📊 {summary['mode']}: {summary['requests']}건 (성공 {summary['succeeded']}, 실패 {summary['errors']}, "
+          f"오류율 {summary['error_rate']:.1%})")
+    for label, key in [("첫 이벤트", "first_event"), ("첫 페이지 결과", "first_result"), ("전체 시간", "total")]:
+        stats = summary[key]
+        if stats is None:
+            continue
+        print(f"   ⏱️  {label}: p50 {format_time(stats['p50'])}, p95 {format_time(stats['p95'])}, "
+              f"p99 {format_time(stats['p99'])}, 최대 {format_time(stats['max'])}")
+    print(f"   🚀 처리량: {summary['requests_per_sec']} 요청/초, {summary['menus_per_sec']} 메뉴/초")
+    if summary["error_breakdown"]:
+        for error, count in summary["error_breakdown"].items():
+            print(f"   ❌ {error}: {count}건")
+
+
+def compare_with_baseline(results: List[dict], baseline_path: str, tolerance: float, max_error_rate_increase: float) -> bool:
+    """
+    기준 결과와 모드별 p95 (첫 이벤트, 전체 시간), 오류율 비교
+
+    Args:
+        results: 이번 실행 결과
+        baseline_path: 기준 결과 JSON 경로
+        tolerance: p95 허용 증가율 (%)
+        max_error_rate_increase: 오류율 허용 증가폭 (0~1)
+
+    Returns:
+        회귀가 없으면 True
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {item["mode"]: item for item in json.load(f)["results"]}
+
+    print_header(f"기준 결과와 비교 ({baseline_path})")
+    ok = True
+    for result in results:
+        before = baseline.get(result["mode"])
+        if before is None:
+            print(f"➖ {result['mode']}: 기준 결과 없음")
+            continue
+
+        for key, label in [("first_event", "첫 이벤트 p95"), ("total", "전체 시간 p95")]:
+            if not before.get(key) or not result.get(key):
+                continue
+            before_p95, after_p95 = before[key]["p95"], result[key]["p95"]
+            change = (after_p95 - before_p95) / before_p95 * 100 if before_p95 else 0.0
+            regressed = change > tolerance
+            ok = ok and not regressed
+            icon = "❌" if regressed else ("✅" if change < -tolerance else "➖")
+            print(f"{icon} {result['mode']} {label}: {format_time(before_p95)} → {format_time(after_p95)} ({change:+.1f}%)")
+
+        error_increase = result["error_rate"] - before["error_rate"]
+        regressed = error_increase > max_error_rate_increase
+        ok = ok and not regressed
+        icon = "❌" if regressed else "➖"
+        print(f"{icon} {result['mode']} 오류율: {before['error_rate']:.1%} → {result['error_rate']:.1%}")
+    return ok
+
+
+# --- 진입점 ---
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="가상 클라이언트 N개로 메뉴 생성 엔드포인트에 동시 부하를 주는 테스트")
+    parser.add_argument("files", nargs="+", help="업로드할 PDF 또는 이미지 파일 (여러 개면 번갈아 사용)")
+    parser.add_argument("--server", default="http://localhost:8000")
+    parser.add_argument("--mode", action="append", choices=list(MODES), help="테스트할 모드 (여러 번 지정 가능, 기본값: 전체)")
+    parser.add_argument("--clients", type=int, default=4, help="동시 가상 클라이언트 수")
+    parser.add_argument("--requests", type=int, default=3, help="클라이언트당 요청 수 (--duration이 없을 때)")
+    parser.add_argument("--duration", type=float, default=0, help="모드별 실행 시간 (초, 지정하면 --requests 대신 사용)")
+    parser.add_argument("--ramp-up", type=float, default=0, help="클라이언트 시작을 분산할 시간 (초)")
+    parser.add_argument("--timeout", type=float, default=600, help="요청 타임아웃 (초)")
+    parser.add_argument("--allow-cache", action="store_true", help="파일을 그대로 보내 결과 캐시 / 동일 요청 합치기 허용")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=15.0, help="기준 대비 p95 허용 증가율 (%%)")
+    parser.add_argument("--max-error-rate-increase", type=float, default=0.01, help="기준 대비 오류율 허용 증가폭 (0~1)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+
+    files = []
+    for name in args.files:
+        file_path = Path(name)
+        if not file_path.exists():
+            print(f"❌ 파일을 찾을 수 없습니다: {file_path}")
+            return 1
+        files.append((file_path, file_path.read_bytes()))
+
+    try:
+        response = requests.get(f"{args.server}/", timeout=10)
+        print(f"✅ 서버 연결 성공: {response.json()['status']}")
+    except Exception as e:
+        print(f"❌ 서버 연결 실패: {e}")
+        print(f"💡 서버를 실행하세요: uvicorn src.main:app --port 8000")
+        return 1
+
+    modes = args.mode or list(MODES)
+    load = f"{args.duration:.0f}초" if args.duration else f"클라이언트당 {args.requests}건"
+    print(f"📄 파일: {', '.join(path.name for path, _ in files)}")
+    print(f"👥 클라이언트 {args.clients}개, {load}, 모드: {', '.join(modes)}")
+
+    results = []
+    for mode in modes:
+        summary = run_mode(args, mode, files)
+        print_summary(summary)
+        results.append(summary)
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "server": args.server,
+            "files": [path.name for path, _ in files],
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "files")},
+            "results": results,
+        }
+        output_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n💾 결과 저장: {output_path}")
+
+    if args.baseline:
+        if not compare_with_baseline(results, args.baseline, args.tolerance, args.max_error_rate_increase):
+            print(f"\n❌ 기준 결과 대비 성능이 나빠졌습니다")
+            return 1
+        print(f"\n✅ 기준 결과 대비 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+OpenAI 호환 스텁 서버 (부하 테스트용)
+
+API 비용 없이 운영 수준의 동시 요청으로 AI 서버를 부하 테스트하기 위한 Chat Completions API 대역입니다.
+ChatOpenAI가 base URL만 바꿔 이 서버를 호출하므로 LLM 스케줄러, OpenAI SDK의 429/5xx 재시도,
+병렬 스트리밍 경로가 실제와 같은 방식으로 실행됩니다.
+
+- 지연 시간: 첫 토큰까지 지연을 fixed / uniform / normal / lognormal 분포에서 추출
+- 토큰 속도: 출력 토큰을 --tokens-per-sec 속도로 생성 (stream=true이면 토큰 단위로 청크 전송)
+- 오류 주입: --rate-429 / --rate-500 확률로 오류 응답 (429는 Retry-After 헤더 포함),
+  --max-concurrent를 넘는 동시 요청도 429로 거절
+- 응답 내용: 프롬프트의 레시피 텍스트로 메뉴 JSON을 만듦 (benchmark.py의 가짜 LLM과 같은 규칙)
+
+사용법:
+    python openai_stub.py [옵션]
+
+예시:
+    # 1. 스텁 서버 실행
+    python openai_stub.py --port 8100 --latency 1.0 --latency-dist lognormal --tokens-per-sec 50 --rate-429 0.05
+
+    # 2. AI 서버가 스텁을 호출하도록 실행 (다른 터미널)
+    OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=stub uvicorn src.main:app --port 8000
+
+    # 3. 주입된 오류/동시 요청 수 확인
+    curl http://localhost:8100/stats
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from benchmark import fake_completion
+
+LATENCY_DISTRIBUTIONS = ["fixed", "uniform", "normal", "lognormal"]
+
+
+class StubStats:
+    def __init__(self):
+        self.requests = 0
+        self.streaming_requests = 0
+        self.completed = 0
+        self.injected_429 = 0
+        self.injected_500 = 0
+        self.rejected_concurrency = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completion_tokens = 0
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (4자당 1토큰)"""
+    return max(1, len(text) // 4)
+
+
+def create_app(args: argparse.Namespace) -> FastAPI:
+    app = FastAPI()
+    stats = StubStats()
+    rng = random.Random(args.seed)
+
+    def sample_latency() -> float:
+        """첫 토큰까지 지연 (초)"""
+        if args.latency_dist == "uniform":
+            value = rng.uniform(args.latency - args.latency_spread, args.latency + args.latency_spread)
+        elif args.latency_dist == "normal":
+            value = rng.gauss(args.latency, args.latency_spread)
+        elif args.latency_dist == "lognormal":
+            # latency를 중앙값으로, latency_spread를 로그 표준편차로 사용 (꼬리가 긴 실제 API 지연과 비슷)
+            value = rng.lognormvariate(math.log(max(args.latency, 1e-3)), args.latency_spread)
+        else:
+            value = args.latency
+        return max(0.0, value)
+
+    def token_delay(tokens: int) -> float:
+        return tokens / args.tokens_per_sec if args.tokens_per_sec > 0 else 0.0
+
+    def error_response(status_code: int, error_type: str, message: str, headers: dict = None) -> JSONResponse:
+        body = {"error": {"message": message, "type": error_type, "param": None, "code": None}}
+        return JSONResponse(status_code=status_code, content=body, headers=headers)
+
+    def injected_error():
+        """오류 주입 (없으면 None)"""
+        if stats.in_flight >= args.max_concurrent > 0:
+            stats.rejected_concurrency += 1
+            return error_response(
+                429, "rate_limit_exceeded", "Too many concurrent requests (stub)",
+                headers={"retry-after": str(args.retry_after)},
+            )
+        roll = rng.random()
+        if roll < args.rate_429:
+            stats.injected_429 += 1
+            return error_response(
+                429, "rate_limit_exceeded", "Rate limit reached (injected by stub)",
+                headers={"retry-after": str(args.retry_after)},
+            )
+        if roll < args.rate_429 + args.rate_500:
+            stats.injected_500 += 1
+            return error_response(500, "server_error", "The server had an error (injected by stub)")
+        return None
+
+    @app.get("/stats")
+    def read_stats():
+        return stats.to_dict()
+
+    @app.get("/v1/models")
+    def list_models():
+        return {"object": "list", "data": [{"id": args.model, "object": "model", "owned_by": "stub"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats.requests += 1
+
+        error = injected_error()
+        if error is not None:
+            return error
+
+        prompt = "\n".join(str(message.get("content") or "") for message in body.get("messages", []))
+        content = fake_completion(prompt)
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            try:
+                json.loads(content)
+            except json.JSONDecodeError:
+                content = json.dumps({"text": content}, ensure_ascii=False)
+
+        model = body.get("model", args.model)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        usage = {
+            "prompt_tokens": estimate_tokens(prompt),
+            "completion_tokens": estimate_tokens(content),
+            "total_tokens": estimate_tokens(prompt) + estimate_tokens(content),
+        }
+
+        if body.get("stream"):
+            stats.streaming_requests += 1
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(
+                stream_chunks(completion_id, created, model, content, usage, include_usage),
+                media_type="text/event-stream",
+            )
+
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        try:
+            await asyncio.sleep(sample_latency() + token_delay(usage["completion_tokens"]))
+        finally:
+            stats.in_flight -= 1
+        stats.completed += 1
+        stats.completion_tokens += usage["completion_tokens"]
+
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "logprobs": None,
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        }
+
+    async def stream_chunks(completion_id: str, created: int, model: str, content: str, usage: dict, include_usage: bool):
+        def chunk(delta: dict, finish_reason=None, chunk_usage=None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "logprobs": None, "finish_reason": finish_reason}] if delta is not None else [],
+            }
+            if chunk_usage is not None:
+                payload["usage"] = chunk_usage
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        try:
+            await asyncio.sleep(sample_latency())
+            yield chunk({"role": "assistant", "content": ""})
+            # 토큰 1개(약 4자) 단위로 전송
+            for i in range(0, len(content), 4):
+                await asyncio.sleep(token_delay(1))
+                yield chunk({"content": content[i:i + 4]})
+            yield chunk({}, finish_reason="stop")
+            if include_usage:
+                yield chunk(None, chunk_usage=usage)
+            yield "data: [DONE]\n\n"
+            stats.completed += 1
+            stats.completion_tokens += usage["completion_tokens"]
+        finally:
+            stats.in_flight -= 1
+
+    return app
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="부하 테스트용 OpenAI 호환 Chat Completions 스텁 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--model", default="gpt-3.5-turbo-1106", help="/v1/models에 표시할 모델 이름")
+    parser.add_argument("--latency", type=float, default=1.0, help="첫 토큰까지 지연 (초, lognormal이면 중앙값)")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-spread", type=float, default=0.3,
+                        help="uniform: ±범위(초), normal: 표준편차(초), lognormal: 로그 표준편차")
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0, help="출력 토큰 생성 속도 (0이면 즉시)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="429 응답 확률 (0~1)")
+    parser.add_argument("--rate-500", type=float, default=0.0, help="500 응답 확률 (0~1)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429 응답의 Retry-After (초)")
+    parser.add_argument("--max-concurrent", type=int, default=0, help="동시 요청 수 상한, 넘으면 429 (0이면 무제한)")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(f"🤖 OpenAI 스텁 서버: http://{args.host}:{args.port}/v1")
+    print(f"⏱️  지연: {args.latency_dist} ({args.latency}s, spread {args.latency_spread}), 토큰 속도: {args.tokens_per_sec}/s")
+    print(f"💥 오류 주입: 429 {args.rate_429:.0%}, 500 {args.rate_500:.0%}, 동시 요청 상한 {args.max_concurrent or '없음'}")
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
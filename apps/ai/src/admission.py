@@ -0,0 +1,237 @@
+"""
+업로드 요청 승인 제어 (load shedding)
+
+점심시간처럼 요청이 몰리면 서버는 모든 업로드를 받아들이고 모두가 함께 느려졌습니다. 끝낼 수 없는 작업을 받는
+대신, 요청을 시작하기 전에 지금 받아들이면 제시간에 끝낼 수 있는지 판단해 거절하고 Retry-After를 알려줍니다.
+
+판단 기준 (0으로 설정한 기준은 검사하지 않음):
+- 대기열 길이: 실행 슬롯(max_running)을 기다리는 요청이 max_queue 이상이면 429
+- 처리 중인 페이지: 승인된 요청들의 페이지 합이 max_pages를 넘으면 503
+- 예상 완료 시간: (처리 중인 페이지 + 새 요청 페이지) × 페이지당 시간 / 동시 처리 페이지 수가 deadline_seconds를 넘으면 503
+  페이지당 시간은 페이지 하나를 처리하는 데 걸리는 시간(서비스 시간)의 지수 이동 평균
+  완료된 요청의 실행 시간 × 그 요청이 동시에 처리할 수 있었던 페이지 수(min(페이지 수, 동시 처리 페이지 수)) / 페이지 수로 관측
+  (부하가 높을수록 커지므로 보수적으로 판단)
+
+서버가 비어 있으면 기준보다 큰 요청도 받아들임 (그렇지 않으면 영원히 처리할 수 없음).
+승인 결과는 GET /metrics (recipflash_admission_decisions_total 등)와 GET /admission/stats로 노출합니다.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import AsyncIterator, Awaitable, Optional
+
+from src.metrics import (
+    ADMISSION_DECISIONS_TOTAL, ADMISSION_QUEUED, ADMISSION_RUNNING, ADMISSION_PENDING_PAGES,
+    ADMISSION_PAGE_SECONDS, count,
+)
+
+logger = logging.getLogger(__name__)
+
+# 페이지당 시간 이동 평균의 새 관측값 비중
+PAGE_SECONDS_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(f"Server is busy ({reason}), retry after {retry_after}s")
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """
+    승인된 요청 하나. 승인 시점부터 페이지 수가 처리 중인 페이지에 더해짐
+    hold()/hold_stream()으로 작업을 넘기면 실행 슬롯을 받은 뒤 실행하고 끝나면 반납
+    작업을 넘기지 않은 채 요청이 끝나면 (같은 파일 요청에 합쳐진 경우 등) discard()로 반납
+    페이지 수를 미리 알 수 없는 요청(배치 업로드)은 페이지가 늘어날 때마다 add_pages()로 다시 승인 검사
+    """
+
+    def __init__(self, controller: "AdmissionController", pages: int):
+        self.controller = controller
+        self.pages = pages
+        self._claimed = False
+        self._released = False
+
+    def hold(self, awaitable: Awaitable) -> Awaitable:
+        self._claimed = True
+        return self._hold(awaitable)
+
+    def hold_stream(self, events: AsyncIterator) -> AsyncIterator:
+        self._claimed = True
+        return self._hold_stream(events)
+
+    def add_pages(self, pages: int) -> None:
+        """승인 후 늘어난 페이지를 더함 (처리 중인 페이지/예상 완료 시간 기준을 넘으면 AdmissionRejected)"""
+        self.controller._extend(self, pages)
+
+    def discard(self) -> None:
+        if not self._claimed:
+            self._release()
+
+    async def _hold(self, awaitable: Awaitable):
+        async with self._running():
+            return await awaitable
+
+    async def _hold_stream(self, events: AsyncIterator) -> AsyncIterator:
+        async with self._running():
+            async for event in events:
+                yield event
+
+    def _running(self):
+        return _RunningSlot(self)
+
+    def _release(self, run_seconds: Optional[float] = None) -> None:
+        if self._released:
+            return
+        self._released = True
+        self.controller._finish(self, run_seconds)
+
+
+class _RunningSlot:
+    def __init__(self, ticket: AdmissionTicket):
+        self.ticket = ticket
+        self.started_at = None
+
+    async def __aenter__(self):
+        controller = self.ticket.controller
+        try:
+            await controller._slots.acquire()
+        except BaseException:
+            self.ticket._release()
+            raise
+        controller._start()
+        self.started_at = time.monotonic()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        controller = self.ticket.controller
+        controller._stop()
+        controller._slots.release()
+        # 정상 완료한 요청만 페이지당 시간 추정에 반영
+        self.ticket._release(time.monotonic() - self.started_at if exc_type is None else None)
+
+
+class AdmissionController:
+    def __init__(self, max_running: int, max_queue: int, max_pages: int, deadline_seconds: float,
+                 page_seconds: float, page_concurrency: int):
+        self.max_running = max_running
+        self.max_queue = max_queue
+        self.max_pages = max_pages
+        self.deadline_seconds = deadline_seconds
+        self.page_seconds = page_seconds
+        self.page_concurrency = max(1, page_concurrency)
+        self._slots = asyncio.Semaphore(max_running) if max_running else _Unlimited()
+
+        self.admitted = 0      # 승인됐지만 아직 끝나지 않은 요청 수 (대기 + 실행)
+        self.running = 0
+        self.pending_pages = 0
+        self.decisions = {}
+
+        ADMISSION_PAGE_SECONDS.set(page_seconds)
+
+    @property
+    def queued(self) -> int:
+        return self.admitted - self.running
+
+    def estimated_seconds(self, pages: int = 0) -> float:
+        """지금 pages 페이지짜리 요청을 받으면 끝날 때까지의 예상 시간"""
+        return (self.pending_pages + pages) * self.page_seconds / self.page_concurrency
+
+    def admit(self, pages: int) -> AdmissionTicket:
+        """승인하면 AdmissionTicket, 거절하면 AdmissionRejected (status_code 429/503, retry_after 초)"""
+        pages = max(1, pages)
+        idle = self.admitted == 0
+
+        # 승인됐지만 아직 시작 전인 요청(페이지 수 확인 중 등)도 슬롯이 남아 있으면 대기열로 보지 않음
+        if self.max_running and self.max_queue and self.admitted - self.max_running >= self.max_queue:
+            # 대기 중인 요청 하나가 실행을 시작할 때까지 (실행 중인 요청의 평균 남은 작업)
+            per_request = self.estimated_seconds() / max(1, self.admitted)
+            self._reject(429, "queue_full", per_request)
+        if not idle:
+            self._check_pages(pages)
+
+        self.admitted += 1
+        self.pending_pages += pages
+        self._record("admitted")
+        self._update_gauges()
+        return AdmissionTicket(self, pages)
+
+    def bypass(self, reason: str) -> None:
+        """캐시 히트/같은 파일 요청 합치기처럼 새 작업을 만들지 않는 요청 (승인 검사 생략)"""
+        self._record(reason)
+
+    def stats(self) -> dict:
+        return {
+            "max_running": self.max_running,
+            "max_queue": self.max_queue,
+            "max_pages": self.max_pages,
+            "deadline_seconds": self.deadline_seconds,
+            "running": self.running,
+            "queued": self.queued,
+            "pending_pages": self.pending_pages,
+            "page_seconds": round(self.page_seconds, 3),
+            "estimated_seconds": round(self.estimated_seconds(), 2),
+            "decisions": dict(self.decisions),
+        }
+
+    # --- 내부 구현 ---
+    def _check_pages(self, pages: int) -> None:
+        if self.max_pages and self.pending_pages + pages > self.max_pages:
+            excess_pages = self.pending_pages + pages - self.max_pages
+            self._reject(503, "too_many_pages", excess_pages * self.page_seconds / self.page_concurrency)
+        if self.deadline_seconds and self.estimated_seconds(pages) > self.deadline_seconds:
+            self._reject(503, "over_deadline", self.estimated_seconds(pages) - self.deadline_seconds)
+
+    def _extend(self, ticket: AdmissionTicket, pages: int) -> None:
+        # 이 요청 하나만 처리 중이면 admit()과 같이 기준보다 커져도 받아들임
+        if self.admitted > 1:
+            self._check_pages(pages)
+        ticket.pages += pages
+        self.pending_pages += pages
+        self._update_gauges()
+
+    def _reject(self, status_code: int, reason: str, retry_after_seconds: float) -> None:
+        retry_after = max(1, math.ceil(retry_after_seconds))
+        self._record(reason)
+        logger.warning(f"[ADMISSION] Rejected request ({reason}): {self.running} running, {self.queued} queued, "
+                       f"{self.pending_pages} pages pending - Retry-After {retry_after}s")
+        raise AdmissionRejected(status_code, reason, retry_after)
+
+    def _record(self, decision: str) -> None:
+        self.decisions[decision] = self.decisions.get(decision, 0) + 1
+        count(ADMISSION_DECISIONS_TOTAL, decision=decision)
+
+    def _start(self) -> None:
+        self.running += 1
+        self._update_gauges()
+
+    def _stop(self) -> None:
+        self.running -= 1
+
+    def _finish(self, ticket: AdmissionTicket, run_seconds: Optional[float]) -> None:
+        self.admitted -= 1
+        self.pending_pages -= ticket.pages
+        if run_seconds is not None:
+            # 실행 시간(벽시계)은 페이지를 동시에 처리한 만큼 짧으므로 페이지당 서비스 시간으로 환산
+            # (estimated_seconds에서 동시 처리 페이지 수로 나누므로 여기서는 나누기 전 값을 학습)
+            observed = run_seconds * min(ticket.pages, self.page_concurrency) / ticket.pages
+            self.page_seconds += PAGE_SECONDS_ALPHA * (observed - self.page_seconds)
+            ADMISSION_PAGE_SECONDS.set(self.page_seconds)
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        ADMISSION_RUNNING.set(self.running)
+        ADMISSION_QUEUED.set(self.queued)
+        ADMISSION_PENDING_PAGES.set(self.pending_pages)
+
+
+class _Unlimited:
+    """max_running=0일 때 쓰는 항상 열려 있는 세마포어"""
+
+    async def acquire(self) -> None:
+        return None
+
+    def release(self) -> None:
+        return None
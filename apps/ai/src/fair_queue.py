@@ -0,0 +1,126 @@
+"""
+요청 간 공정 대기열 (weighted fair queuing)
+
+generate_menus_from_text_util은 페이지 호출을 한 번에 gather하므로, 60페이지 카탈로그를 올린 사용자가 LLM/OCR
+슬롯을 모두 차지하고, 사진 한 장을 올린 사용자는 그 뒤에서 기다렸습니다 (세마포어는 도착 순서대로 깨움).
+
+FairSemaphore는 대기자를 흐름(flow: 사용자 또는 요청)별로 나눠 start-time fair queuing 순서로 슬롯을 줍니다.
+- 흐름마다 마지막 작업의 가상 종료 시각을 기록하고, 새 작업의 시작 태그 = max(현재 가상 시각, 흐름의 종료 시각)
+- 슬롯이 비면 시작 태그가 가장 작은 대기자부터 실행 → 대기 중인 흐름들이 번갈아 실행됨 (라운드 로빈)
+- 작업 비용(cost)과 흐름 가중치(weight)로 태그 간격을 조절: 가중치가 2인 흐름은 같은 시간에 2배의 작업을 처리
+
+흐름은 요청 진입 시 set_flow()로 contextvar에 넣어 두며, 같은 요청에서 만든 태스크도 같은 흐름으로 대기합니다.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Tuple
+
+# 대기하지 않는 흐름의 종료 시각 기록을 정리하는 기준 (흐름 수)
+MAX_IDLE_FLOWS = 1024
+
+_current_flow: contextvars.ContextVar[Tuple[str, float]] = contextvars.ContextVar(
+    "fair_queue_flow", default=("default", 1.0)
+)
+
+
+def set_flow(flow_id: str, weight: float = 1.0) -> None:
+    """현재 요청(컨텍스트)의 흐름과 가중치 설정"""
+    _current_flow.set((flow_id, max(weight, 0.01)))
+
+
+def current_flow() -> Tuple[str, float]:
+    return _current_flow.get()
+
+
+class FairSemaphore:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._available = capacity
+        self._heap: list = []  # (시작 태그, 순번, future, 흐름)
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._finish_tags: dict = {}  # {흐름: 마지막 작업의 가상 종료 시각}
+        self._waiting: Counter = Counter()  # {흐름: 대기 중인 작업 수}
+
+        self.acquired = 0
+        self.waits = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def acquire(self, cost: float = 1.0) -> None:
+        flow, weight = current_flow()
+        start = max(self._virtual_time, self._finish_tags.get(flow, 0.0))
+        self._finish_tags[flow] = start + max(cost, 1.0) / weight
+        self.acquired += 1
+
+        if self._available > 0 and not self._heap:
+            self._available -= 1
+            self._virtual_time = start
+            return
+
+        queued_at = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (start, next(self._sequence), future, flow))
+        self._waiting[flow] += 1
+        try:
+            await future
+        except BaseException:
+            if future.done() and not future.cancelled():
+                self.release()  # 슬롯을 받은 직후 취소됨
+            else:
+                future.cancel()  # release()가 건너뜀
+            raise
+        finally:
+            self._waiting[flow] -= 1
+            if not self._waiting[flow]:
+                del self._waiting[flow]
+
+        wait_seconds = time.monotonic() - queued_at
+        self.waits += 1
+        self.total_wait_seconds += wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def release(self) -> None:
+        while self._heap:
+            start, _, future, _ = heapq.heappop(self._heap)
+            if future.done():  # 취소된 대기자
+                continue
+            self._virtual_time = start
+            future.set_result(None)
+            return
+        self._available += 1
+        self._prune_idle_flows()
+
+    @asynccontextmanager
+    async def slot(self, cost: float = 1.0):
+        await self.acquire(cost)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "in_use": self.capacity - self._available,
+            "waiting": sum(self._waiting.values()),
+            "waiting_flows": len(self._waiting),
+            "waits": self.waits,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.waits, 4) if self.waits else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 4),
+        }
+
+    def _prune_idle_flows(self) -> None:
+        """가상 시각이 이미 지난 흐름은 기록이 없어도 태그가 같으므로 삭제"""
+        if len(self._finish_tags) <= MAX_IDLE_FLOWS:
+            return
+        self._finish_tags = {
+            flow: tag for flow, tag in self._finish_tags.items()
+            if tag > self._virtual_time or flow in self._waiting
+        }
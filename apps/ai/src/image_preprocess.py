@@ -0,0 +1,183 @@
+"""
+OCR 전처리
+
+휴대폰 사진(12MP HEIC/JPEG)은 원본 해상도 그대로 RGB로 변환해 Tesseract에 넘기고 있었습니다. 메뉴판 사진의 글자는
+Tesseract가 잘 읽는 크기보다 몇 배 크고, 기울어져 있거나 조명이 고르지 않은 경우가 많아 OCR이 느리고 정확도도 떨어집니다.
+
+ImagePreprocessor는 OCR 직전에 다음 단계를 NumPy/PIL 연산으로 적용합니다 (단계별 소요 시간을 함께 반환).
+- grayscale: 그레이스케일 변환 (JPEG은 reduced_decode_size()로 줄인 크기로 디코딩할 때 이미 그레이스케일),
+  어두운 바탕에 밝은 글자면 반전
+- downscale: 긴 변을 max_side 이하로 축소
+- deskew: 축소 이미지의 잉크 픽셀을 각도별로 투영해 행 프로파일이 가장 뾰족한 각도를 찾아 회전
+- rescale: 행 프로파일로 찾은 글자 줄 높이의 중앙값이 target_text_height가 되도록 확대/축소
+- binarize: 글자 줄 높이에 맞춘 창의 지역 평균보다 어두운 픽셀만 검정으로 (조명이 고르지 않은 사진 대응)
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageFilter, ImageOps
+
+# 잉크 판정: 배경(중앙값)보다 이만큼 어두운 픽셀 (page_triage와 같은 기준)
+INK_CONTRAST = 40
+# 배경(중앙값)이 이보다 어두우면 밝은 글자로 보고 반전
+DARK_BACKGROUND = 100
+# 기울기 추정에 쓰는 축소 이미지의 긴 변, 사용하는 최대 잉크 픽셀 수
+SKEW_THUMBNAIL_SIDE = 800
+SKEW_MAX_POINTS = 20000
+# 이보다 작은 기울기는 회전하지 않음 (회전 자체가 글자를 흐리게 만듦)
+MIN_SKEW_DEGREES = 0.2
+# 글자 줄 높이 추정: 세로 띠 수 (다단 메뉴판에서 줄 위치가 어긋나도 줄이 합쳐지지 않도록), 최소 줄 수
+TEXT_HEIGHT_STRIPS = 4
+MIN_TEXT_LINES = 3
+# 줄 높이 비율이 이 범위 안이면 크기를 바꾸지 않음, 확대/축소 배율 한계
+RESCALE_TOLERANCE = 0.1
+MIN_SCALE = 0.25
+MAX_SCALE = 2.0
+
+
+def reduced_decode_size(image: Image.Image, max_side: int) -> Tuple[int, int]:
+    """
+    JPEG은 1/2, 1/4, 1/8 해상도로 바로 디코딩할 수 있음: 긴 변이 max_side 이상으로 남는 가장 작은 크기
+    (Image.open 직후 호출. 다른 형식이나 max_side=0이면 원본 크기)
+    """
+    width, height = image.size
+    if image.format != "JPEG" or not max_side:
+        return width, height
+    for scale in (8, 4, 2):
+        if max(width, height) // scale >= max_side:
+            return -(-width // scale), -(-height // scale)
+    return width, height
+
+
+class ImagePreprocessor:
+    def __init__(self, max_side: int = 2000, target_text_height: int = 40, deskew: bool = True,
+                 binarize: bool = True, max_skew_degrees: float = 10.0, binarize_offset: int = 10):
+        self.max_side = max_side
+        self.target_text_height = target_text_height
+        self.deskew = deskew
+        self.binarize = binarize
+        self.max_skew_degrees = max_skew_degrees
+        self.binarize_offset = binarize_offset
+
+    @property
+    def cache_tag(self) -> str:
+        """전처리 설정에 따라 OCR 결과가 달라지므로 결과 캐시 키에 포함"""
+        return f"{self.max_side}:{self.target_text_height}:{int(self.deskew)}:{int(self.binarize)}:{self.binarize_offset}"
+
+    def process(self, image: Image.Image) -> Tuple[Image.Image, Dict[str, float]]:
+        """(OCR용 그레이스케일 이미지, {단계: 초}) 반환. CPU 작업이므로 asyncio.to_thread에서 호출"""
+        timings: Dict[str, float] = {}
+
+        with _step(timings, "grayscale"):
+            gray = image if image.mode == "L" else image.convert("L")
+            # 칠판 메뉴판처럼 어두운 바탕에 밝은 글자면 반전 (이후 단계는 밝은 바탕의 어두운 글자를 가정)
+            if np.median(np.asarray(gray.reduce(8))) < DARK_BACKGROUND:
+                gray = ImageOps.invert(gray)
+
+        with _step(timings, "downscale"):
+            gray = _limit_side(gray, self.max_side)
+
+        if self.deskew:
+            with _step(timings, "deskew"):
+                angle = estimate_skew(gray, self.max_skew_degrees)
+                if abs(angle) >= MIN_SKEW_DEGREES:
+                    background = int(np.median(np.asarray(gray.reduce(4))))
+                    gray = gray.rotate(angle, resample=Image.Resampling.BILINEAR, expand=True, fillcolor=background)
+
+        with _step(timings, "rescale"):
+            text_height = estimate_text_height(gray)
+            if text_height:
+                scale = min(max(self.target_text_height / text_height, MIN_SCALE), MAX_SCALE)
+                scale = min(scale, self.max_side / max(gray.size)) if self.max_side else scale
+                if abs(scale - 1) > RESCALE_TOLERANCE:
+                    size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+                    resample = Image.Resampling.LANCZOS if scale > 1 else Image.Resampling.BOX
+                    gray = gray.resize(size, resample)
+
+        if self.binarize:
+            with _step(timings, "binarize"):
+                # 창 크기: 글자 줄 높이의 약 2배 (글자 획 안쪽이 지역 평균에 묻히지 않도록)
+                radius = max(self.target_text_height, 8)
+                gray = adaptive_threshold(gray, radius, self.binarize_offset)
+
+        return gray, timings
+
+
+def estimate_skew(gray: Image.Image, max_degrees: float) -> float:
+    """
+    기울기(도, 반시계 방향 회전량) 추정. 축소 이미지의 잉크 픽셀을 각도별로 y축에 투영하고,
+    행별 픽셀 수의 제곱합(프로파일이 뾰족할수록 큼)이 가장 큰 각도를 찾음 (0.5도 간격 → 0.1도 간격)
+    """
+    thumbnail = _limit_side(gray, SKEW_THUMBNAIL_SIDE)
+    pixels = np.asarray(thumbnail, dtype=np.int16)
+    ys, xs = np.nonzero(pixels < np.median(pixels) - INK_CONTRAST)
+    if len(ys) < 100:
+        return 0.0
+    if len(ys) > SKEW_MAX_POINTS:
+        keep = np.random.default_rng(0).choice(len(ys), SKEW_MAX_POINTS, replace=False)
+        ys, xs = ys[keep], xs[keep]
+    ys = ys.astype(np.float32)
+    xs = xs.astype(np.float32)
+
+    def best_angle(angles: np.ndarray) -> float:
+        radians = np.deg2rad(angles)[:, None]
+        # 이미지 좌표(y 아래 방향)에서 오른쪽으로 내려가는 줄은 양의 각도로 투영하면 수평이 됨
+        rows = np.rint(ys * np.cos(radians) - xs * np.sin(radians)).astype(np.int64)
+        rows -= rows.min()
+        bins = int(rows.max()) + 1
+        # 각도마다 별도 구간을 쓰도록 오프셋을 더해 bincount 한 번으로 모든 각도의 행 프로파일 계산
+        profiles = np.bincount((rows + np.arange(len(angles))[:, None] * bins).ravel(), minlength=len(angles) * bins)
+        scores = (profiles.reshape(len(angles), bins).astype(np.float64) ** 2).sum(axis=1)
+        return float(angles[int(np.argmax(scores))])
+
+    coarse = best_angle(np.arange(-max_degrees, max_degrees + 0.25, 0.5))
+    return best_angle(np.arange(coarse - 0.5, coarse + 0.55, 0.1))
+
+
+def estimate_text_height(gray: Image.Image) -> Optional[float]:
+    """
+    글자 줄 높이(px) 추정: 세로 띠마다 잉크가 있는 행이 이어지는 구간의 높이를 모아 중앙값
+    줄을 충분히 찾지 못하면 None (사진/로고 위주 이미지는 크기를 바꾸지 않음)
+    """
+    pixels = np.asarray(gray, dtype=np.int16)
+    ink = pixels < np.median(pixels) - INK_CONTRAST
+    heights = []
+    for strip in np.array_split(ink, TEXT_HEIGHT_STRIPS, axis=1):
+        profile = strip.sum(axis=1)
+        if not profile.any():
+            continue
+        text_rows = profile > max(1, profile.max() * 0.05)
+        # 잉크가 있는 행 구간의 시작/끝 위치
+        edges = np.diff(np.concatenate(([0], text_rows.astype(np.int8), [0])))
+        runs = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+        heights.extend(runs[runs >= 3].tolist())
+    if len(heights) < MIN_TEXT_LINES:
+        return None
+    return float(np.median(heights))
+
+
+def adaptive_threshold(gray: Image.Image, radius: int, offset: int) -> Image.Image:
+    """지역 평균(박스 필터, PIL C 구현)보다 offset 이상 어두운 픽셀은 0, 나머지는 255"""
+    local_mean = np.asarray(gray.filter(ImageFilter.BoxBlur(radius)), dtype=np.int16)
+    pixels = np.asarray(gray, dtype=np.int16)
+    return Image.fromarray(np.where(pixels < local_mean - offset, 0, 255).astype(np.uint8))
+
+
+def _limit_side(gray: Image.Image, max_side: int) -> Image.Image:
+    if not max_side or max(gray.size) <= max_side:
+        return gray
+    scale = max_side / max(gray.size)
+    size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+    return gray.resize(size, Image.Resampling.BOX)
+
+
+@contextmanager
+def _step(timings: Dict[str, float], name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = time.perf_counter() - start
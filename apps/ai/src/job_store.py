@@ -0,0 +1,185 @@
+"""
+비동기 작업(job) 저장소
+
+큰 PDF는 /generate/menus 한 요청이 수 분씩 걸려 프록시 타임아웃에 걸리므로, POST /jobs는 작업을 등록만 하고
+바로 ID를 돌려주고 실제 처리는 백그라운드 워커가 합니다. 작업 상태와 페이지별 부분 결과는 로컬 SQLite에,
+업로드된 파일은 upload_dir에 저장하므로 서버가 재시작되어도 끝나지 않은 작업을 다시 큐에 넣을 수 있습니다.
+
+상태: queued → running → succeeded | failed
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from typing import List, Optional
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class JobStore:
+    def __init__(self, db_path: str, upload_dir: str):
+        self.db_path = db_path
+        self.upload_dir = upload_dir
+
+        # SQLite 연결은 하나만 열고 to_thread에서 락으로 직렬화
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    # --- 공개 API ---
+    async def create(self, content_type: Optional[str], filename: Optional[str], source_path: str, file_size: int) -> str:
+        """업로드 스풀 파일을 upload_dir로 옮기고 queued 상태의 작업을 등록한 뒤 작업 ID 반환"""
+        job_id = uuid.uuid4().hex
+        file_path = os.path.join(self.upload_dir, job_id)
+        await asyncio.to_thread(self._move_file, source_path, file_path)
+        await asyncio.to_thread(self._db_create, job_id, content_type, filename, file_path, file_size)
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        """작업 상태와 지금까지 끝난 페이지 결과 (페이지 순서). 없는 작업이면 None"""
+        return await asyncio.to_thread(self._db_get, job_id)
+
+    async def mark_running(self, job_id: str) -> None:
+        await asyncio.to_thread(
+            self._db_execute,
+            "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+            (JOB_RUNNING, time.time(), job_id),
+        )
+
+    async def set_total_pages(self, job_id: str, total_pages: int) -> None:
+        await asyncio.to_thread(
+            self._db_execute, "UPDATE jobs SET total_pages = ? WHERE id = ?", (total_pages, job_id)
+        )
+
+    async def add_page(self, job_id: str, page: int, result: dict) -> None:
+        """페이지 하나의 결과 저장 (완료 순서대로 들어오며 조회 시 페이지 순서로 정렬)"""
+        await asyncio.to_thread(
+            self._db_execute,
+            "INSERT OR REPLACE INTO job_pages (job_id, page, result) VALUES (?, ?, ?)",
+            (job_id, page, json.dumps(result, ensure_ascii=False)),
+        )
+
+    async def finish(self, job_id: str, error: Optional[str] = None) -> None:
+        """성공/실패로 종료하고 업로드 파일 삭제"""
+        job = await self.get(job_id)
+        status = JOB_FAILED if error is not None else JOB_SUCCEEDED
+        await asyncio.to_thread(
+            self._db_execute,
+            "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+            (status, time.time(), error, job_id),
+        )
+        if job is not None:
+            await asyncio.to_thread(self._remove_file, job["file_path"])
+
+    async def requeue_unfinished(self) -> List[str]:
+        """
+        서버 시작 시 호출: 이전 프로세스에서 끝나지 않은 작업을 queued로 되돌리고 등록 순서대로 ID 반환
+        실행 중이던 작업의 부분 결과는 처음부터 다시 처리하므로 지움
+        """
+        return await asyncio.to_thread(self._db_requeue_unfinished)
+
+    # --- 내부 구현 ---
+    def _move_file(self, source_path: str, file_path: str) -> None:
+        # 같은 파일 시스템이면 rename, 아니면 복사 후 삭제
+        os.makedirs(self.upload_dir, exist_ok=True)
+        shutil.move(source_path, file_path)
+
+    def _remove_file(self, file_path: str) -> None:
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    content_type TEXT,
+                    filename TEXT,
+                    file_path TEXT NOT NULL,
+                    file_size INTEGER NOT NULL,
+                    total_pages INTEGER,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_pages (
+                    job_id TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    result TEXT NOT NULL,
+                    PRIMARY KEY (job_id, page)
+                )
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _db_execute(self, sql: str, params: tuple) -> None:
+        with self._db_lock:
+            conn = self._connection()
+            conn.execute(sql, params)
+            conn.commit()
+
+    def _db_create(self, job_id: str, content_type: Optional[str], filename: Optional[str],
+                   file_path: str, file_size: int) -> None:
+        self._db_execute(
+            "INSERT INTO jobs (id, status, content_type, filename, file_path, file_size, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, JOB_QUEUED, content_type, filename, file_path, file_size, time.time()),
+        )
+
+    def _db_get(self, job_id: str) -> Optional[dict]:
+        with self._db_lock:
+            conn = self._connection()
+            conn.row_factory = sqlite3.Row
+            try:
+                row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row is None:
+                    return None
+                pages = conn.execute(
+                    "SELECT page, result FROM job_pages WHERE job_id = ? ORDER BY page", (job_id,)
+                ).fetchall()
+            finally:
+                conn.row_factory = None
+
+        job = dict(row)
+        job["pages"] = [{"page": page["page"], **json.loads(page["result"])} for page in pages]
+        return job
+
+    def _db_requeue_unfinished(self) -> List[str]:
+        with self._db_lock:
+            conn = self._connection()
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (JOB_QUEUED, JOB_RUNNING)
+            ).fetchall()
+            job_ids = [row[0] for row in rows]
+            conn.execute(
+                "DELETE FROM job_pages WHERE job_id IN (SELECT id FROM jobs WHERE status = ?)", (JOB_RUNNING,)
+            )
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL, total_pages = NULL WHERE status = ?",
+                (JOB_QUEUED, JOB_RUNNING),
+            )
+            conn.commit()
+        return job_ids
@@ -0,0 +1,157 @@
+"""
+공용 LLM 호출 스케줄러
+
+모든 LLM 호출(메뉴 파싱, 번역)은 이 스케줄러의 slot()을 거쳐 실행됩니다.
+- 모델별 최대 동시 호출 수 (요청/사용자 간 공정 대기열: 큰 요청이 슬롯을 독차지하지 않도록 흐름별로 번갈아 실행)
+- 모델별 분당 요청 수(RPM), 분당 토큰 수(TPM) 토큰 버킷
+- 대기열 길이, 대기 시간 통계
+
+여러 요청이 동시에 수백 개의 호출을 만들어도 실제로 나가는 호출은 제공자 한도 바로 아래로 유지되어
+429 폭주 → 재시도 → 지연 증가가 반복되지 않습니다.
+"""
+
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from src.fair_queue import FairSemaphore
+
+
+def estimate_tokens(text: str, completion_tokens: int = 0) -> int:
+    """
+    토크나이저 없이 쓰는 보수적인 토큰 추정치
+    (영어는 약 4바이트/토큰, 한글은 3바이트/글자이므로 UTF-8 바이트 수 / 3이면 대체로 넘치게 잡힘)
+    """
+    return len(text.encode("utf-8")) // 3 + completion_tokens
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0  # 초당 충전량
+        self.tokens = per_minute
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """amount만큼 꺼내려면 몇 초를 기다려야 하는지 (0이면 즉시 가능)"""
+        self._refill(time.monotonic())
+        amount = min(amount, self.capacity)  # 버킷보다 큰 요청이 영원히 대기하지 않도록
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill(time.monotonic())
+        self.tokens -= min(amount, self.capacity)
+
+
+class ModelLimiter:
+    def __init__(self, model: str, max_in_flight: int, rpm: int, tpm: int):
+        self.model = model
+        self.max_in_flight = max_in_flight
+        self._semaphore = FairSemaphore(max_in_flight)
+        self._bucket_lock = asyncio.Lock()  # 버킷 대기를 FIFO로 직렬화
+        self.requests_bucket = TokenBucket(rpm)
+        self.tokens_bucket = TokenBucket(tpm)
+
+        self.queued = 0
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited_waits = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int):
+        queued_at = time.monotonic()
+        self.queued += 1
+        try:
+            await self._semaphore.acquire(estimated_tokens)  # 토큰이 많은 호출일수록 흐름의 다음 차례가 늦어짐
+            try:
+                async with self._bucket_lock:
+                    while True:
+                        wait = max(
+                            self.requests_bucket.wait_time(1),
+                            self.tokens_bucket.wait_time(estimated_tokens),
+                        )
+                        if wait <= 0:
+                            break
+                        self.rate_limited_waits += 1
+                        await asyncio.sleep(wait)
+                    self.requests_bucket.consume(1)
+                    self.tokens_bucket.consume(estimated_tokens)
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self.queued -= 1
+
+        wait_seconds = time.monotonic() - queued_at
+        self.total_wait_seconds += wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+        self.calls += 1
+        self.in_flight += 1
+        try:
+            yield
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "waiting_flows": self._semaphore.stats()["waiting_flows"],
+            "calls": self.calls,
+            "errors": self.errors,
+            "rate_limited_waits": self.rate_limited_waits,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.calls, 4) if self.calls else 0.0,
+            "max_wait_seconds": round(self.max_wait_seconds, 4),
+        }
+
+
+class LLMScheduler:
+    def __init__(self, default_limits: dict, model_limits: Optional[Dict[str, dict]] = None):
+        self.default_limits = default_limits
+        self.model_limits = model_limits or {}
+        self._limiters: Dict[str, ModelLimiter] = {}
+
+    @classmethod
+    def from_env(cls, max_in_flight: str, rpm: str, tpm: str, overrides_json: Optional[str]) -> "LLMScheduler":
+        """
+        환경 변수 값으로 스케줄러 생성
+        overrides_json 예시: '{"gpt-3.5-turbo": {"max_in_flight": 32, "rpm": 3500, "tpm": 160000}}'
+        """
+        default_limits = {"max_in_flight": int(max_in_flight), "rpm": int(rpm), "tpm": int(tpm)}
+        model_limits = json.loads(overrides_json) if overrides_json else {}
+        return cls(default_limits, model_limits)
+
+    def limiter(self, model: str) -> ModelLimiter:
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            limits = {**self.default_limits, **self.model_limits.get(model, {})}
+            limiter = ModelLimiter(model, limits["max_in_flight"], limits["rpm"], limits["tpm"])
+            self._limiters[model] = limiter
+        return limiter
+
+    def slot(self, model: str, estimated_tokens: int):
+        """
+        사용법:
+            async with llm_scheduler.slot(llm.model_name, estimate_tokens(prompt)):
+                result = await chain.ainvoke(...)
+        """
+        return self.limiter(model).slot(estimated_tokens)
+
+    def stats(self) -> dict:
+        return {model: limiter.stats() for model, limiter in self._limiters.items()}
@@ -0,0 +1,36 @@
+"""
+로그 설정
+
+기존 print()는 이벤트 루프 스레드에서 stdout에 동기적으로 쓰므로 로그가 많은 요청 처리 경로를 막았습니다.
+src.* 모듈의 로그는 QueueHandler로 큐에 넣기만 하고, 실제 출력은 QueueListener 스레드가 담당합니다.
+로그 형식은 기존 출력과 같게 메시지만 그대로 씁니다 ([PERF], [STREAM] 등 태그 유지).
+
+LOG_LEVEL=DEBUG로 OCR 미리보기, 메뉴 이름 등 [DEBUG] 로그도 출력
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+_listener = None
+
+
+def setup_logging(level: str = "INFO") -> None:
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    logger = logging.getLogger("src")
+    logger.setLevel(level.upper())
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.propagate = False
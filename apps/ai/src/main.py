@@ -1,24 +1,57 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from langchain_ollama import ChatOllama
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from pydantic import BaseModel, Field
 import pytesseract
-from pdf2image import convert_from_bytes
 from PIL import Image
-import io
+import logging
+import os
 import json
 import re
 import asyncio
+import hashlib
 import time
-from typing import List
+from contextlib import asynccontextmanager
+from typing import List, Optional
 from langchain_core.runnables import RunnableLambda, Runnable
 from dotenv import load_dotenv
 import pillow_heif
+from src.result_cache import ResultCache, make_cache_key
+from src.translation_cache import TranslationCache, start_request_stats, current_request_stats
+from src.llm_scheduler import LLMScheduler, estimate_tokens
+from src.ocr_engine import create_ocr_engine
+from src.stream_parser import IncrementalJsonArrayItemParser
+from src.page_packing import PageChunk, pack_pages, attribute_chunk_results
+from src.page_triage import DuplicatePageDetector, fingerprint_page, has_enough_text
+from src.pdf_rasterizer import PdfRasterizer
+from src.memory_budget import MemoryBudget, image_bytes
+from src.image_preprocess import ImagePreprocessor, reduced_decode_size
+from src.ocr_layout import join_tile_texts, split_into_tiles
+from src.pdf_text_layer import extract_text_layer, is_usable_text_layer
+from src.job_store import JobStore
+from src.upload_spool import SpooledUpload, UploadTooLargeError, open_upload, spool_upload
+from src.multipart_stream import MultipartFile, TooManyFilesError, iter_multipart_files
+from src.single_flight import SingleFlight
+from src.admission import AdmissionController, AdmissionRejected, AdmissionTicket
+from src.fair_queue import FairSemaphore, set_flow
+from src.logging_setup import setup_logging
+from src.tracing import TraceExporter, set_trace_exporter, new_request_id, set_request_id, current_request_id, start_trace, span, traced
+from src.metrics import (
+    FILE_READ_SECONDS, OCR_PAGE_SECONDS, OCR_PREPROCESS_SECONDS, LLM_PARSE_SECONDS, TRANSLATION_SECONDS,
+    PAGES_TOTAL, MENUS_TOTAL, ERRORS_TOTAL, CACHE_HITS_TOTAL, CACHE_MISSES_TOTAL,
+    LLM_CALLS_IN_FLIGHT,
+    set_request_labels, observe, count, in_flight, track_request, render_metrics,
+)
 
 load_dotenv()
 
+# 로그는 큐를 거쳐 별도 스레드에서 출력 (LOG_LEVEL=DEBUG이면 [DEBUG] 로그도 출력)
+setup_logging(os.getenv("LOG_LEVEL", "INFO"))
+logger = logging.getLogger(__name__)
+
 pillow_heif.register_heif_opener() # image/heic 파일도 읽을 수 있도록 등록
 
 # tesseract 경로 지정 for ec2
@@ -26,9 +59,19 @@ pillow_heif.register_heif_opener() # image/heic 파일도 읽을 수 있도록 
 pytesseract.pytesseract.tesseract_cmd = "/usr/bin/tesseract"  # which tesseract 출력값
 
 # --- FastAPI App Initialization ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """시작 시 비동기 작업 워커 시작, 종료 시 워커 취소 (start_job_workers / stop_job_workers는 아래 Async Jobs 참고)"""
+    await start_job_workers()
+    try:
+        yield
+    finally:
+        await stop_job_workers()
+
 app = FastAPI(
     title="Recipflash AI Server",
     description="AI server for recipe-related tasks using LangChain, including PDF and image processing.",
+    lifespan=lifespan,
 )
 
 # --- LLM Setup ---
@@ -40,6 +83,8 @@ app = FastAPI(
 # seed: 완전한 재현성 보장 (동일 입력 → 동일 출력)
 # response_format: JSON 형식 강제 (파싱 오류 방지)
 
+# 부하 테스트 시 OPENAI_BASE_URL=http://localhost:8100/v1로 지정하면 OpenAI 대신 openai_stub.py를 호출
+
 # 메뉴 파싱용 LLM (JSON mode)
 llm = ChatOpenAI(
     model="gpt-3.5-turbo-1106",  # JSON mode 지원 모델
@@ -57,36 +102,385 @@ llm_translate = ChatOpenAI(
     model_kwargs={"seed": 42}
 )
 
+# 일괄 번역용 LLM: 같은 번역 모델에 JSON mode만 적용 (번역 캐시를 단건 번역과 공유)
+llm_translate_batch = llm_translate.bind(response_format={"type": "json_object"})
+
+# --- Prompts ---
+# 프롬프트를 수정하면 PROMPT_VERSION이 바뀌어 이전 결과 캐시가 자동으로 무효화됩니다.
+MENU_PROMPT_TEMPLATE = """Extract menus from the recipe text and respond in json format.
+
+다음 레시피 텍스트에서 메뉴를 추출하여 JSON 형식으로 응답하세요.
+
+중요 규칙:
+1. 각 메뉴는 정확히 한 번만 포함하세요 (중복 제거)
+2. "아이스"와 "핫"은 별도 메뉴로 분리하지 마세요 (예: "아이스 아메리카노", "핫 아메리카노" → "아메리카노" 하나로)
+3. 사이즈 차이(Tall, Grande, Venti 등)는 별도 메뉴로 분리하지 마세요
+4. 명확하게 구분되는 메뉴만 추출하세요
+5. 모든 내용은 한국어여야 합니다
+
+Return json in this format:
+{{
+  "menus": [
+    {{"name": "메뉴이름", "ingredients": "재료1, 재료2, 재료3"}},
+    {{"name": "메뉴이름2", "ingredients": "재료1, 재료2"}}
+  ]
+}}
+
+Example json response:
+{{
+  "menus": [
+    {{"name": "아샷추", "ingredients": "아이스티 300ml, 샷"}},
+    {{"name": "카라멜 마끼아또", "ingredients": "카라멜소스 30g, 설탕시럽 2P, 스팀우유 250ml"}},
+    {{"name": "헤이즐넛아메리카노", "ingredients": "샷, 헤이즐넛시럽 2P"}}
+  ]
+}}
+
+레시피 텍스트:
+---
+{recipe_text}
+---
+
+json response:
+"""
+
+# 여러 페이지를 한 번에 보내는 묶음 호출용 (page_packing.PAGE_MARKER로 페이지를 구분하고 메뉴마다 페이지 번호를 받음)
+MENU_PACKED_PROMPT_TEMPLATE = """Extract menus from the recipe text and respond in json format.
+
+다음 레시피 텍스트에서 메뉴를 추출하여 JSON 형식으로 응답하세요.
+텍스트는 여러 페이지로 이루어져 있고, 각 페이지는 "=== PAGE 번호 ===" 줄로 시작합니다.
+
+중요 규칙:
+1. 각 메뉴에 그 메뉴가 나온 페이지 번호를 "page"(숫자)로 넣으세요
+2. 같은 페이지 안에서 각 메뉴는 정확히 한 번만 포함하세요 (중복 제거)
+3. "아이스"와 "핫"은 별도 메뉴로 분리하지 마세요 (예: "아이스 아메리카노", "핫 아메리카노" → "아메리카노" 하나로)
+4. 사이즈 차이(Tall, Grande, Venti 등)는 별도 메뉴로 분리하지 마세요
+5. 명확하게 구분되는 메뉴만 추출하세요
+6. 모든 내용은 한국어여야 합니다
+
+Return json in this format:
+{{
+  "menus": [
+    {{"page": 3, "name": "메뉴이름", "ingredients": "재료1, 재료2, 재료3"}},
+    {{"page": 4, "name": "메뉴이름2", "ingredients": "재료1, 재료2"}}
+  ]
+}}
+
+레시피 텍스트:
+---
+{recipe_text}
+---
+
+json response:
+"""
+
+TRANSLATION_PROMPT_TEMPLATE = "Translate the following text into Korean. Respond ONLY with the translated text, no extra words or explanations:\n{text}"
+
+BATCH_TRANSLATION_PROMPT_TEMPLATE = """Translate the "text" of every item into Korean and respond in json format.
+
+Rules:
+1. Return exactly one entry per item and keep each "id" exactly as given.
+2. Put ONLY the translated text in "text", no extra words or explanations.
+
+Return json in this format:
+{{
+  "translations": [
+    {{"id": "t0", "text": "번역1"}},
+    {{"id": "t1", "text": "번역2"}}
+  ]
+}}
+
+Items:
+{items_json}
+
+json response:
+"""
+
+PROMPT_VERSION = hashlib.sha256(
+    (MENU_PROMPT_TEMPLATE + MENU_PACKED_PROMPT_TEMPLATE + TRANSLATION_PROMPT_TEMPLATE + BATCH_TRANSLATION_PROMPT_TEMPLATE).encode("utf-8")
+).hexdigest()[:12]
+
+# 번역 방식: "batch" (페이지 단위 일괄 번역, 기본값) 또는 "single" (문자열마다 개별 호출)
+TRANSLATION_MODE = os.getenv("TRANSLATION_MODE", "batch")
+# 일괄 번역 1회 호출에 담을 최대 문자열 수
+TRANSLATION_BATCH_SIZE = int(os.getenv("TRANSLATION_BATCH_SIZE", "40"))
+# 토큰 스트리밍에서 완성된 메뉴를 모아 한 번에 번역: 최대 메뉴 수, 첫 메뉴 이후 최대 대기 시간(ms)
+STREAM_TRANSLATION_BATCH_MENUS = int(os.getenv("STREAM_TRANSLATION_BATCH_MENUS", "8"))
+STREAM_TRANSLATION_WINDOW_MS = int(os.getenv("STREAM_TRANSLATION_WINDOW_MS", "300"))
+
+# Tesseract OCR 언어
+OCR_LANG = "kor+eng"
+
+# --- Memory Budget ---
+# 페이지 렌더링/이미지 디코딩이 버퍼를 만들기 전에 예약하는 프로세스 전체 메모리 예산 (0이면 제한 없음)
+# 예산이 부족하면 대기하고, MEMORY_DEGRADE_AFTER_SECONDS 넘게 기다리면 낮은 해상도로 처리
+memory_budget = MemoryBudget(
+    limit_bytes=int(os.getenv("MEMORY_BUDGET_MB", "1024")) * 1024 * 1024,
+    degrade_after_seconds=float(os.getenv("MEMORY_DEGRADE_AFTER_SECONDS", "2")),
+)
+
+# --- PDF Rasterizer ---
+# pdftoppm 경로 지정 for ec2
+# TODO: 로컬 서버에서 None으로 변경 필요
+POPPLER_PATH = "/usr/bin"  # pdftoppm 위치
+
+# 페이지 범위 단위로 렌더링해 한 페이지씩 OCR로 넘김 (전체 문서를 한 번에 메모리에 올리지 않음)
+pdf_rasterizer = PdfRasterizer(
+    poppler_path=POPPLER_PATH,
+    batch_size=int(os.getenv("PDF_RASTER_BATCH_PAGES", "2")),
+    prefetch_pages=int(os.getenv("PDF_RASTER_PREFETCH_PAGES", "2")),
+    memory_budget=memory_budget,
+    degraded_dpi=int(os.getenv("PDF_RASTER_DEGRADED_DPI", "150")),
+)
+
+# 디지털 PDF 텍스트 레이어 사용 기준 (의미 있는 문자 수, 의미 있는 문자 비율)
+# 기준을 통과한 페이지는 래스터화 + OCR 없이 텍스트 레이어를 그대로 사용
+TEXT_LAYER_MIN_CHARS = int(os.getenv("TEXT_LAYER_MIN_CHARS", "20"))
+TEXT_LAYER_MIN_QUALITY = float(os.getenv("TEXT_LAYER_MIN_QUALITY", "0.6"))
+
+# 페이지 선별: 잉크 비율이 이보다 낮으면 빈 페이지, OCR 결과의 의미 있는 문자가 이보다 적으면 LLM 생략
+TRIAGE_BLANK_INK_RATIO = float(os.getenv("TRIAGE_BLANK_INK_RATIO", "0.002"))
+TRIAGE_MIN_TEXT_CHARS = int(os.getenv("TRIAGE_MIN_TEXT_CHARS", "10"))
+
+# 동시에 OCR하는 최대 페이지 수 (렌더링된 이미지가 메모리에 쌓이는 양의 상한)
+OCR_MAX_CONCURRENT_PAGES = int(os.getenv("OCR_MAX_CONCURRENT_PAGES", "0")) or os.cpu_count() or 1
+
+# --- OCR Engine ---
+# tesserocr 핸들 풀 (프로세스 재사용, 임시 파일 없음). 설치되어 있지 않으면 pytesseract로 폴백
+# OCR_BACKEND: auto | tesserocr | pytesseract
+ocr_engine = create_ocr_engine(
+    OCR_LANG,
+    backend=os.getenv("OCR_BACKEND", "auto"),
+    pool_size=int(os.getenv("OCR_POOL_SIZE", "0")) or None,  # 0이면 CPU 코어 수
+)
+
+# --- OCR Preprocessing ---
+# OCR 직전에 그레이스케일 → 축소 → 기울기 보정 → 글자 크기 맞춤 → 이진화 (PDF 페이지와 사진 모두)
+# JPEG 사진은 긴 변이 PREPROCESS_MAX_SIDE 이상으로 남는 범위에서 줄인 해상도로 바로 디코딩
+# PREPROCESS_ENABLED=false이면 기존처럼 원본 RGB 이미지를 그대로 OCR
+ocr_preprocessor = ImagePreprocessor(
+    max_side=int(os.getenv("PREPROCESS_MAX_SIDE", "2000")),
+    target_text_height=int(os.getenv("PREPROCESS_TARGET_TEXT_HEIGHT", "40")),  # 글자 줄 높이 (px)
+    deskew=os.getenv("PREPROCESS_DESKEW", "true").lower() == "true",
+    binarize=os.getenv("PREPROCESS_BINARIZE", "true").lower() == "true",
+) if os.getenv("PREPROCESS_ENABLED", "true").lower() == "true" else None
+
+async def preprocess_for_ocr(image, page: int):
+    """OCR 전처리 (단계별 시간은 span 속성과 recipflash_ocr_preprocess_seconds{step}에 기록)"""
+    if ocr_preprocessor is None:
+        return image
+    with span("ocr.preprocess", page=page) as preprocess_span:
+        image, timings = await asyncio.to_thread(ocr_preprocessor.process, image)
+        preprocess_span.set(width=image.width, height=image.height,
+                            **{f"{step}_seconds": round(seconds, 4) for step, seconds in timings.items()})
+    for step, seconds in timings.items():
+        observe(OCR_PREPROCESS_SECONDS, seconds, step=step)
+    logger.debug(f"[PREPROCESS] Page {page}: " + ", ".join(f"{step} {seconds * 1000:.0f}ms" for step, seconds in timings.items()))
+    return image
+
+# --- Fair Scheduling ---
+# 페이지 OCR과 LLM 호출은 요청/사용자(흐름)별로 번갈아 슬롯을 받음 (큰 카탈로그 뒤에서 사진 한 장이 오래 기다리지 않도록)
+# 흐름: X-User-ID 헤더가 있으면 사용자, 없으면 요청. 가중치: X-User-Tier 헤더 값을 FAIR_TIER_WEIGHTS에서 찾음 (없으면 1)
+FAIR_TIER_WEIGHTS = json.loads(os.getenv("FAIR_TIER_WEIGHTS", "{}"))  # 예: '{"free": 1, "pro": 4}'
+# 프로세스 전체 OCR 동시 실행 수 (OCR 엔진 풀 크기와 같게)
+ocr_scheduler = FairSemaphore(int(os.getenv("OCR_POOL_SIZE", "0")) or os.cpu_count() or 1)
+
+async def run_ocr(image) -> str:
+    """공정 대기열에서 OCR 슬롯을 받은 뒤 OCR 실행 (OCR 엔진은 동기 함수이므로 asyncio.to_thread로 실행)"""
+    async with ocr_scheduler.slot():
+        return await asyncio.to_thread(ocr_engine.image_to_string, image)
+
+# --- Tiled OCR ---
+# 큰 페이지 한 장은 레이아웃 분석(글자 블록/단)으로 타일을 나눠 OCR 슬롯 여러 개에서 동시에 OCR
+# 페이지가 여러 장이면 페이지끼리 코어를 나눠 쓰므로 타일 수 = OCR_MAX_TILES // 동시에 OCR하는 페이지 수
+OCR_MAX_TILES = int(os.getenv("OCR_MAX_TILES", "0")) or ocr_scheduler.capacity  # 1이면 나누지 않음
+OCR_TILE_MIN_PIXELS = int(os.getenv("OCR_TILE_MIN_PIXELS", "1000000"))  # 이보다 작은 이미지는 나누지 않음
+
+async def run_ocr_tiled(image, max_tiles: int) -> str:
+    """최대 max_tiles개 타일로 나눠 동시에 OCR하고 읽는 순서대로 이어 붙임 (나눌 수 없으면 run_ocr)"""
+    max_tiles = min(max_tiles, OCR_MAX_TILES)
+    if max_tiles <= 1 or image.width * image.height < OCR_TILE_MIN_PIXELS:
+        return await run_ocr(image)
+    with span("ocr.layout", max_tiles=max_tiles) as layout_span:
+        tiles = await asyncio.to_thread(split_into_tiles, image, max_tiles)
+        layout_span.set(tiles=len(tiles))
+    if len(tiles) == 1:
+        return await run_ocr(tiles[0])
+    logger.info(f"[PERF] OCR split into {len(tiles)} tiles")
+    texts = await asyncio.gather(*(run_ocr(tile) for tile in tiles))
+    return join_tile_texts(texts)
+
+# --- Result Cache ---
+# 캐시에 저장하는 값의 형식이 바뀌면 올려서 이전 항목이 히트되지 않도록 함
+RESULT_CACHE_FORMAT = "4"
+# 동일 파일 재업로드 시 OCR + LLM 전체를 건너뛰기 위한 캐시 (메모리 LRU + 디스크)
+result_cache = ResultCache(
+    cache_dir=os.getenv("RESULT_CACHE_DIR", ".cache/results"),
+    max_memory_bytes=int(os.getenv("RESULT_CACHE_MEMORY_MB", "64")) * 1024 * 1024,
+    max_disk_bytes=int(os.getenv("RESULT_CACHE_DISK_MB", "1024")) * 1024 * 1024,
+)
+
+# --- LLM Scheduler ---
+# 모든 LLM 호출이 거치는 공용 스케줄러 (모델별 동시 호출 수 + RPM/TPM 토큰 버킷)
+llm_scheduler = LLMScheduler.from_env(
+    max_in_flight=os.getenv("LLM_MAX_IN_FLIGHT", "16"),
+    rpm=os.getenv("LLM_RPM", "3000"),
+    tpm=os.getenv("LLM_TPM", "150000"),
+    overrides_json=os.getenv("LLM_LIMITS"),  # 모델별 설정 (JSON)
+)
+
+# 메뉴 파싱 응답 길이 추정치 (TPM 버킷 계산용)
+MENU_COMPLETION_TOKENS_ESTIMATE = 1000
+
+# --- Page Packing ---
+# 메뉴 추출 LLM 호출 단위: 작은 페이지(PAGE_PACK_SMALL_PAGE_TOKENS 이하)는 PAGE_PACK_MAX_TOKENS까지 묶어서 1회 호출,
+# PAGE_PACK_MAX_TOKENS를 넘는 페이지는 줄 단위로 나눠 병렬 호출
+PAGE_PACK_MAX_TOKENS = int(os.getenv("PAGE_PACK_MAX_TOKENS", "1500"))
+PAGE_PACK_SMALL_PAGE_TOKENS = int(os.getenv("PAGE_PACK_SMALL_PAGE_TOKENS", "300"))
+
+def pack_page_texts(recipe_text_list: List[str], page_indices: Optional[List[int]] = None) -> List[PageChunk]:
+    return pack_pages(recipe_text_list, llm.model_name, PAGE_PACK_MAX_TOKENS, PAGE_PACK_SMALL_PAGE_TOKENS, page_indices)
+
+# --- Translation Cache ---
+# 반복되는 메뉴/재료 문자열 번역을 LLM 없이 재사용 (프로세스 내 LRU + SQLite)
+translation_cache = TranslationCache(
+    db_path=os.getenv("TRANSLATION_CACHE_DB", ".cache/translations.sqlite3"),
+    max_memory_entries=int(os.getenv("TRANSLATION_CACHE_MEMORY_ENTRIES", "50000")),
+)
+
+# --- Upload Spool ---
+# 업로드는 메모리에 올리지 않고 스풀 파일에 저장 (비어 있으면 시스템 임시 디렉터리)
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", "")
+# 최대 업로드 크기 (0이면 제한 없음). 넘으면 413
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "100")) * 1024 * 1024
+# Content-Length로 미리 거절할 때 허용하는 multipart 헤더/경계 문자열 분량
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+# 배치 업로드 (POST /generate/menus/batch): 요청 전체 최대 크기와 최대 파일 수. 파일 하나는 MAX_UPLOAD_MB까지
+MAX_BATCH_UPLOAD_BYTES = int(os.getenv("MAX_BATCH_UPLOAD_MB", "300")) * 1024 * 1024
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "50"))
+
+# --- Job Store ---
+# POST /jobs로 등록한 비동기 작업의 상태/페이지별 결과 (SQLite) 와 업로드 파일 (서버 재시작 후 재처리용)
+job_store = JobStore(
+    db_path=os.getenv("JOB_STORE_DB", ".cache/jobs.sqlite3"),
+    upload_dir=os.getenv("JOB_UPLOAD_DIR", ".cache/job_uploads"),
+)
+# 동시에 처리하는 작업 수 (작업 하나 안에서도 페이지는 병렬 처리됨)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+# --- Tracing ---
+# 요청별 단계/LLM 호출 span을 JSONL 파일에 기록 (GET /traces/{request_id}로 조회)
+trace_exporter = TraceExporter(
+    path=os.getenv("TRACE_FILE", ".cache/traces/traces.jsonl"),
+    max_bytes=int(os.getenv("TRACE_FILE_MB", "50")) * 1024 * 1024,
+    backup_count=int(os.getenv("TRACE_FILE_BACKUPS", "5")),
+)
+set_trace_exporter(trace_exporter)
+
+# --- Request Coalescing ---
+# 같은 파일(결과 캐시 키)을 처리 중인 요청이 있으면 새 파이프라인을 시작하지 않고 그 결과/이벤트 스트림을 공유
+single_flight = SingleFlight()
+
+# --- Admission Control ---
+# 업로드 엔드포인트가 새 파이프라인을 시작하기 전 승인 검사. 포화 상태면 429 (대기열 가득) / 503 (작업량 초과) + Retry-After
+# 각 기준은 0이면 검사하지 않음. 예상 완료 시간 = (처리 중인 페이지 + 새 요청 페이지) × 페이지당 시간 / 동시 처리 페이지 수
+admission = AdmissionController(
+    max_running=int(os.getenv("ADMISSION_MAX_RUNNING", "8")),        # 동시에 실행하는 업로드 파이프라인 수
+    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "16")),           # 실행 슬롯을 기다릴 수 있는 요청 수
+    max_pages=int(os.getenv("ADMISSION_MAX_PAGES", "300")),          # 승인된 요청들의 페이지 합 상한
+    deadline_seconds=float(os.getenv("ADMISSION_DEADLINE_SECONDS", "120")),
+    page_seconds=float(os.getenv("ADMISSION_PAGE_SECONDS", "3")),    # 페이지 하나의 처리 시간 초기값 (이후 완료된 요청으로 갱신)
+    page_concurrency=int(os.getenv("ADMISSION_PAGE_CONCURRENCY", "0")) or OCR_MAX_CONCURRENT_PAGES,
+)
+
+def result_cache_key(content_hash: str) -> str:
+    """업로드 파일 SHA-256(스풀할 때 계산)과 처리 설정으로 결과 캐시 키 생성"""
+    preprocess_tag = ocr_preprocessor.cache_tag if ocr_preprocessor else "none"
+    return make_cache_key(content_hash, RESULT_CACHE_FORMAT, OCR_LANG, preprocess_tag, llm.model_name, llm_translate.model_name, PROMPT_VERSION)
+
 # --- API Models ---
 class Menu(BaseModel):
     name: str = Field(description="메뉴 이름")
     ingredients: str = Field(description="메뉴 재료")
+    # 묶음 호출에서 모델이 알려준 페이지 번호 (결과를 페이지별로 나눌 때만 쓰고 응답에는 포함하지 않음)
+    page: Optional[int] = Field(default=None, exclude=True)
+
+class PageInfo(BaseModel):
+    page: int = Field(description="페이지 번호 (1부터 시작)")
+    source: str = Field(description="텍스트 추출 경로: text_layer (PDF 텍스트 레이어) 또는 ocr")
+    triage: str = Field(default="ok", description="페이지 선별 결과: ok, blank (빈 페이지), duplicate (중복 페이지), near_duplicate (거의 같은 페이지, OCR 결과 재사용), low_text (텍스트 부족)")
+    duplicate_of: Optional[int] = Field(default=None, description="중복 페이지인 경우 원본 페이지 번호")
+
+    def event_fields(self) -> dict:
+        """스트리밍 progress 이벤트에 붙이는 페이지 정보"""
+        return {"source": self.source, "triage": self.triage, "duplicate_of": self.duplicate_of}
 
 class MenuResponse(BaseModel):
     menus: list[Menu]
+    pages: Optional[list[PageInfo]] = None
+
+class JobPageResult(BaseModel):
+    page: int = Field(description="페이지 번호 (1부터 시작)")
+    menus: list[Menu]
+    page_time: float = Field(description="페이지 처리 시간 (초)")
+    page_info: Optional[PageInfo] = None
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str = Field(description="queued, running, succeeded, failed")
+    filename: Optional[str] = None
+    total_pages: Optional[int] = Field(default=None, description="페이지 수 (텍스트 추출이 시작되기 전에는 None)")
+    completed_pages: int = 0
+    pages: list[JobPageResult] = Field(default_factory=list, description="지금까지 끝난 페이지 결과 (페이지 순서)")
+    menus: list[Menu] = Field(default_factory=list, description="끝난 페이지들의 메뉴 (페이지 순서)")
+    error: Optional[str] = None
+    queue_time: Optional[float] = Field(default=None, description="대기 시간 (초)")
+    processing_time: Optional[float] = Field(default=None, description="처리 시간 (초, 실행 중이면 지금까지)")
+
+# Common alternative field names mapping
+MENU_FIELD_RENAMES = {
+    "question": "name",
+    "answer": "ingredients",
+    "q": "name",
+    "a": "ingredients",
+    "front": "name",
+    "back": "ingredients",
+    "description": "ingredients",
+    "title": "name",
+    "content": "ingredients",
+    "recipe": "name",
+    "item": "name",
+    "details": "ingredients",
+    "term": "name",
+    "definition": "ingredients",
+    "prompt": "name",
+    "response": "ingredients",
+}
+
+def menu_page_number(value) -> Optional[int]:
+    """LLM이 돌려준 페이지 번호 (숫자가 아니면 None)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def menu_from_dict(item: dict) -> Optional[Menu]:
+    """LLM이 만든 객체 하나를 Menu로 변환 (필드 이름 보정, name이 없으면 None)"""
+    processed_item = {}
+    for key, value in item.items():
+        new_key = MENU_FIELD_RENAMES.get(key.lower(), key)
+        processed_item[new_key] = value
+
+    if "name" not in processed_item:
+        return None
+    return Menu(
+        name=str(processed_item["name"]),
+        ingredients=str(processed_item.get("ingredients", "")),
+        page=menu_page_number(processed_item.get("page")),
+    )
 
 def parse_llm_response_to_menus(llm_output: str) -> List[Menu]:
     menus_list = []
-
-    # Common alternative field names mapping
-    field_renames = {
-        "question": "name",
-        "answer": "ingredients",
-        "q": "name",
-        "a": "ingredients",
-        "front": "name",
-        "back": "ingredients",
-        "description": "ingredients",
-        "title": "name",
-        "content": "ingredients",
-        "recipe": "name",
-        "item": "name",
-        "details": "ingredients",
-        "term": "name",
-        "definition": "ingredients",
-        "prompt": "name",
-        "response": "ingredients",
-    }
+    field_renames = MENU_FIELD_RENAMES
 
     # Strategy 1: Look for JSON array directly, potentially within markdown code blocks
     json_patterns = [
@@ -112,7 +506,8 @@ def parse_llm_response_to_menus(llm_output: str) -> List[Menu]:
                                 processed_item["ingredients"] = str(processed_item.get("ingredients", ""))
                                 menus_list.append(Menu(
                                     name=str(processed_item["name"]),
-                                    ingredients=processed_item["ingredients"]
+                                    ingredients=processed_item["ingredients"],
+                                    page=menu_page_number(processed_item.get("page"))
                                 ))
                     return menus_list # Return the list, even if it's empty
             except json.JSONDecodeError:
@@ -170,7 +565,8 @@ def parse_llm_response_to_menus(llm_output: str) -> List[Menu]:
                         processed_item["ingredients"] = str(processed_item.get("ingredients", ""))
                         menus_list.append(Menu(
                             name=str(processed_item["name"]),
-                            ingredients=processed_item["ingredients"]
+                            ingredients=processed_item["ingredients"],
+                            page=menu_page_number(processed_item.get("page"))
                         ))
             return menus_list # Return the list, even if it's empty
     except json.JSONDecodeError:
@@ -183,14 +579,113 @@ def parse_llm_response_to_menus(llm_output: str) -> List[Menu]:
 # or a more sophisticated language detection and translation mechanism.
 # For this example, we'll use a simple LLM call for translation.
 async def translate_to_korean_llm(text: str) -> str:
-    translation_prompt = PromptTemplate.from_template(
-        "Translate the following text into Korean. Respond ONLY with the translated text, no extra words or explanations:\n{text}"
-    )
+    # 캐시 히트 시 LLM 호출 생략
+    cached = await translation_cache.get(text, llm_translate.model_name)
+    if cached is not None:
+        count(CACHE_HITS_TOTAL, cache="translation")
+        return cached
+    count(CACHE_MISSES_TOTAL, cache="translation")
+
+    translated_text = await translate_to_korean_llm_uncached(text)
+    await translation_cache.put(text, llm_translate.model_name, translated_text)
+    return translated_text
+
+async def translate_to_korean_llm_uncached(text: str) -> str:
+    translation_prompt = PromptTemplate.from_template(TRANSLATION_PROMPT_TEMPLATE)
     # Use translation LLM (without JSON mode)
     chain = translation_prompt | llm_translate | (lambda x: x.content)
-    translated_text = await chain.ainvoke({"text": text})
+    estimated = estimate_tokens(TRANSLATION_PROMPT_TEMPLATE + text, completion_tokens=estimate_tokens(text) * 2)
+    with span("llm.translate", model=llm_translate.model_name, estimated_tokens=estimated):
+        async with llm_scheduler.slot(llm_translate.model_name, estimated):
+            with in_flight(LLM_CALLS_IN_FLIGHT, model=llm_translate.model_name):
+                translated_text = await chain.ainvoke({"text": text})
     return translated_text.strip()
 
+async def translate_batch_llm(texts: List[str]) -> dict:
+    """
+    여러 문자열을 한 번의 JSON mode 호출로 번역
+    반환: {원문: 번역문} (응답에서 누락되었거나 형식이 잘못된 항목은 포함되지 않음)
+    """
+    ids = {f"t{i}": text for i, text in enumerate(texts)}
+    items_json = json.dumps([{"id": item_id, "text": text} for item_id, text in ids.items()], ensure_ascii=False)
+
+    batch_prompt = PromptTemplate(template=BATCH_TRANSLATION_PROMPT_TEMPLATE, input_variables=["items_json"])
+    chain = batch_prompt | llm_translate_batch | (lambda x: x.content)
+    estimated = estimate_tokens(BATCH_TRANSLATION_PROMPT_TEMPLATE + items_json, completion_tokens=estimate_tokens(items_json) * 2)
+    with span("llm.translate_batch", model=llm_translate.model_name, items=len(texts), estimated_tokens=estimated):
+        async with llm_scheduler.slot(llm_translate.model_name, estimated):
+            with in_flight(LLM_CALLS_IN_FLIGHT, model=llm_translate.model_name):
+                llm_output = await chain.ainvoke({"items_json": items_json})
+
+    translated = {}
+    try:
+        data = json.loads(llm_output)
+    except json.JSONDecodeError:
+        logger.warning(f"[TRANSLATION] Batch response is not valid JSON, falling back for {len(texts)} items")
+        return translated
+
+    entries = data.get("translations", []) if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        return translated
+
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        source = ids.get(str(entry.get("id")))
+        text = entry.get("text")
+        if source is not None and isinstance(text, str) and text.strip():
+            translated[source] = text.strip()
+    return translated
+
+@traced("translate_texts_to_korean")
+async def translate_texts_to_korean(texts: List[str]) -> dict:
+    """
+    일괄 번역: 캐시 확인 → 미스만 묶어서 배치 호출 → 왕복에 실패한 항목만 단건 호출
+    반환: {원문: 번역문}
+    """
+    unique_texts = list(dict.fromkeys(texts))
+    translated = {}
+
+    cached_results = await asyncio.gather(*[translation_cache.get(text, llm_translate.model_name) for text in unique_texts])
+    misses = []
+    for text, cached in zip(unique_texts, cached_results):
+        if cached is not None:
+            translated[text] = cached
+        else:
+            misses.append(text)
+
+    count(CACHE_HITS_TOTAL, len(unique_texts) - len(misses), cache="translation")
+    count(CACHE_MISSES_TOTAL, len(misses), cache="translation")
+    if not misses:
+        return translated
+
+    batches = [misses[i:i + TRANSLATION_BATCH_SIZE] for i in range(0, len(misses), TRANSLATION_BATCH_SIZE)]
+    batch_results = await asyncio.gather(*[translate_batch_llm(batch) for batch in batches], return_exceptions=True)
+
+    fresh = {}
+    for batch, result in zip(batches, batch_results):
+        if isinstance(result, Exception):
+            logger.warning(f"[TRANSLATION] Batch call failed ({result}), falling back for {len(batch)} items")
+            continue
+        fresh.update(result)
+
+    # 배치에서 돌아오지 않은 항목만 단건 번역으로 재시도
+    failed = [text for text in misses if text not in fresh]
+    if failed:
+        logger.warning(f"[TRANSLATION] {len(failed)}/{len(misses)} items failed to round-trip, translating individually")
+        single_results = await asyncio.gather(*[translate_to_korean_llm_uncached(text) for text in failed])
+        fresh.update(zip(failed, single_results))
+
+    logger.info(f"[TRANSLATION] {len(unique_texts)} unique strings: {len(unique_texts) - len(misses)} cached, "
+                f"{len(misses) - len(failed)} via {len(batches)} batch call(s), {len(failed)} individually")
+
+    await asyncio.gather(*[translation_cache.put(text, llm_translate.model_name, result) for text, result in fresh.items()])
+    translated.update(fresh)
+    return translated
+
+def contains_korean(text: str) -> bool:
+    return any('\uac00' <= char <= '\ud7a3' for char in text)
+
 # ===== 변경 전 코드 (순차 번역) =====
 # 성능 비교를 위해 아래 주석을 해제하고 "변경 후 코드" 부분을 주석 처리하면
 # 변경 전 순차 처리 방식으로 실행됩니다.
@@ -214,11 +709,15 @@ async def translate_to_korean_llm(text: str) -> str:
 # ===== 변경 전 코드 끝 =====
 
 # ===== 변경 후 코드 (병렬 번역) =====
+@traced("translate_menus_to_korean")
 async def translate_menus_to_korean(menus: List[Menu]) -> List[Menu]:
+    if TRANSLATION_MODE == "batch":
+        return await translate_menus_to_korean_batch(menus)
+
     # 병렬 번역: 모든 번역 작업을 동시에 실행
     async def translate_single_menu(menu: Menu) -> Menu:
-        is_korean_menu = any('\uac00' <= char <= '\ud7a3' for char in menu.name)
-        is_korean_ingredients = any('\uac00' <= char <= '\ud7a3' for char in menu.ingredients)
+        is_korean_menu = contains_korean(menu.name)
+        is_korean_ingredients = contains_korean(menu.ingredients)
 
         # 번역이 필요한 경우에만 비동기 작업 생성
         name_task = translate_to_korean_llm(menu.name) if not is_korean_menu else None
@@ -241,128 +740,349 @@ async def translate_menus_to_korean(menus: List[Menu]) -> List[Menu]:
             new_menu = menu.name
             new_ingredients = menu.ingredients
 
-        return Menu(name=new_menu, ingredients=new_ingredients)
+        return Menu(name=new_menu, ingredients=new_ingredients, page=menu.page)
 
     # 모든 메뉴 번역을 병렬로 처리
     translated_menus = await asyncio.gather(*[translate_single_menu(menu) for menu in menus])
     return translated_menus
+
+async def translate_menus_to_korean_batch(menus: List[Menu]) -> List[Menu]:
+    # 번역이 필요한 문자열을 모두 모아 몇 번의 호출로 처리한 뒤 메뉴에 다시 매핑
+    texts = []
+    for menu in menus:
+        if not contains_korean(menu.name) and menu.name.strip():
+            texts.append(menu.name)
+        if not contains_korean(menu.ingredients) and menu.ingredients.strip():
+            texts.append(menu.ingredients)
+
+    if not texts:
+        return list(menus)
+
+    translated = await translate_texts_to_korean(texts)
+    return [
+        Menu(
+            name=translated.get(menu.name, menu.name) if not contains_korean(menu.name) else menu.name,
+            ingredients=translated.get(menu.ingredients, menu.ingredients) if not contains_korean(menu.ingredients) else menu.ingredients,
+            page=menu.page,
+        )
+        for menu in menus
+    ]
 # ===== 변경 후 코드 끝 =====
 
 # --- Helper function to extract text from PDF ---
-async def extract_text_from_pdf(file_content: bytes) -> List[str]:
-    try:
-        start_time = time.time()
-        print(f"[PERF] Starting PDF to image conversion...")
-
-        # pdftoppm 경로 지정 for ec2
-        conversion_start = time.time()
-        # TODO: 로컬 서버에서 주석 처리 필요
-        images = convert_from_bytes(file_content, poppler_path="/usr/bin") # pdftoppm 위치
-        # images = convert_from_bytes(file_content) # pdftoppm 위치
-        conversion_time = time.time() - conversion_start
-        print(f"[PERF] PDF to image conversion took {conversion_time:.2f}s for {len(images)} pages")
-
-        # 병렬 OCR 처리
-        async def ocr_single_page(index: int, image):
-            page_ocr_start = time.time()
-            # pytesseract는 동기 함수이므로 asyncio.to_thread로 비동기 실행
-            text = await asyncio.to_thread(pytesseract.image_to_string, image, 'kor+eng')
-            page_ocr_time = time.time() - page_ocr_start
+async def iter_text_from_pdf(upload: SpooledUpload):
+    """
+    페이지별 텍스트를 준비되는 대로 (페이지 인덱스, 전체 페이지 수, 텍스트, PageInfo)로 내보냄
+    - 텍스트 레이어가 품질 기준을 통과한 페이지: 바로 내보냄 (source="text_layer")
+    - 나머지(스캔) 페이지: 렌더링되는 대로 선별 → OCR하고 끝나는 대로 내보냄 (source="ocr")
+      빈 페이지, 중복 페이지, 텍스트가 거의 없는 페이지는 빈 텍스트로 내보내 LLM 단계를 건너뜀
+    완료 순서로 내보내므로 호출 측에서 순서가 필요하면 인덱스로 정렬해야 함
+    """
+    start_time = time.time()
+
+    # 동시에 OCR 중인 페이지 수를 제한해 렌더링된 이미지가 쌓이지 않도록 함
+    ocr_slots = asyncio.Semaphore(OCR_MAX_CONCURRENT_PAGES)
+    page_texts = asyncio.Queue()
+    end_of_pages = object()
+    duplicates = DuplicatePageDetector()
 
+    async def ocr_single_page(index: int, total_pages: int, image, reservation, max_tiles: int):
+        page_info = PageInfo(page=index + 1, source="ocr")
+        text_future = None
+        try:
+            # OCR 전 선별: 빈 페이지 / 같은 문서 내 중복 페이지
+            with span("triage.fingerprint", page=index + 1):
+                fingerprint = await asyncio.to_thread(fingerprint_page, image, TRIAGE_BLANK_INK_RATIO)
+            duplicate = None if fingerprint.blank else duplicates.find(fingerprint)
+            if fingerprint.blank:
+                page_info.triage = "blank"
+            elif duplicate is not None:
+                page_info.triage = "duplicate" if duplicate[2] else "near_duplicate"
+                page_info.duplicate_of = duplicate[0] + 1
+            else:
+                text_future = duplicates.register(index, fingerprint)
+                image = await preprocess_for_ocr(image, index + 1)
+                page_ocr_start = time.time()
+                with span("ocr.page", page=index + 1) as ocr_span:
+                    text = await run_ocr_tiled(image, max_tiles)
+                    ocr_span.set(chars=len(text))
+                page_ocr_time = time.time() - page_ocr_start
+                observe(OCR_PAGE_SECONDS, page_ocr_time)
+                text_future.set_result(text)
+        except Exception as e:
+            if text_future is not None and not text_future.done():
+                text_future.set_exception(e)  # 이 페이지를 기다리는 중복 페이지도 같이 실패
+            raise
+        finally:
+            ocr_slots.release()
+            del image
+            reservation.release()  # 이미지를 놓았으므로 메모리 예산 반납
+
+        if page_info.triage == "blank":
+            logger.info(f"[TRIAGE] Page {index+1} is blank (ink ratio {fingerprint.ink_ratio:.4f}) - skipping OCR and LLM")
+            page_texts.put_nowait((index, total_pages, "", page_info))
+            return
+
+        if page_info.triage == "duplicate":
+            # 픽셀까지 같은 페이지: 원본에서 같은 메뉴가 나오므로 OCR과 LLM 모두 생략
+            logger.info(f"[TRIAGE] Page {index+1} is identical to page {page_info.duplicate_of} - skipping OCR and LLM")
+            page_texts.put_nowait((index, total_pages, "", page_info))
+            return
+
+        if page_info.triage == "near_duplicate":
+            # 거의 같은 페이지: 원본 페이지의 OCR 결과를 재사용 (Tesseract 생략), LLM은 그대로 실행
+            text = await duplicate[1]
+            logger.info(f"[TRIAGE] Page {index+1} nearly duplicates page {page_info.duplicate_of} - reusing OCR output ({len(text)} chars)")
+        else:
             # OCR 변동성 확인을 위한 로깅
             text_preview = text[:100].replace('\n', ' ') if len(text) > 100 else text.replace('\n', ' ')
-            print(f"[PERF] OCR for page {index+1} took {page_ocr_time:.2f}s (length: {len(text)} chars)")
-            print(f"[DEBUG] OCR preview: {text_preview}...")
-
-            return (index, text)
-
-        ocr_start = time.time()
-        print(f"[PERF] Starting parallel OCR for {len(images)} pages...")
+            logger.info(f"[PERF] OCR for page {index+1} took {page_ocr_time:.2f}s (length: {len(text)} chars)")
+            logger.debug(f"[DEBUG] OCR preview: {text_preview}...")
 
-        # 모든 페이지를 병렬로 OCR 처리
-        tasks = [ocr_single_page(i, image) for i, image in enumerate(images)]
-        results = await asyncio.gather(*tasks)
+        # OCR 후 선별: 사진/로고만 있는 페이지처럼 실제 텍스트가 거의 없으면 LLM 생략
+        if not has_enough_text(text, TRIAGE_MIN_TEXT_CHARS):
+            page_info.triage = "low_text"
+            logger.info(f"[TRIAGE] Page {index+1} has too little text - skipping LLM")
+            text = ""
 
-        # 순서대로 정렬
-        text_list = [text for index, text in sorted(results, key=lambda x: x[0])]
+        page_texts.put_nowait((index, total_pages, text, page_info))
 
-        total_ocr_time = time.time() - ocr_start
-        total_time = time.time() - start_time
-        print(f"[PERF] Total OCR time (parallel): {total_ocr_time:.2f}s")
-        print(f"[PERF] Total PDF extraction time: {total_time:.2f}s")
-
-        return text_list
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to extract text from PDF using OCR: {e}")
+    async def rasterize_and_dispatch():
+        tasks = []
+        with span("pdf.extract_text") as extract_span:
+            try:
+                # 스풀 파일 경로를 pdfinfo / pdftotext / pdftoppm에 그대로 전달 (메모리 복사 없음)
+                pdf_path = upload.path
+                total_pages, page_size = await pdf_rasterizer.inspect(pdf_path)
+                extract_span.set(pages=total_pages)
+
+                # 텍스트 레이어가 쓸 만한 페이지는 OCR 생략
+                with span("pdf.text_layer"):
+                    text_layer = await extract_text_layer(pdf_path, total_pages, POPPLER_PATH)
+                ocr_pages = []
+                for index, text in enumerate(text_layer):
+                    if is_usable_text_layer(text, TEXT_LAYER_MIN_CHARS, TEXT_LAYER_MIN_QUALITY):
+                        page_texts.put_nowait((index, total_pages, text, PageInfo(page=index + 1, source="text_layer")))
+                    else:
+                        ocr_pages.append(index)
+                extract_span.set(text_layer_pages=total_pages - len(ocr_pages), ocr_pages=len(ocr_pages))
+                logger.info(f"[PERF] Text layer used for {total_pages - len(ocr_pages)}/{total_pages} pages, "
+                            f"OCR needed for {len(ocr_pages)} pages ({time.time() - start_time:.2f}s)")
+
+                # 페이지가 렌더링되는 대로 OCR 시작 (1페이지 OCR과 2페이지 렌더링이 겹침)
+                # OCR할 페이지가 적으면 남는 코어만큼 페이지를 타일로 나눠 OCR
+                max_tiles = OCR_MAX_TILES // max(1, min(len(ocr_pages), OCR_MAX_CONCURRENT_PAGES))
+                async for index, image, reservation in pdf_rasterizer.iter_pages(pdf_path, ocr_pages, page_size):
+                    if not tasks:
+                        logger.info(f"[PERF] First OCR page rasterized in {time.time() - start_time:.2f}s")
+                    try:
+                        await ocr_slots.acquire()
+                    except BaseException:
+                        reservation.release()
+                        raise
+                    tasks.append(asyncio.create_task(ocr_single_page(index, total_pages, image, reservation, max_tiles)))
+                    del image  # OCR 태스크가 끝나면 이미지가 바로 해제되도록 참조를 놓음
+
+                if ocr_pages:
+                    logger.info(f"[PERF] PDF rasterization finished in {time.time() - start_time:.2f}s for {len(ocr_pages)} pages")
+                await asyncio.gather(*tasks)
+
+                logger.info(f"[PERF] Total PDF extraction time (pipelined): {time.time() - start_time:.2f}s")
+                page_texts.put_nowait(end_of_pages)
+            except Exception as e:
+                # 렌더링이나 한 페이지 OCR이 실패하면 나머지 OCR도 멈추고 (OCR 슬롯/메모리 예산 반납) 끝난 뒤 오류 전달
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                page_texts.put_nowait(e)
+            except asyncio.CancelledError:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+    dispatcher = asyncio.create_task(rasterize_and_dispatch())
+    try:
+        while True:
+            item = await page_texts.get()
+            if item is end_of_pages:
+                break
+            if isinstance(item, Exception):
+                raise HTTPException(status_code=500, detail=f"Failed to extract text from PDF using OCR: {item}")
+            count(PAGES_TOTAL, source=item[3].source, triage=item[3].triage)
+            yield item
+    finally:
+        if not dispatcher.done():
+            dispatcher.cancel()
+
+async def extract_text_from_pdf(upload: SpooledUpload) -> List[str]:
+    results = [(index, text) async for index, _, text, _ in iter_text_from_pdf(upload)]
+
+    # 순서대로 정렬
+    return [text for index, text in sorted(results, key=lambda x: x[0])]
 
 # --- Helper function to extract text from an image ---
-async def extract_text_from_image(file_content: bytes) -> List[str]:
+@traced("extract_text_from_image")
+async def extract_text_from_image(upload: SpooledUpload, max_tiles: int = OCR_MAX_TILES) -> List[str]:
+    """max_tiles: 타일 OCR 최대 타일 수 (여러 이미지를 동시에 OCR하면 이미지 수로 나눈 값을 넘김)"""
     try:
         start_time = time.time()
-        print(f"[PERF] Starting image OCR...")
-
-        image = Image.open(io.BytesIO(file_content))
-        image = image.convert("RGB")  # OCR용으로 안전하게 변환
-
-        ocr_start = time.time()
-        # Use Tesseract to do OCR on the image (async)
-        text = await asyncio.to_thread(pytesseract.image_to_string, image, 'kor+eng')
-        ocr_time = time.time() - ocr_start
+        logger.info(f"[PERF] Starting image OCR...")
+
+        # 스풀 파일에서 바로 디코딩 (업로드 바이트를 메모리에 복사하지 않음)
+        # Image.open은 헤더만 읽으므로 픽셀 버퍼를 만들기 전에 크기만큼 메모리 예산 예약
+        image = Image.open(upload.path)
+        width, height = image.size
+        # 전처리에서 어차피 축소하므로 JPEG은 처음부터 줄인 해상도로 디코딩
+        decode_size = reduced_decode_size(image, ocr_preprocessor.max_side) if ocr_preprocessor else (width, height)
+        sizes = [image_bytes(*decode_size)]
+        if image.format == "JPEG":  # JPEG은 절반 해상도로 바로 디코딩할 수 있으므로 예산이 부족하면 낮춤
+            sizes.append(image_bytes(decode_size[0] // 2, decode_size[1] // 2))
+        with span("memory.reserve") as reserve_span:
+            reservation = await memory_budget.reserve(sizes)
+            reserve_span.set(bytes=reservation.nbytes, degraded=reservation.degraded)
+
+        with reservation:
+            if reservation.degraded:
+                logger.info(f"[MEMORY] Decoding {width}x{height} image at half resolution")
+                decode_size = (decode_size[0] // 2, decode_size[1] // 2)
+            if ocr_preprocessor is not None:
+                # JPEG은 줄인 해상도의 그레이스케일로 바로 디코딩 (다른 형식은 draft가 아무것도 하지 않음)
+                image.draft("L", decode_size)
+                image = await preprocess_for_ocr(image, page=1)
+            else:
+                if reservation.degraded:
+                    image.draft("RGB", decode_size)
+                image = image.convert("RGB")  # OCR용으로 안전하게 변환
+
+            ocr_start = time.time()
+            # Use Tesseract to do OCR on the image (async)
+            with span("ocr.image") as ocr_span:
+                text = await run_ocr_tiled(image, max_tiles)
+                ocr_span.set(chars=len(text))
+            ocr_time = time.time() - ocr_start
+            del image
+        observe(OCR_PAGE_SECONDS, ocr_time)
 
         # OCR 변동성 확인을 위한 로깅
         text_preview = text[:100].replace('\n', ' ') if len(text) > 100 else text.replace('\n', ' ')
         total_time = time.time() - start_time
-        print(f"[PERF] Image OCR took {ocr_time:.2f}s (length: {len(text)} chars)")
-        print(f"[DEBUG] OCR preview: {text_preview}...")
-        print(f"[PERF] Total image extraction time: {total_time:.2f}s")
+        logger.info(f"[PERF] Image OCR took {ocr_time:.2f}s (length: {len(text)} chars)")
+        logger.debug(f"[DEBUG] OCR preview: {text_preview}...")
+        logger.info(f"[PERF] Total image extraction time: {total_time:.2f}s")
 
         return [text]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to extract text from image using OCR: {e}")
 
+async def iter_text_from_image(upload: SpooledUpload, max_tiles: int = OCR_MAX_TILES):
+    """iter_text_from_pdf와 같은 형식으로 단일 이미지 OCR 결과를 내보냄"""
+    text_list = await extract_text_from_image(upload, max_tiles)
+    text = text_list[0]
+    page_info = PageInfo(page=1, source="ocr")
+
+    # 텍스트가 거의 없는 사진은 LLM 생략
+    if not has_enough_text(text, TRIAGE_MIN_TEXT_CHARS):
+        page_info.triage = "low_text"
+        logger.info(f"[TRIAGE] Image has too little text - skipping LLM")
+        text = ""
+
+    count(PAGES_TOTAL, source=page_info.source, triage=page_info.triage)
+    yield 0, 1, text, page_info
+
+async def iter_text_from_image_parts(parts, expected_pages: int):
+    """
+    배치 업로드: multipart 파트(이미지)가 도착하는 대로 OCR을 시작해 iter_text_from_pdf와 같은 형식으로 내보냄 (완료 순서)
+    이미지 한 장이 페이지 하나. 전체 페이지 수는 파트를 모두 받기 전까지 max(expected_pages, 지금까지 받은 파트 수)
+    """
+    page_texts = asyncio.Queue()
+    end_of_pages = object()
+    received = 0
+    all_received = False
+    ocr_active = 0  # 지금 OCR 중인 이미지 수
+
+    async def ocr_part(index: int, part):
+        nonlocal ocr_active
+        if not (part.content_type or "").startswith("image/"):
+            raise HTTPException(status_code=400, detail=f"Unsupported file type in batch: {part.filename} ({part.content_type})")
+        # 이미지끼리 코어를 나눠 쓰므로 PDF 경로와 같이 타일 수를 동시에 OCR하는 이미지 수로 나눔
+        # (pages를 알려준 경우 곧 도착할 나머지 이미지도 동시에 OCR한다고 봄)
+        ocr_active += 1
+        try:
+            concurrent = min(max(ocr_active, expected_pages - index), OCR_MAX_CONCURRENT_PAGES)
+            max_tiles = OCR_MAX_TILES // max(1, concurrent)
+            with span("batch.part", page=index + 1, size_bytes=part.upload.size, max_tiles=max_tiles):
+                async for _, _, text, page_info in iter_text_from_image(part.upload, max_tiles):
+                    page_info.page = index + 1
+                    page_texts.put_nowait((index, text, page_info))
+        finally:
+            ocr_active -= 1
+
+    async def receive_parts():
+        nonlocal received, all_received
+        tasks = []
+        uploads = []
+        try:
+            async for part in parts:
+                logger.info(f"[BATCH] Part {received + 1} received ({part.filename}, {part.upload.size / (1024 * 1024):.2f}MB) - starting OCR")
+                uploads.append(part.upload)
+                tasks.append(asyncio.create_task(ocr_part(received, part)))
+                received += 1
+            all_received = True
+            await asyncio.gather(*tasks)
+            page_texts.put_nowait(end_of_pages)
+        except Exception as e:
+            page_texts.put_nowait(e)
+        finally:
+            # 스풀 파일은 OCR 태스크가 모두 끝난 뒤 삭제 (시작 전에 취소된 태스크의 파일도 포함)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for upload in uploads:
+                upload.release()
+
+    receiver = asyncio.create_task(receive_parts())
+    try:
+        while True:
+            item = await page_texts.get()
+            if item is end_of_pages:
+                break
+            if isinstance(item, Exception):
+                raise item
+            index, text, page_info = item
+            yield index, received if all_received else max(expected_pages, received), text, page_info
+    finally:
+        if not receiver.done():
+            receiver.cancel()
+
+def iter_page_texts(content_type: Optional[str], upload: SpooledUpload):
+    """파일 종류에 맞는 페이지 텍스트 이터레이터 (지원하지 않는 형식이면 None)"""
+    if content_type == "application/pdf":
+        return iter_text_from_pdf(upload)
+    if content_type and content_type.startswith("image/"):
+        return iter_text_from_image(upload)
+    return None
+
+@traced("extract_text")
+async def collect_page_texts(page_texts) -> tuple[List[str], List[PageInfo]]:
+    """페이지 텍스트 이터레이터를 끝까지 받아 페이지 순서대로 (텍스트 목록, 페이지 정보 목록) 반환"""
+    results = sorted([item async for item in page_texts], key=lambda x: x[0])
+    text_list = [text for _, _, text, _ in results]
+    page_infos = [page_info for _, _, _, page_info in results]
+    return text_list, page_infos
+
 # --- Helper function to generate menus from text ---
-async def generate_menus_from_text(recipe_text: str) -> MenuResponse:
+@traced("generate_menus_from_text")
+async def generate_menus_from_text(recipe_text: str, packed: bool = False) -> MenuResponse:
+    """packed=True: 여러 페이지를 묶은 텍스트 (메뉴마다 페이지 번호를 받아 Menu.page에 담음)"""
     start_time = time.time()
 
     if not recipe_text.strip():
         return MenuResponse(menus=[]) # Return empty if no text is provided
 
+    template = MENU_PACKED_PROMPT_TEMPLATE if packed else MENU_PROMPT_TEMPLATE
     menu_prompt = PromptTemplate(
-        template="""Extract menus from the recipe text and respond in json format.
-
-다음 레시피 텍스트에서 메뉴를 추출하여 JSON 형식으로 응답하세요.
-
-중요 규칙:
-1. 각 메뉴는 정확히 한 번만 포함하세요 (중복 제거)
-2. "아이스"와 "핫"은 별도 메뉴로 분리하지 마세요 (예: "아이스 아메리카노", "핫 아메리카노" → "아메리카노" 하나로)
-3. 사이즈 차이(Tall, Grande, Venti 등)는 별도 메뉴로 분리하지 마세요
-4. 명확하게 구분되는 메뉴만 추출하세요
-5. 모든 내용은 한국어여야 합니다
-
-Return json in this format:
-{{
-  "menus": [
-    {{"name": "메뉴이름", "ingredients": "재료1, 재료2, 재료3"}},
-    {{"name": "메뉴이름2", "ingredients": "재료1, 재료2"}}
-  ]
-}}
-
-Example json response:
-{{
-  "menus": [
-    {{"name": "아샷추", "ingredients": "아이스티 300ml, 샷"}},
-    {{"name": "카라멜 마끼아또", "ingredients": "카라멜소스 30g, 설탕시럽 2P, 스팀우유 250ml"}},
-    {{"name": "헤이즐넛아메리카노", "ingredients": "샷, 헤이즐넛시럽 2P"}}
-  ]
-}}
-
-레시피 텍스트:
----
-{recipe_text}
----
-
-json response:
-""",
+        template=template,
         input_variables=["recipe_text"],
     )
 
@@ -370,24 +1090,123 @@ json response:
     parsing_chain = menu_prompt | llm | (lambda x: x.content) | RunnableLambda(parse_llm_response_to_menus)
 
     llm_start = time.time()
-    parsed_menus = await parsing_chain.ainvoke({"recipe_text": recipe_text})
+    estimated = estimate_tokens(template + recipe_text, completion_tokens=MENU_COMPLETION_TOKENS_ESTIMATE)
+    with span("llm.parse", model=llm.model_name, chars=len(recipe_text), estimated_tokens=estimated) as llm_span:
+        async with llm_scheduler.slot(llm.model_name, estimated):
+            with in_flight(LLM_CALLS_IN_FLIGHT, model=llm.model_name):
+                parsed_menus = await parsing_chain.ainvoke({"recipe_text": recipe_text})
+        llm_span.set(menus=len(parsed_menus))
     llm_time = time.time() - llm_start
+    observe(LLM_PARSE_SECONDS, llm_time)
 
-    print(f"[PERF] LLM parsing took {llm_time:.2f}s, parsed {len(parsed_menus)} menus")
-    print(f"[DEBUG] Parsed menu names: {[menu.name for menu in parsed_menus[:3]]}..." if len(parsed_menus) > 3 else f"[DEBUG] Parsed menu names: {[menu.name for menu in parsed_menus]}")
+    logger.info(f"[PERF] LLM parsing took {llm_time:.2f}s, parsed {len(parsed_menus)} menus")
+    logger.debug(f"[DEBUG] Parsed menu names: {[menu.name for menu in parsed_menus[:3]]}..." if len(parsed_menus) > 3 else f"[DEBUG] Parsed menu names: {[menu.name for menu in parsed_menus]}")
 
     # Apply translation separately
     translation_start = time.time()
     translated_menus = await translate_menus_to_korean(parsed_menus)
     translation_time = time.time() - translation_start
+    observe(TRANSLATION_SECONDS, translation_time)
+    count(MENUS_TOTAL, len(translated_menus))
 
     total_time = time.time() - start_time
-    print(f"[PERF] Translation took {translation_time:.2f}s, result: {len(translated_menus)} menus")
-    print(f"[DEBUG] Final menu names: {[menu.name for menu in translated_menus[:3]]}..." if len(translated_menus) > 3 else f"[DEBUG] Final menu names: {[menu.name for menu in translated_menus]}")
-    print(f"[PERF] Total page processing took {total_time:.2f}s")
+    logger.info(f"[PERF] Translation took {translation_time:.2f}s, result: {len(translated_menus)} menus")
+    logger.debug(f"[DEBUG] Final menu names: {[menu.name for menu in translated_menus[:3]]}..." if len(translated_menus) > 3 else f"[DEBUG] Final menu names: {[menu.name for menu in translated_menus]}")
+    logger.info(f"[PERF] Total page processing took {total_time:.2f}s")
 
     return MenuResponse(menus=translated_menus)
 
+async def generate_menus_from_text_incremental(recipe_text: str, packed: bool = False):
+    """
+    토큰 스트리밍용: LLM 응답을 토큰 단위로 받으며 메뉴 객체가 닫히는 즉시 (번역 후) Menu를 내보냄
+    메뉴 순서는 LLM 응답 순서를 유지 (packed는 generate_menus_from_text와 같음)
+    """
+    if not recipe_text.strip():
+        return
+
+    start_time = time.time()
+    template = MENU_PACKED_PROMPT_TEMPLATE if packed else MENU_PROMPT_TEMPLATE
+    menu_prompt = PromptTemplate(
+        template=template,
+        input_variables=["recipe_text"],
+    )
+    # 토큰 청크를 그대로 받기 위해 content 추출/파싱 단계 없이 스트리밍
+    streaming_chain = menu_prompt | llm
+
+    # 번역 태스크를 메뉴 순서대로 전달 (완성된 메뉴를 잠깐 모아 한 번에 번역을 시작하고 LLM 스트림은 계속 읽음)
+    # 메뉴마다 번역을 호출하면 메뉴 수만큼 LLM 호출이 생기므로
+    # STREAM_TRANSLATION_BATCH_MENUS개가 모이거나 첫 메뉴 이후 STREAM_TRANSLATION_WINDOW_MS가 지나면 묶어서 보냄
+    pending = asyncio.Queue()
+    end_of_menus = object()
+    batch: List[Menu] = []
+    batch_started = 0.0
+
+    def flush_batch():
+        if batch:
+            pending.put_nowait(asyncio.create_task(translate_menus_to_korean(list(batch))))
+            batch.clear()
+
+    async def stream_and_translate():
+        nonlocal batch_started
+        try:
+            parser = IncrementalJsonArrayItemParser()
+            streamed_count = 0
+            estimated = estimate_tokens(template + recipe_text, completion_tokens=MENU_COMPLETION_TOKENS_ESTIMATE)
+            with span("llm.parse_stream", model=llm.model_name, chars=len(recipe_text), estimated_tokens=estimated) as llm_span:
+                async with llm_scheduler.slot(llm.model_name, estimated):
+                    with in_flight(LLM_CALLS_IN_FLIGHT, model=llm.model_name):
+                        async for chunk in streaming_chain.astream({"recipe_text": recipe_text}):
+                            for item in parser.feed(chunk.content):
+                                menu = menu_from_dict(item)
+                                if menu is None:
+                                    continue
+                                if streamed_count == 0:
+                                    llm_span.set(first_menu_ms=round((time.time() - start_time) * 1000, 2))
+                                    logger.info(f"[STREAM] First menu parsed after {time.time() - start_time:.2f}s")
+                                streamed_count += 1
+                                if not batch:
+                                    batch_started = time.time()
+                                batch.append(menu)
+                            if batch and (
+                                len(batch) >= STREAM_TRANSLATION_BATCH_MENUS
+                                or (time.time() - batch_started) * 1000 >= STREAM_TRANSLATION_WINDOW_MS
+                            ):
+                                flush_batch()
+                        flush_batch()
+                llm_span.set(menus=streamed_count)
+            observe(LLM_PARSE_SECONDS, time.time() - start_time)
+
+            # 배열 형태가 아닌 응답 등 증분 파싱으로 메뉴를 하나도 찾지 못하면 전체 응답으로 기존 파싱
+            if streamed_count == 0:
+                parsed_menus = parse_llm_response_to_menus(parser.text)
+                if parsed_menus:
+                    pending.put_nowait(asyncio.create_task(translate_menus_to_korean(parsed_menus)))
+
+            logger.info(f"[PERF] LLM streaming took {time.time() - start_time:.2f}s, streamed {streamed_count} menus")
+            pending.put_nowait(end_of_menus)
+        except Exception as e:
+            pending.put_nowait(e)
+
+    producer = asyncio.create_task(stream_and_translate())
+    try:
+        while True:
+            item = await pending.get()
+            if item is end_of_menus:
+                break
+            if isinstance(item, Exception):
+                raise item
+            for menu in await item:
+                count(MENUS_TOTAL)
+                yield menu
+    finally:
+        if not producer.done():
+            producer.cancel()
+        # 소비가 중간에 끝나면 아직 진행 중인 번역 묶음도 취소
+        while not pending.empty():
+            item = pending.get_nowait()
+            if isinstance(item, asyncio.Task):
+                item.cancel()
+
 # ===== 변경 전 코드 (순차 처리) =====
 # 성능 비교를 위해 아래 주석을 해제하고 "변경 후 코드" 부분을 주석 처리하면
 # 변경 전 순차 처리 방식으로 실행됩니다.
@@ -420,154 +1239,635 @@ json response:
 
 # ===== 변경 후 코드 (병렬 처리) =====
 async def generate_menus_from_text_util(recipe_text_list: List[str]) -> MenuResponse:
+    page_results = await generate_menus_per_page(recipe_text_list)
+
+    all_menus = []
+    for menu_response in page_results:
+        all_menus.extend(menu_response.menus)
+    return MenuResponse(menus=all_menus)
+
+@traced("generate_menus_per_page")
+async def generate_menus_per_page(recipe_text_list: List[str]) -> List[MenuResponse]:
+    """페이지별 메뉴 생성 결과를 페이지 순서대로 반환 (결과 캐시에 페이지 단위로 저장하기 위함)"""
     start_time = time.time()
 
-    # 단일 페이지는 순차 처리가 더 빠름 (병렬 오버헤드 방지)
-    if len(recipe_text_list) == 1:
-        print(f"\n{'='*60}")
-        print(f"[PERF] Single page - using SEQUENTIAL processing")
-        print(f"{'='*60}\n")
+    # 작은 페이지는 묶고 큰 페이지는 나눠서 LLM 호출 단위 구성
+    chunks = pack_page_texts(recipe_text_list)
+
+    # 모든 페이지가 선별 단계에서 비워졌으면 LLM 호출 없음
+    if not chunks:
+        logger.info(f"[PERF] No page needs LLM processing ({len(recipe_text_list)} page(s))")
+        return [MenuResponse(menus=[]) for _ in recipe_text_list]
+
+    # 호출이 1회뿐이면 순차 처리가 더 빠름 (병렬 오버헤드 방지)
+    if len(chunks) == 1:
+        logger.info(f"\n{'='*60}")
+        logger.info(f"[PERF] Single LLM call ({len(recipe_text_list)} page(s)) - using SEQUENTIAL processing")
+        logger.info(f"{'='*60}\n")
 
-        menu_response = await generate_menus_from_text(recipe_text_list[0])
+        menu_response = await generate_menus_from_text(chunks[0].text, chunks[0].packed)
         total_time = time.time() - start_time
 
-        print(f"\n{'='*60}")
-        print(f"[PERF] SUMMARY (SEQUENTIAL - Single Page):")
-        print(f"[PERF] Total menus generated: {len(menu_response.menus)}")
-        print(f"[PERF] Total time: {total_time:.2f}s")
-        print(f"{'='*60}\n")
+        logger.info(f"\n{'='*60}")
+        logger.info(f"[PERF] SUMMARY (SEQUENTIAL - Single Call):")
+        logger.info(f"[PERF] Total menus generated: {len(menu_response.menus)}")
+        logger.info(f"[PERF] Total time: {total_time:.2f}s")
+        logger.info(f"{'='*60}\n")
 
-        return menu_response
+        per_page = attribute_chunk_results(chunks, [menu_response.menus], len(recipe_text_list))
+        return [MenuResponse(menus=menus) for menus in per_page]
 
-    # 다중 페이지는 병렬 처리로 성능 향상
-    print(f"\n{'='*60}")
-    print(f"[PERF] Starting PARALLEL processing of {len(recipe_text_list)} pages")
-    print(f"{'='*60}\n")
+    # 다중 호출은 병렬 처리로 성능 향상
+    logger.info(f"\n{'='*60}")
+    logger.info(f"[PERF] Starting PARALLEL processing of {len(recipe_text_list)} pages in {len(chunks)} LLM calls")
+    logger.info(f"{'='*60}\n")
 
-    # 모든 페이지에 대해 병렬로 메뉴 생성 작업 실행
-    tasks = [generate_menus_from_text(recipe_text) for recipe_text in recipe_text_list]
+    # 모든 호출 단위에 대해 병렬로 메뉴 생성 작업 실행
+    tasks = [generate_menus_from_text(chunk.text, chunk.packed) for chunk in chunks]
     parallel_start = time.time()
     results = await asyncio.gather(*tasks)
     parallel_time = time.time() - parallel_start
 
-    # 결과 합치기
+    # 호출 단위 결과를 페이지별로 되돌림
+    per_page = attribute_chunk_results(chunks, [menu_response.menus for menu_response in results], len(recipe_text_list))
     all_menus = []
-    for i, menu_response in enumerate(results):
-        print(f"[PERF] Page {i+1} generated {len(menu_response.menus)} menus")
-        all_menus.extend(menu_response.menus)
+    for i, menus in enumerate(per_page):
+        logger.info(f"[PERF] Page {i+1} generated {len(menus)} menus")
+        all_menus.extend(menus)
 
     total_time = time.time() - start_time
     avg_time_per_page = total_time / len(recipe_text_list) if recipe_text_list else 0
 
-    print(f"\n{'='*60}")
-    print(f"[PERF] SUMMARY (PARALLEL):")
-    print(f"[PERF] Total pages: {len(recipe_text_list)}")
-    print(f"[PERF] Total menus generated: {len(all_menus)}")
-    print(f"[PERF] Parallel processing time: {parallel_time:.2f}s")
-    print(f"[PERF] Total time: {total_time:.2f}s")
-    print(f"[PERF] Average per page: {avg_time_per_page:.2f}s")
-    print(f"[PERF] Estimated sequential time: {avg_time_per_page * len(recipe_text_list):.2f}s")
-    print(f"[PERF] Speedup: {(avg_time_per_page * len(recipe_text_list)) / total_time:.2f}x")
-    print(f"{'='*60}\n")
-
-    return MenuResponse(menus=all_menus)
+    logger.info(f"\n{'='*60}")
+    logger.info(f"[PERF] SUMMARY (PARALLEL):")
+    logger.info(f"[PERF] Total pages: {len(recipe_text_list)}")
+    logger.info(f"[PERF] Total LLM calls: {len(chunks)}")
+    logger.info(f"[PERF] Total menus generated: {len(all_menus)}")
+    logger.info(f"[PERF] Parallel processing time: {parallel_time:.2f}s")
+    logger.info(f"[PERF] Total time: {total_time:.2f}s")
+    logger.info(f"[PERF] Average per page: {avg_time_per_page:.2f}s")
+    logger.info(f"[PERF] Estimated sequential time: {avg_time_per_page * len(recipe_text_list):.2f}s")
+    logger.info(f"[PERF] Speedup: {(avg_time_per_page * len(recipe_text_list)) / total_time:.2f}x")
+    logger.info(f"{'='*60}\n")
+
+    return [MenuResponse(menus=menus) for menus in per_page]
+
+@traced("generate_menus_for_page")
+async def generate_menus_for_page(recipe_text: str) -> MenuResponse:
+    """단일 페이지 처리: 토큰 예산을 넘는 페이지는 줄 단위로 나눠 병렬 호출 후 결과를 합침"""
+    chunks = pack_page_texts([recipe_text])
+    if not chunks:
+        return MenuResponse(menus=[])
+    if len(chunks) == 1:
+        return await generate_menus_from_text(chunks[0].text)
+
+    logger.info(f"[PERF] Oversized page split into {len(chunks)} LLM calls")
+    results = await asyncio.gather(*[generate_menus_from_text(chunk.text) for chunk in chunks])
+    return MenuResponse(menus=[menu for menu_response in results for menu in menu_response.menus])
 # ===== 변경 후 코드 끝 =====
 
 # --- Streaming Helper for real-time updates ---
-async def generate_menus_from_text_streaming(recipe_text_list: List[str]):
+async def generate_menus_from_text_streaming(recipe_text_list: List[str], page_infos: Optional[List[PageInfo]] = None, incremental: bool = False):
     """
     스트리밍용: 각 페이지를 순차 처리하며 완료 시마다 결과 전송
+    incremental=True이면 LLM 토큰 스트림에서 메뉴가 완성될 때마다 menu 이벤트도 전송
+    (progress 이벤트에는 기존과 같이 페이지 전체 메뉴가 담김)
     """
     start_time = time.time()
     total_pages = len(recipe_text_list)
 
-    print(f"\n{'='*60}")
-    print(f"[STREAM] Starting streaming processing of {total_pages} pages")
-    print(f"{'='*60}\n")
-
-    for i, recipe_text in enumerate(recipe_text_list):
-        page_num = i + 1
-        page_start = time.time()
+    logger.info(f"\n{'='*60}")
+    logger.info(f"[STREAM] Starting streaming processing of {total_pages} pages")
+    logger.info(f"{'='*60}\n")
 
-        print(f"[STREAM] Processing page {page_num}/{total_pages}...")
+    # 작은 페이지는 묶고 큰 페이지는 나눠서 순서대로 처리 (묶음/조각이 끝나면 해당 페이지들의 progress 전송)
+    # 텍스트가 빈 페이지는 묶음에 들어가지 않으므로 LLM 호출 없이 페이지 순서에 맞춰 빈 결과로 전송
+    chunks = pack_page_texts(recipe_text_list)
+    page_menus = [[] for _ in range(total_pages)]
+    page_start = time.time()
+    next_page = 0  # 다음에 progress를 보낼 페이지 인덱스
 
-        # 각 페이지 처리
-        menu_response = await generate_menus_from_text(recipe_text)
+    def progress_event(index: int) -> dict:
+        nonlocal page_start
+        page_num = index + 1
         page_time = time.time() - page_start
+        page_start = time.time()
 
-        print(f"[STREAM] Page {page_num} completed in {page_time:.2f}s, generated {len(menu_response.menus)} menus")
+        logger.info(f"[STREAM] Page {page_num} completed in {page_time:.2f}s, generated {len(page_menus[index])} menus")
 
         # 진행 상황과 메뉴 전송
-        yield {
+        return {
             "type": "progress",
             "page": page_num,
             "total_pages": total_pages,
             "progress": int((page_num / total_pages) * 100),
-            "menus": [menu.dict() for menu in menu_response.menus],
-            "page_time": round(page_time, 2)
+            "menus": [menu.dict() for menu in page_menus[index]],
+            "page_time": round(page_time, 2),
+            **(page_infos[index].event_fields() if page_infos else {})
         }
 
+    for chunk in chunks:
+        # 앞쪽의 건너뛴 페이지는 LLM 호출 전에 바로 전송
+        while next_page < chunk.first_page:
+            yield progress_event(next_page)
+            next_page += 1
+
+        logger.info(f"[STREAM] Processing pages {[index + 1 for index in chunk.pages]} (part {chunk.part}/{chunk.parts}) of {total_pages}...")
+
+        # 각 호출 단위 처리 (묶음의 결과는 메뉴마다 해당 페이지에 귀속)
+        if incremental:
+            async for menu in generate_menus_from_text_incremental(chunk.text, chunk.packed):
+                index = chunk.page_for(menu.page, menu.name)
+                page_menus[index].append(menu)
+                yield {
+                    "type": "menu",
+                    "page": index + 1,
+                    "total_pages": total_pages,
+                    "menu": menu.dict()
+                }
+        else:
+            menu_response = await generate_menus_from_text(chunk.text, chunk.packed)
+            for menu in menu_response.menus:
+                page_menus[chunk.page_for(menu.page, menu.name)].append(menu)
+
+        # 나뉜 페이지는 마지막 조각까지 끝나야 전송 (묶음 사이에 낀 건너뛴 페이지도 함께)
+        if chunk.part < chunk.parts:
+            continue
+
+        while next_page <= chunk.pages[-1]:
+            yield progress_event(next_page)
+            next_page += 1
+
+    while next_page < total_pages:
+        yield progress_event(next_page)
+        next_page += 1
+
     total_time = time.time() - start_time
-    print(f"\n{'='*60}")
-    print(f"[STREAM] All pages completed in {total_time:.2f}s")
-    print(f"{'='*60}\n")
+    translation_stats = current_request_stats()
+    logger.info(f"\n{'='*60}")
+    logger.info(f"[STREAM] All pages completed in {total_time:.2f}s")
+    if translation_stats is not None:
+        logger.info(f"[STREAM] Translation cache hit ratio: {translation_stats.hit_ratio:.2f}")
+    logger.info(f"{'='*60}\n")
 
     # 완료 메시지
     yield {
         "type": "complete",
         "total_time": round(total_time, 2),
-        "total_pages": total_pages
+        "total_pages": total_pages,
+        "translation_cache": translation_stats.to_dict() if translation_stats is not None else None
+    }
+
+# --- Result Cache Helpers ---
+def cached_page_entry(menus: List[Menu], page_time: float, page_info: Optional[PageInfo]) -> dict:
+    return {
+        "menus": [menu.dict() for menu in menus],
+        "page_time": round(page_time, 2),
+        "page_info": page_info.dict() if page_info is not None else None
+    }
+
+def cached_page_info(page: dict, page_num: int) -> PageInfo:
+    return PageInfo(**page["page_info"]) if page.get("page_info") else PageInfo(page=page_num, source="ocr")
+
+def replay_cached_pages(cached: dict, request_start: float):
+    """
+    캐시된 페이지별 결과를 스트리밍 이벤트(progress, complete) 형식으로 재생
+    """
+    pages = cached["pages"]
+    total_pages = len(pages)
+
+    for i, page in enumerate(pages):
+        page_num = i + 1
+        yield {
+            "type": "progress",
+            "page": page_num,
+            "total_pages": total_pages,
+            "progress": int((page_num / total_pages) * 100),
+            "menus": page["menus"],
+            "page_time": page["page_time"],
+            **cached_page_info(page, page_num).event_fields(),
+            "cached": True
+        }
+
+    yield {
+        "type": "complete",
+        "total_time": round(time.time() - request_start, 2),
+        "total_pages": total_pages,
+        "cached": True
     }
 
 # --- API Endpoints ---
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Content-Length가 최대 업로드 크기를 넘으면 본문을 받기 전에 413 (chunked 업로드는 스풀할 때 검사)"""
+    max_bytes = MAX_BATCH_UPLOAD_BYTES if request.url.path == "/generate/menus/batch" else MAX_UPLOAD_BYTES
+    content_length = request.headers.get("content-length", "")
+    if max_bytes and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Upload exceeds the maximum size of {max_bytes / (1024 * 1024):.0f}MB"},
+        )
+    return await call_next(request)
+
+@app.middleware("http")
+async def assign_fair_queue_flow(request: Request, call_next):
+    """OCR/LLM 공정 대기열의 흐름 지정 (X-User-ID가 있으면 사용자 단위, 없으면 요청 단위) 과 X-User-Tier 가중치"""
+    user_id = request.headers.get("X-User-ID", "")[:64]
+    flow_id = f"user:{user_id}" if user_id else f"request:{current_request_id()}"
+    set_flow(flow_id, float(FAIR_TIER_WEIGHTS.get(request.headers.get("X-User-Tier", ""), 1.0)))
+    return await call_next(request)
+
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    """요청마다 request ID 지정 (클라이언트가 X-Request-ID를 보내면 그대로 사용) 후 응답 헤더로 돌려줌"""
+    request_id = request.headers.get("X-Request-ID", "")[:64] or new_request_id()
+    set_request_id(request_id)
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 @app.get("/")
 def read_root():
     """Root endpoint to check if the server is running."""
     return {"status": "AI server is running"}
 
+@app.get("/llm/stats")
+def read_llm_stats():
+    """모델별 LLM 스케줄러 상태 (동시 호출 수, 대기열 길이, 대기 시간)"""
+    return llm_scheduler.stats()
+
+@app.get("/ocr/stats")
+def read_ocr_stats():
+    """OCR 엔진 종류와 핸들 풀 상태, 공정 대기열 상태"""
+    return {**ocr_engine.stats(), "scheduler": ocr_scheduler.stats()}
+
+@app.get("/memory/stats")
+def read_memory_stats():
+    """페이지 이미지 메모리 예산 상태 (예약량, 대기 수, 낮은 해상도로 처리한 수)"""
+    return memory_budget.stats()
+
+@app.get("/admission/stats")
+def read_admission_stats():
+    """업로드 승인 제어 상태 (실행/대기 요청 수, 처리 중인 페이지, 페이지당 시간 추정치, 승인/거절 수)"""
+    return admission.stats()
+
+@app.get("/cache/stats")
+def read_cache_stats():
+    """결과 캐시 / 번역 캐시 히트/미스 통계, 동일 요청 합치기 통계"""
+    return {
+        "results": result_cache.stats(),
+        "translations": translation_cache.stats(),
+        "single_flight": single_flight.stats(),
+    }
+
+@app.get("/traces/{request_id}")
+async def read_trace(request_id: str):
+    """요청 하나의 트레이스 (단계/LLM 호출 span, 시작/종료 시각과 속성). 비동기 작업은 작업 ID로 조회"""
+    trace = await asyncio.to_thread(trace_exporter.get, request_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace
+
+@app.get("/metrics")
+def read_metrics():
+    """Prometheus 메트릭 (단계별 시간 히스토그램, 페이지/메뉴/에러/캐시 카운터, 처리 중 요청/LLM 호출 게이지)"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+async def read_upload(file: UploadFile, log_tag: str) -> SpooledUpload:
+    """업로드를 스풀 파일로 저장 (최대 크기를 넘으면 413). 다 쓰면 release() 호출"""
+    file_read_start = time.time()
+    with span("file_read") as read_span:
+        try:
+            upload = await spool_upload(file, UPLOAD_SPOOL_DIR, MAX_UPLOAD_BYTES)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        read_span.set(size_bytes=upload.size)
+    file_read_time = time.time() - file_read_start
+    observe(FILE_READ_SECONDS, file_read_time)
+    logger.info(f"{log_tag} File read took {file_read_time:.2f}s (size: {upload.size / (1024 * 1024):.2f}MB)")
+    return upload
+
+async def count_upload_pages(content_type: Optional[str], upload: SpooledUpload) -> Optional[int]:
+    """승인 판단용 페이지 수 (지원하지 않는 형식이면 None)"""
+    if content_type == "application/pdf":
+        try:
+            return await pdf_rasterizer.page_count(upload.path)
+        except Exception:
+            return 1  # 열 수 없는 PDF는 파이프라인에서 오류로 처리
+    if content_type and content_type.startswith("image/"):
+        return 1
+    return None
+
+async def admit_upload(content_type: Optional[str], upload: SpooledUpload, cache_key: str, flight_key: tuple) -> Optional[AdmissionTicket]:
+    """
+    새 파이프라인을 시작하기 전 승인 검사 (포화 상태면 429/503 + Retry-After)
+    캐시 히트나 처리 중인 같은 파일 요청에 합쳐지는 요청은 새 작업이 아니므로 검사하지 않고 None 반환
+    """
+    if single_flight.in_flight(flight_key):
+        admission.bypass("coalesced")
+        return None
+    if await result_cache.contains(cache_key):
+        admission.bypass("cached")
+        return None
+
+    pages = await count_upload_pages(content_type, upload)
+    if pages is None:
+        return None  # 지원하지 않는 형식은 파이프라인에서 400
+    return admit_pages(pages)
+
+def admit_pages(pages: int) -> AdmissionTicket:
+    """pages 페이지짜리 요청 승인 (거절되면 429/503 + Retry-After)"""
+    with span("admission", pages=pages) as admission_span:
+        try:
+            return admission.admit(pages)
+        except AdmissionRejected as e:
+            admission_span.set(rejected=e.reason, retry_after=e.retry_after)
+            raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+def stream_cleanup(ticket: Optional[AdmissionTicket], upload: SpooledUpload):
+    """
+    스트리밍 응답이 끝날 때 승인 반납과 스풀 파일 정리 (여러 번 호출해도 한 번만 실행)
+    SSE 제너레이터의 finally와 StreamingResponse의 background 양쪽에서 호출:
+    첫 청크를 보내기 전에 연결이 끊겨 제너레이터가 시작되지 않으면 finally가 실행되지 않기 때문
+    """
+    done = False
+
+    def cleanup() -> None:
+        nonlocal done
+        if done:
+            return
+        done = True
+        if ticket is not None:
+            ticket.discard()
+        upload.release()
+
+    return cleanup
+
+async def generate_menus_for_upload(content_type: Optional[str], upload: SpooledUpload, cache_key: str):
+    """
+    업로드 파일 전체 처리 후 (페이지별 결과, 페이지 정보, 번역 캐시 통계) 반환
+    같은 파일의 동시 요청은 single_flight로 이 결과를 공유하므로 번역 통계도 함께 돌려줌
+    """
+    translation_stats = start_request_stats()
+
+    page_texts = iter_page_texts(content_type, upload)
+    if page_texts is None:
+        raise HTTPException(status_code=400, detail="Unsupported file type. Please upload a PDF or an image.")
+    text_list, page_infos = await collect_page_texts(page_texts)
+
+    logger.info(f"[PERF] Extracted {len(text_list)} page(s)")
+
+    page_results = await generate_menus_per_page(text_list)
+
+    # 일괄 처리에서는 페이지별 시간이 따로 없으므로 0으로 저장
+    await result_cache.put(cache_key, {
+        "pages": [
+            cached_page_entry(menu_response.menus, 0.0, page_info)
+            for menu_response, page_info in zip(page_results, page_infos)
+        ]
+    })
+
+    return page_results, page_infos, translation_stats
+
 @app.post("/generate/menus", response_model=MenuResponse)
-async def upload_recipe(file: UploadFile = File(...)):
+async def upload_recipe(response: Response, file: UploadFile = File(...)):
     """Generate menus from an uploaded PDF or image file."""
     request_start = time.time()
     content_type = file.content_type
-    print(f"\n{'#'*60}")
-    print(f"[PERF] NEW REQUEST - File type: {content_type}")
-    print(f"{'#'*60}\n")
+    set_request_labels("/generate/menus", content_type)
+    logger.info(f"\n{'#'*60}")
+    logger.info(f"[PERF] NEW REQUEST - File type: {content_type}")
+    logger.info(f"{'#'*60}\n")
+
+    with track_request(), start_trace("POST /generate/menus", content_type=content_type):
+        upload = None
+        ticket = None
+        try:
+            upload = await read_upload(file, "[PERF]")
+
+            # 동일 파일이 이미 처리된 적 있으면 캐시된 결과를 바로 반환
+            cache_key = result_cache_key(upload.sha256)
+            with span("result_cache.get") as cache_span:
+                cached = await result_cache.get(cache_key)
+                cache_span.set(hit=cached is not None)
+            count(CACHE_HITS_TOTAL if cached is not None else CACHE_MISSES_TOTAL, cache="result")
+            if cached is not None:
+                admission.bypass("cached")
+                logger.info(f"[CACHE] HIT - returning cached result ({len(cached['pages'])} pages) in {time.time() - request_start:.2f}s")
+                return MenuResponse(
+                    menus=[Menu(**menu) for page in cached["pages"] for menu in page["menus"]],
+                    pages=[cached_page_info(page, i + 1) for i, page in enumerate(cached["pages"])],
+                )
+
+            # 서버가 포화 상태면 시작하지 않고 429/503
+            flight_key = ("menus", cache_key, content_type)
+            ticket = await admit_upload(content_type, upload, cache_key, flight_key)
+
+            # 같은 파일을 처리 중인 요청이 있으면 새로 시작하지 않고 그 결과를 함께 받음
+            def start_pipeline():
+                work = generate_menus_for_upload(content_type, upload, cache_key)
+                return upload.hold(ticket.hold(work) if ticket else work)
+
+            page_results, page_infos, translation_stats = await single_flight.run(flight_key, start_pipeline)
+
+            all_menus = []
+            for menu_response in page_results:
+                all_menus.extend(menu_response.menus)
+            result = MenuResponse(menus=all_menus, pages=page_infos)
+
+            response.headers["X-Translation-Cache-Hit-Ratio"] = str(translation_stats.hit_ratio)
+
+            total_request_time = time.time() - request_start
+            logger.info(f"\n{'#'*60}")
+            logger.info(f"[PERF] TOTAL REQUEST TIME: {total_request_time:.2f}s")
+            logger.info(f"[PERF] Total menus in response: {len(result.menus)}")
+            logger.info(f"[PERF] Translation cache: {translation_stats.hits} hits / {translation_stats.misses} misses (hit ratio {translation_stats.hit_ratio:.2f})")
+            logger.info(f"{'#'*60}\n")
+
+            return result
+
+        except HTTPException as e:
+            count(ERRORS_TOTAL)
+            raise e
+        except Exception as e:
+            # Log the full error for debugging
+            count(ERRORS_TOTAL)
+            logger.error(f"An unexpected error occurred: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to process file and generate menus: {e}")
+        finally:
+            if ticket is not None:
+                ticket.discard()
+            if upload is not None:
+                upload.release()
+
+async def stream_pages_in_order(page_texts, cached_pages: list, log_tag: str):
+    """
+    페이지 텍스트가 준비되는 대로 LLM 처리를 시작하고, 끝난 페이지를 버퍼링해 페이지 순서대로 SSE 이벤트
+    (llm_start, ocr_complete, progress)를 내보냄. 전송한 페이지 결과는 cached_pages에 순서대로 추가
+    page_texts가 알려주는 전체 페이지 수가 늘어나면 (배치 업로드처럼 파트가 계속 도착하는 경우) 이후 이벤트에 반영
+    """
+    # 각 페이지에 인덱스를 붙여서 추적
+    async def process_page_with_index(index: int, recipe_text: str, page_info: PageInfo):
+        page_start = time.time()
+        # OCR/LLM 겹침을 위해 페이지 묶기는 하지 않고, 토큰 예산을 넘는 페이지만 나눠서 처리
+        menu_response = await generate_menus_for_page(recipe_text)
+        page_time = time.time() - page_start
+        logger.info(f"{log_tag} Page {index + 1} processing completed in {page_time:.2f}s")
+        return {
+            "index": index,
+            "menu_response": menu_response,
+            "page_time": page_time,
+            "page_info": page_info
+        }
+
+    # OCR과 LLM 파이프라인: OCR이 끝난 페이지는 바로 LLM 처리 시작
+    # 진행 상황은 (종류, 값) 형태로 pipeline_events 큐에 전달
+    pipeline_events = asyncio.Queue()
+
+    async def run_page_pipeline():
+        llm_tasks = []
+        try:
+            known_total = 0
+
+            async def process_and_report(index: int, recipe_text: str, page_info: PageInfo):
+                pipeline_events.put_nowait(("page", await process_page_with_index(index, recipe_text, page_info)))
+
+            async for index, total_pages, text, page_info in page_texts:
+                if total_pages > known_total:
+                    known_total = total_pages
+                    pipeline_events.put_nowait(("total_pages", total_pages))
+                logger.info(f"{log_tag} Page {index + 1} text ready ({page_info.source}, {page_info.triage}) - starting LLM processing")
+                llm_tasks.append(asyncio.create_task(process_and_report(index, text, page_info)))
+
+            pipeline_events.put_nowait(("ocr_complete", len(llm_tasks)))
+            await asyncio.gather(*llm_tasks)
+        except Exception as e:
+            pipeline_events.put_nowait(("error", e))
+        finally:
+            # 텍스트 추출이나 한 페이지가 실패하거나 파이프라인이 취소되면 이미 시작한 LLM 작업도 멈춤
+            for task in llm_tasks:
+                task.cancel()
+            await asyncio.gather(*llm_tasks, return_exceptions=True)
+
+    pipeline = asyncio.create_task(run_page_pipeline())
+
+    # 버퍼링으로 순서 보장
+    buffer = {}  # {page_number: result}
+    next_page_to_send = 1
+    completed_count = 0
+    total_pages = None
+    ocr_done = False
 
     try:
-        file_read_start = time.time()
-        file_content = await file.read()
-        file_read_time = time.time() - file_read_start
-        file_size_mb = len(file_content) / (1024 * 1024)
-        print(f"[PERF] File read took {file_read_time:.2f}s (size: {file_size_mb:.2f}MB)")
-
-        text_list = []
-
-        if content_type == "application/pdf":
-            text_list = await extract_text_from_pdf(file_content)
-        elif content_type and content_type.startswith("image/"):
-            text_list = await extract_text_from_image(file_content)
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file type. Please upload a PDF or an image.")
+        # 완료되는 대로 처리하되, 순서대로 전송
+        while not ocr_done or next_page_to_send <= total_pages:
+            kind, value = await pipeline_events.get()
+
+            if kind == "error":
+                raise value
+
+            if kind == "total_pages":
+                if total_pages is not None:
+                    total_pages = value  # 배치 업로드: 파트가 더 도착함
+                    continue
+                total_pages = value
+                logger.info(f"{log_tag} First page OCR done - {total_pages} pages total")
+                yield f"data: {json.dumps({'type': 'llm_start', 'message': 'Starting AI processing...', 'total_pages': total_pages})}\n\n"
+                continue
+
+            if kind == "ocr_complete":
+                total_pages = value
+                ocr_done = True
+                logger.info(f"{log_tag} OCR completed for all {total_pages} page(s)")
+                yield f"data: {json.dumps({'type': 'ocr_complete', 'total_pages': total_pages})}\n\n"
+                continue
+
+            result = value
+            page_num = result["index"] + 1
+            completed_count += 1
+
+            logger.info(f"{log_tag} Page {page_num} completed ({completed_count}/{total_pages})")
+
+            # 버퍼에 저장
+            buffer[page_num] = result
+
+            # 순서대로 전송 가능한 페이지들 모두 전송
+            while next_page_to_send in buffer:
+                result_to_send = buffer.pop(next_page_to_send)
+                send_page_num = result_to_send["index"] + 1
+
+                logger.info(f"{log_tag} Sending page {send_page_num} results")
+
+                # 진행 상황과 메뉴 전송
+                yield f"data: {json.dumps({
+                    'type': 'progress',
+                    'page': send_page_num,
+                    'total_pages': total_pages,
+                    'progress': int((next_page_to_send / total_pages) * 100),
+                    'menus': [menu.dict() for menu in result_to_send['menu_response'].menus],
+                    'page_time': round(result_to_send['page_time'], 2),
+                    **result_to_send['page_info'].event_fields()
+                })}\n\n"
+
+                cached_pages.append(cached_page_entry(result_to_send['menu_response'].menus, result_to_send['page_time'], result_to_send['page_info']))
+                next_page_to_send += 1
+    finally:
+        if not pipeline.done():
+            pipeline.cancel()
+
+async def parallel_stream_events(content_type: Optional[str], upload: SpooledUpload, cache_key: str, request_start: float):
+    """stream-parallel SSE 이벤트 생성 (같은 파일의 동시 요청은 single_flight로 이 스트림을 공유)"""
+    translation_stats = start_request_stats()
+    try:
+        # 캐시 히트 시 저장된 페이지별 결과를 재생
+        with span("result_cache.get") as cache_span:
+            cached = await result_cache.get(cache_key)
+            cache_span.set(hit=cached is not None)
+        count(CACHE_HITS_TOTAL if cached is not None else CACHE_MISSES_TOTAL, cache="result")
+        if cached is not None:
+            logger.info(f"[PARALLEL-STREAM] Cache HIT - replaying {len(cached['pages'])} cached pages")
+            yield f"data: {json.dumps({'type': 'ocr_start', 'message': 'Starting OCR processing...'})}\n\n"
+            yield f"data: {json.dumps({'type': 'ocr_complete', 'total_pages': len(cached['pages'])})}\n\n"
+            yield f"data: {json.dumps({'type': 'llm_start', 'message': 'Starting AI processing...'})}\n\n"
+            for event in replay_cached_pages(cached, request_start):
+                yield f"data: {json.dumps(event)}\n\n"
+            return
 
-        print(f"[PERF] Extracted {len(text_list)} page(s)")
+        # OCR 실행 (페이지별 OCR 결과가 나오는 대로 LLM 단계로 넘김)
+        page_texts = iter_page_texts(content_type, upload)
+        if page_texts is None:
+            yield f"data: {json.dumps({'type': 'error', 'message': 'Unsupported file type'})}\n\n"
+            return
 
-        result = await generate_menus_from_text_util(text_list)
+        # OCR 진행 상태 전송
+        yield f"data: {json.dumps({'type': 'ocr_start', 'message': 'Starting OCR processing...'})}\n\n"
 
-        total_request_time = time.time() - request_start
-        print(f"\n{'#'*60}")
-        print(f"[PERF] TOTAL REQUEST TIME: {total_request_time:.2f}s")
-        print(f"[PERF] Total menus in response: {len(result.menus)}")
-        print(f"{'#'*60}\n")
+        cached_pages = []  # 결과 캐시에 저장할 페이지별 결과 (전송 순서 = 페이지 순서)
+        async for event in stream_pages_in_order(page_texts, cached_pages, "[PARALLEL-STREAM]"):
+            yield event
+        total_pages = len(cached_pages)
+
+        await result_cache.put(cache_key, {"pages": cached_pages})
 
-        return result
+        total_request_time = time.time() - request_start
+        logger.info(f"\n{'#'*60}")
+        logger.info(f"[PARALLEL-STREAM] TOTAL PARALLEL STREAMING TIME: {total_request_time:.2f}s")
+        logger.info(f"[PARALLEL-STREAM] Translation cache hit ratio: {translation_stats.hit_ratio:.2f}")
+        logger.info(f"{'#'*60}\n")
+
+        # 완료 메시지
+        yield f"data: {json.dumps({
+            'type': 'complete',
+            'total_time': round(total_request_time, 2),
+            'total_pages': total_pages,
+            'translation_cache': translation_stats.to_dict()
+        })}\n\n"
 
-    except HTTPException as e:
-        raise e
     except Exception as e:
-        # Log the full error for debugging
-        print(f"An unexpected error occurred: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to process file and generate menus: {e}")
+        count(ERRORS_TOTAL)
+        logger.error(f"[PARALLEL-STREAM] Error occurred: {e}")
+        yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
 
 @app.post("/generate/menus/stream-parallel")
 async def upload_recipe_stream_parallel(file: UploadFile = File(...)):
@@ -576,7 +1876,7 @@ async def upload_recipe_stream_parallel(file: UploadFile = File(...)):
     Server-Sent Events (SSE) 형식으로 응답
 
     동작 방식:
-    - 모든 페이지를 병렬로 처리 시작
+    - 각 페이지는 OCR이 끝나는 즉시 LLM 처리 시작 (OCR과 LLM 단계가 겹침)
     - 페이지 3이 먼저 완료되면 버퍼에 저장
     - 페이지 1이 완료되면 즉시 전송
     - 페이지 2가 완료되면 2와 버퍼의 3을 연속 전송
@@ -590,111 +1890,193 @@ async def upload_recipe_stream_parallel(file: UploadFile = File(...)):
     """
     request_start = time.time()
     content_type = file.content_type
-    print(f"\n{'#'*60}")
-    print(f"[PARALLEL-STREAM] NEW PARALLEL STREAMING REQUEST - File type: {content_type}")
-    print(f"{'#'*60}\n")
-
-    async def event_generator():
-        try:
-            # 파일 읽기
-            file_read_start = time.time()
-            file_content = await file.read()
-            file_read_time = time.time() - file_read_start
-            file_size_mb = len(file_content) / (1024 * 1024)
-            print(f"[PARALLEL-STREAM] File read took {file_read_time:.2f}s (size: {file_size_mb:.2f}MB)")
-
-            # OCR 진행 상태 전송
-            yield f"data: {json.dumps({'type': 'ocr_start', 'message': 'Starting OCR processing...'})}\n\n"
+    set_request_labels("/generate/menus/stream-parallel", content_type)
+    logger.info(f"\n{'#'*60}")
+    logger.info(f"[PARALLEL-STREAM] NEW PARALLEL STREAMING REQUEST - File type: {content_type}")
+    logger.info(f"{'#'*60}\n")
+
+    # 응답을 시작하기 전에 스풀/승인 검사를 해야 413, 429/503으로 돌려줄 수 있음
+    upload = await read_upload(file, "[PARALLEL-STREAM]")
+    cache_key = result_cache_key(upload.sha256)
+    flight_key = ("stream-parallel", cache_key, content_type)
+    try:
+        ticket = await admit_upload(content_type, upload, cache_key, flight_key)
+    except BaseException:
+        upload.release()
+        raise
 
-            # OCR 실행
-            text_list = []
-            if content_type == "application/pdf":
-                text_list = await extract_text_from_pdf(file_content)
-            elif content_type and content_type.startswith("image/"):
-                text_list = await extract_text_from_image(file_content)
-            else:
-                yield f"data: {json.dumps({'type': 'error', 'message': 'Unsupported file type'})}\n\n"
-                return
+    cleanup = stream_cleanup(ticket, upload)
 
-            print(f"[PARALLEL-STREAM] Extracted {len(text_list)} page(s)")
+    def start_stream():
+        events = parallel_stream_events(content_type, upload, cache_key, request_start)
+        return upload.hold_stream(ticket.hold_stream(events) if ticket else events)
 
-            # OCR 완료 및 초기 상태 전송
-            yield f"data: {json.dumps({'type': 'ocr_complete', 'total_pages': len(text_list)})}\n\n"
-            yield f"data: {json.dumps({'type': 'llm_start', 'message': 'Starting AI processing...'})}\n\n"
+    async def event_generator():
+        with track_request(), start_trace("POST /generate/menus/stream-parallel", content_type=content_type, size_bytes=upload.size):
+            try:
+                # 같은 파일을 처리 중인 요청이 있으면 새로 시작하지 않고 그 이벤트 스트림에 합류 (지금까지의 이벤트부터 재생)
+                async for event in single_flight.stream(flight_key, start_stream):
+                    yield event
 
-            # 병렬로 모든 페이지 처리 시작
-            total_pages = len(text_list)
+            except Exception as e:
+                count(ERRORS_TOTAL)
+                logger.error(f"[PARALLEL-STREAM] Error occurred: {e}")
+                yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            finally:
+                cleanup()
 
-            # 각 페이지에 인덱스를 붙여서 추적
-            async def process_page_with_index(index: int, recipe_text: str):
-                page_start = time.time()
-                menu_response = await generate_menus_from_text(recipe_text)
-                page_time = time.time() - page_start
-                print(f"[PARALLEL-STREAM] Page {index + 1} processing completed in {page_time:.2f}s")
-                return {
-                    "index": index,
-                    "menu_response": menu_response,
-                    "page_time": page_time
-                }
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        background=BackgroundTask(cleanup),
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
 
-            # 모든 페이지를 병렬로 처리 (as_completed로 완료되는 대로 처리)
-            print(f"[PARALLEL-STREAM] Starting parallel processing of all {total_pages} pages...")
-            tasks = [process_page_with_index(i, text) for i, text in enumerate(text_list)]
+async def batch_stream_events(parts, expected_pages: int, request_start: float):
+    """배치 업로드 SSE 이벤트 생성 (stream-parallel과 같은 이벤트 형식)"""
+    translation_stats = start_request_stats()
+    try:
+        yield f"data: {json.dumps({'type': 'ocr_start', 'message': 'Starting OCR processing...'})}\n\n"
 
-            # 버퍼링으로 순서 보장
-            buffer = {}  # {page_number: result}
-            next_page_to_send = 1
-            completed_count = 0
+        # 배치 결과는 결과 캐시에 저장하지 않음 (전송한 페이지 수를 세는 데만 사용)
+        sent_pages = []
+        page_texts = iter_text_from_image_parts(parts, expected_pages)
+        async for event in stream_pages_in_order(page_texts, sent_pages, "[BATCH]"):
+            yield event
+        total_pages = len(sent_pages)
 
-            # 완료되는 대로 처리하되, 순서대로 전송
-            for coro in asyncio.as_completed(tasks):
-                result = await coro
-                page_num = result["index"] + 1
-                completed_count += 1
+        total_request_time = time.time() - request_start
+        logger.info(f"\n{'#'*60}")
+        logger.info(f"[BATCH] TOTAL BATCH STREAMING TIME: {total_request_time:.2f}s ({total_pages} images)")
+        logger.info(f"[BATCH] Translation cache hit ratio: {translation_stats.hit_ratio:.2f}")
+        logger.info(f"{'#'*60}\n")
+
+        # 완료 메시지
+        yield f"data: {json.dumps({
+            'type': 'complete',
+            'total_time': round(total_request_time, 2),
+            'total_pages': total_pages,
+            'translation_cache': translation_stats.to_dict()
+        })}\n\n"
 
-                print(f"[PARALLEL-STREAM] Page {page_num} completed ({completed_count}/{total_pages})")
+    except Exception as e:
+        count(ERRORS_TOTAL)
+        logger.error(f"[BATCH] Error occurred: {e}")
+        yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
 
-                # 버퍼에 저장
-                buffer[page_num] = result
+@app.post("/generate/menus/batch")
+async def upload_recipe_batch(request: Request, pages: Optional[int] = None):
+    """
+    배치 업로드 스트리밍: 이미지 여러 장을 multipart/form-data 한 요청으로 받아 stream-parallel과 같은 SSE 이벤트로 응답
+    (파일 필드 이름은 상관없음, 이미지 한 장 = 페이지 하나, 올린 순서 = 페이지 순서)
 
-                # 순서대로 전송 가능한 페이지들 모두 전송
-                while next_page_to_send in buffer:
-                    result_to_send = buffer.pop(next_page_to_send)
-                    send_page_num = result_to_send["index"] + 1
+    동작 방식:
+    - 요청 본문을 받는 중에 파트(이미지) 하나가 끝나면 바로 OCR 시작 → 뒤 사진을 업로드하는 동안 앞 사진 OCR/LLM 진행
+    - OCR이 끝난 페이지는 바로 LLM 처리를 시작하고, 결과는 페이지 순서대로 전송
+    - 이미지마다 MAX_UPLOAD_MB, 요청 전체는 MAX_BATCH_UPLOAD_MB, 파일 수는 BATCH_MAX_FILES까지
 
-                    print(f"[PARALLEL-STREAM] Sending page {send_page_num} results")
+    pages: 올릴 이미지 수 (선택). 승인 검사에 쓰이고, 지정하면 llm_start/progress의 total_pages가 처음부터 정확함
+    (pages보다 많이 올라온 이미지는 받을 때마다 다시 승인 검사를 하고, 포화 상태면 업로드를 중단하고 429/503)
+    (지정하지 않으면 total_pages는 지금까지 받은 이미지 수이며, ocr_complete에서 최종 값을 알려줌)
 
-                    # 진행 상황과 메뉴 전송
-                    yield f"data: {json.dumps({
-                        'type': 'progress',
-                        'page': send_page_num,
-                        'total_pages': total_pages,
-                        'progress': int((next_page_to_send / total_pages) * 100),
-                        'menus': [menu.dict() for menu in result_to_send['menu_response'].menus],
-                        'page_time': round(result_to_send['page_time'], 2)
-                    })}\n\n"
+    HTTP 클라이언트는 보통 본문을 다 보낸 뒤 응답을 읽으므로 SSE 이벤트는 업로드가 끝난 뒤 전송되기 시작함
+    """
+    request_start = time.time()
+    set_request_labels("/generate/menus/batch", "image/*")
+    logger.info(f"\n{'#'*60}")
+    logger.info(f"[BATCH] NEW BATCH STREAMING REQUEST - expected images: {pages or 'unknown'}")
+    logger.info(f"{'#'*60}\n")
+
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("multipart/form-data"):
+        raise HTTPException(status_code=400, detail="Batch upload must be multipart/form-data")
+    ticket = admit_pages(pages or 1)
+
+    # 본문을 읽는 엔드포인트와 OCR/LLM 파이프라인(백그라운드 태스크)을 큐 두 개로 연결
+    parts: asyncio.Queue = asyncio.Queue()   # 받은 파트 → 파이프라인 (끝나면 None, 실패하면 예외)
+    events: asyncio.Queue = asyncio.Queue()  # 파이프라인 → SSE 응답 (끝나면 None)
+
+    async def received_parts():
+        while True:
+            item = await parts.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
 
-                    next_page_to_send += 1
+    async def run_pipeline():
+        with track_request(), start_trace("POST /generate/menus/batch", expected_pages=pages or 0):
+            try:
+                async for event in ticket.hold_stream(batch_stream_events(received_parts(), pages or 0, request_start)):
+                    events.put_nowait(event)
+            finally:
+                events.put_nowait(None)
 
-            total_request_time = time.time() - request_start
-            print(f"\n{'#'*60}")
-            print(f"[PARALLEL-STREAM] TOTAL PARALLEL STREAMING TIME: {total_request_time:.2f}s")
-            print(f"{'#'*60}\n")
+    pipeline = asyncio.create_task(run_pipeline())
 
-            # 완료 메시지
-            yield f"data: {json.dumps({
-                'type': 'complete',
-                'total_time': round(total_request_time, 2),
-                'total_pages': total_pages
-            })}\n\n"
+    # 응답을 시작하기 전에 본문을 모두 읽어야 413/400으로 돌려줄 수 있음
+    file_read_start = time.time()
+    received = 0
+    try:
+        async for part in iter_multipart_files(
+            content_type, request.stream(), UPLOAD_SPOOL_DIR, MAX_UPLOAD_BYTES, BATCH_MAX_FILES, MAX_BATCH_UPLOAD_BYTES
+        ):
+            received += 1
+            # pages보다 많이 올라오면 받은 이미지마다 승인 검사를 다시 함 (포화 상태면 업로드를 중단하고 429/503)
+            if received > ticket.pages:
+                try:
+                    ticket.add_pages(1)
+                except BaseException:
+                    part.upload.release()
+                    raise
+            if pipeline.done():  # 파이프라인이 이미 실패함
+                part.upload.release()
+            else:
+                parts.put_nowait(part)
+        parts.put_nowait(None)
+    except BaseException as e:
+        # 파이프라인을 취소하지 않고 오류를 넘겨서, 받은 파트 정리와 승인 반납을 파이프라인이 마무리하도록 함
+        parts.put_nowait(e if isinstance(e, Exception) else RuntimeError("Batch upload was interrupted"))
+        if isinstance(e, UploadTooLargeError):
+            raise HTTPException(status_code=413, detail=str(e))
+        if isinstance(e, AdmissionRejected):
+            raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+        if isinstance(e, (TooManyFilesError, ValueError)):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise
+    file_read_time = time.time() - file_read_start
+    observe(FILE_READ_SECONDS, file_read_time)
+    logger.info(f"[BATCH] Upload of {received} file(s) took {file_read_time:.2f}s")
+
+    def stop_pipeline() -> None:
+        """클라이언트 연결이 끊긴 경우 파이프라인 정리 (stream_cleanup과 같이 제너레이터 finally와 background 양쪽에서 호출)"""
+        if not pipeline.done():
+            pipeline.cancel()
+            # 실행 슬롯을 기다리던 중이었다면 파이프라인이 받지 못한 파트가 남아 있음
+            while not parts.empty():
+                item = parts.get_nowait()
+                if isinstance(item, MultipartFile):
+                    item.upload.release()
 
-        except Exception as e:
-            print(f"[PARALLEL-STREAM] Error occurred: {e}")
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+    async def event_generator():
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+        finally:
+            stop_pipeline()
 
     return StreamingResponse(
         event_generator(),
         media_type="text/event-stream",
+        background=BackgroundTask(stop_pipeline),
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
@@ -702,59 +2084,106 @@ async def upload_recipe_stream_parallel(file: UploadFile = File(...)):
         }
     )
 
+async def sequential_stream_events(content_type: Optional[str], upload: SpooledUpload, cache_key: str, request_start: float, incremental: bool = False):
+    """순차 스트리밍 SSE 이벤트 생성 (같은 파일의 동시 요청은 single_flight로 이 스트림을 공유)"""
+    start_request_stats()
+    try:
+        # 캐시 히트 시 저장된 페이지별 결과를 재생
+        with span("result_cache.get") as cache_span:
+            cached = await result_cache.get(cache_key)
+            cache_span.set(hit=cached is not None)
+        count(CACHE_HITS_TOTAL if cached is not None else CACHE_MISSES_TOTAL, cache="result")
+        if cached is not None:
+            logger.info(f"[STREAM] Cache HIT - replaying {len(cached['pages'])} cached pages")
+            yield f"data: {json.dumps({'type': 'init', 'total_pages': len(cached['pages'])})}\n\n"
+            for event in replay_cached_pages(cached, request_start):
+                yield f"data: {json.dumps(event)}\n\n"
+            return
+
+        # OCR 실행
+        page_texts = iter_page_texts(content_type, upload)
+        if page_texts is None:
+            yield f"data: {json.dumps({'type': 'error', 'message': 'Unsupported file type'})}\n\n"
+            return
+        text_list, page_infos = await collect_page_texts(page_texts)
+
+        logger.info(f"[STREAM] Extracted {len(text_list)} page(s)")
+
+        # 초기 상태 전송
+        yield f"data: {json.dumps({'type': 'init', 'total_pages': len(text_list)})}\n\n"
+
+        # 스트리밍으로 처리
+        cached_pages = []
+        async for result in generate_menus_from_text_streaming(text_list, page_infos, incremental=incremental):
+            if result["type"] == "progress":
+                cached_pages.append(cached_page_entry(
+                    [Menu(**menu) for menu in result["menus"]], result["page_time"], page_infos[result["page"] - 1]
+                ))
+            elif result["type"] == "complete":
+                await result_cache.put(cache_key, {"pages": cached_pages})
+            yield f"data: {json.dumps(result)}\n\n"
+
+        total_request_time = time.time() - request_start
+        logger.info(f"\n{'#'*60}")
+        logger.info(f"[STREAM] TOTAL STREAMING TIME: {total_request_time:.2f}s")
+        logger.info(f"{'#'*60}\n")
+
+    except Exception as e:
+        count(ERRORS_TOTAL)
+        logger.error(f"[STREAM] Error occurred: {e}")
+        yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+
 @app.post("/generate/menus/stream")
-async def upload_recipe_stream(file: UploadFile = File(...)):
+async def upload_recipe_stream(file: UploadFile = File(...), incremental: bool = False):
     """
     순차 스트리밍: 페이지별로 순서대로 메뉴를 생성하며 즉시 결과 전송
     Server-Sent Events (SSE) 형식으로 응답
     순서가 보장되지만, 병렬 스트리밍보다 느릴 수 있음
+
+    incremental=true: LLM 토큰 스트림을 증분 파싱하여 메뉴 하나가 완성될 때마다 menu 이벤트 전송
+    (첫 메뉴까지의 시간이 페이지 전체 LLM 시간 → 첫 객체가 닫히는 시간으로 단축)
     """
     request_start = time.time()
     content_type = file.content_type
-    print(f"\n{'#'*60}")
-    print(f"[STREAM] NEW STREAMING REQUEST - File type: {content_type}")
-    print(f"{'#'*60}\n")
-
-    async def event_generator():
-        try:
-            # 파일 읽기
-            file_read_start = time.time()
-            file_content = await file.read()
-            file_read_time = time.time() - file_read_start
-            file_size_mb = len(file_content) / (1024 * 1024)
-            print(f"[STREAM] File read took {file_read_time:.2f}s (size: {file_size_mb:.2f}MB)")
-
-            # OCR 실행
-            text_list = []
-            if content_type == "application/pdf":
-                text_list = await extract_text_from_pdf(file_content)
-            elif content_type and content_type.startswith("image/"):
-                text_list = await extract_text_from_image(file_content)
-            else:
-                yield f"data: {json.dumps({'type': 'error', 'message': 'Unsupported file type'})}\n\n"
-                return
-
-            print(f"[STREAM] Extracted {len(text_list)} page(s)")
+    set_request_labels("/generate/menus/stream", content_type)
+    logger.info(f"\n{'#'*60}")
+    logger.info(f"[STREAM] NEW STREAMING REQUEST - File type: {content_type}")
+    logger.info(f"{'#'*60}\n")
+
+    # 응답을 시작하기 전에 스풀/승인 검사를 해야 413, 429/503으로 돌려줄 수 있음
+    upload = await read_upload(file, "[STREAM]")
+    cache_key = result_cache_key(upload.sha256)
+    flight_key = ("stream", cache_key, content_type, incremental)
+    try:
+        ticket = await admit_upload(content_type, upload, cache_key, flight_key)
+    except BaseException:
+        upload.release()
+        raise
 
-            # 초기 상태 전송
-            yield f"data: {json.dumps({'type': 'init', 'total_pages': len(text_list)})}\n\n"
+    cleanup = stream_cleanup(ticket, upload)
 
-            # 스트리밍으로 처리
-            async for result in generate_menus_from_text_streaming(text_list):
-                yield f"data: {json.dumps(result)}\n\n"
+    def start_stream():
+        events = sequential_stream_events(content_type, upload, cache_key, request_start, incremental)
+        return upload.hold_stream(ticket.hold_stream(events) if ticket else events)
 
-            total_request_time = time.time() - request_start
-            print(f"\n{'#'*60}")
-            print(f"[STREAM] TOTAL STREAMING TIME: {total_request_time:.2f}s")
-            print(f"{'#'*60}\n")
+    async def event_generator():
+        with track_request(), start_trace("POST /generate/menus/stream", content_type=content_type, incremental=incremental, size_bytes=upload.size):
+            try:
+                # 같은 파일을 처리 중인 요청이 있으면 새로 시작하지 않고 그 이벤트 스트림에 합류 (지금까지의 이벤트부터 재생)
+                async for event in single_flight.stream(flight_key, start_stream):
+                    yield event
 
-        except Exception as e:
-            print(f"[STREAM] Error occurred: {e}")
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            except Exception as e:
+                count(ERRORS_TOTAL)
+                logger.error(f"[STREAM] Error occurred: {e}")
+                yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            finally:
+                cleanup()
 
     return StreamingResponse(
         event_generator(),
         media_type="text/event-stream",
+        background=BackgroundTask(cleanup),
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
@@ -762,6 +2191,157 @@ async def upload_recipe_stream(file: UploadFile = File(...)):
         }
     )
 
+# --- Async Jobs ---
+job_queue: asyncio.Queue = asyncio.Queue()
+job_workers: List[asyncio.Task] = []
+
+def job_response(job: dict) -> JobResponse:
+    now = time.time()
+    started_at = job["started_at"]
+    pages = [JobPageResult(**page) for page in job["pages"]]
+    return JobResponse(
+        job_id=job["id"],
+        status=job["status"],
+        filename=job["filename"],
+        total_pages=job["total_pages"],
+        completed_pages=len(pages),
+        pages=pages,
+        menus=[menu for page in pages for menu in page.menus],
+        error=job["error"],
+        queue_time=round((started_at or now) - job["created_at"], 2),
+        processing_time=round((job["finished_at"] or now) - started_at, 2) if started_at else None,
+    )
+
+async def run_job(job_id: str):
+    """
+    작업 하나 처리: stream-parallel과 같은 OCR/LLM 파이프라인으로 페이지가 끝나는 대로 job_store에 저장
+    모든 페이지가 끝나면 결과 캐시에도 저장
+    """
+    job_start = time.time()
+    start_request_stats()
+    job = await job_store.get(job_id)
+    set_request_labels("/jobs", job["content_type"])
+    set_request_id(job_id)  # 작업 트레이스는 작업 ID로 조회
+    set_flow(f"job:{job_id}")
+    await job_store.mark_running(job_id)
+    logger.info(f"\n{'#'*60}")
+    logger.info(f"[JOB] Starting job {job_id} - File type: {job['content_type']} (queued {job_start - job['created_at']:.2f}s)")
+    logger.info(f"{'#'*60}\n")
+
+    llm_tasks = {}
+    with track_request(), start_trace("job", job_id=job_id, content_type=job["content_type"]):
+        try:
+            upload = await open_upload(job["file_path"])  # 파일은 작업이 끝날 때 job_store가 삭제
+
+            cache_key = result_cache_key(upload.sha256)
+            with span("result_cache.get") as cache_span:
+                cached = await result_cache.get(cache_key)
+                cache_span.set(hit=cached is not None)
+            count(CACHE_HITS_TOTAL if cached is not None else CACHE_MISSES_TOTAL, cache="result")
+            if cached is not None:
+                logger.info(f"[JOB] Cache HIT - storing {len(cached['pages'])} cached pages")
+                await job_store.set_total_pages(job_id, len(cached["pages"]))
+                for i, page in enumerate(cached["pages"]):
+                    await job_store.add_page(job_id, i + 1, page)
+                await job_store.finish(job_id)
+                return
+
+            page_texts = iter_page_texts(job["content_type"], upload)
+            if page_texts is None:
+                await job_store.finish(job_id, error="Unsupported file type")
+                return
+
+            async def process_page(index: int, recipe_text: str, page_info: PageInfo) -> dict:
+                page_start = time.time()
+                menu_response = await generate_menus_for_page(recipe_text)
+                page_time = time.time() - page_start
+                entry = cached_page_entry(menu_response.menus, page_time, page_info)
+                await job_store.add_page(job_id, index + 1, entry)
+                logger.info(f"[JOB] Job {job_id} page {index + 1} completed in {page_time:.2f}s")
+                return entry
+
+            # OCR이 끝난 페이지는 바로 LLM 처리 시작
+            async for index, total_pages, text, page_info in page_texts:
+                if not llm_tasks:
+                    await job_store.set_total_pages(job_id, total_pages)
+                llm_tasks[index] = asyncio.create_task(process_page(index, text, page_info))
+
+            cached_pages = await asyncio.gather(*[llm_tasks[index] for index in sorted(llm_tasks)])
+            await result_cache.put(cache_key, {"pages": list(cached_pages)})
+            await job_store.finish(job_id)
+
+            logger.info(f"\n{'#'*60}")
+            logger.info(f"[JOB] Job {job_id} completed in {time.time() - job_start:.2f}s ({len(cached_pages)} pages)")
+            logger.info(f"{'#'*60}\n")
+
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            count(ERRORS_TOTAL)
+            logger.error(f"[JOB] Job {job_id} failed: {detail}")
+            await job_store.finish(job_id, error=detail)
+        finally:
+            for task in llm_tasks.values():
+                if not task.done():
+                    task.cancel()
+
+async def job_worker(worker_id: int):
+    while True:
+        job_id = await job_queue.get()
+        try:
+            await run_job(job_id)
+        except Exception as e:
+            logger.error(f"[JOB] Worker {worker_id} failed to run job {job_id}: {e}")
+        finally:
+            job_queue.task_done()
+
+async def start_job_workers():
+    """이전 프로세스에서 끝나지 않은 작업을 다시 큐에 넣고 워커 시작"""
+    requeued = await job_store.requeue_unfinished()
+    for job_id in requeued:
+        job_queue.put_nowait(job_id)
+    if requeued:
+        logger.info(f"[JOB] Requeued {len(requeued)} unfinished job(s)")
+
+    for worker_id in range(JOB_WORKERS):
+        job_workers.append(asyncio.create_task(job_worker(worker_id)))
+
+async def stop_job_workers():
+    """워커 취소 (실행 중이던 작업은 저장소에 끝나지 않은 상태로 남아 다음 시작 때 다시 큐에 들어감)"""
+    for task in job_workers:
+        task.cancel()
+    await asyncio.gather(*job_workers, return_exceptions=True)
+    job_workers.clear()
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(file: UploadFile = File(...)):
+    """
+    비동기 메뉴 생성 작업 등록: 파일을 저장하고 바로 작업 ID를 반환
+    결과는 GET /jobs/{job_id}로 조회 (페이지별 부분 결과 포함)
+    """
+    content_type = file.content_type
+    if content_type != "application/pdf" and not (content_type and content_type.startswith("image/")):
+        raise HTTPException(status_code=400, detail="Unsupported file type. Please upload a PDF or an image.")
+
+    set_request_labels("/jobs", content_type)
+    upload = await read_upload(file, "[JOB]")
+    try:
+        # 스풀 파일을 작업 저장소로 옮김 (옮긴 뒤에는 release()가 지울 파일이 없음)
+        job_id = await job_store.create(content_type, file.filename, upload.path, upload.size)
+    finally:
+        upload.release()
+    job_queue.put_nowait(job_id)
+    logger.info(f"[JOB] Job {job_id} queued (size: {upload.size / (1024 * 1024):.2f}MB, queue length: {job_queue.qsize()})")
+
+    return job_response(await job_store.get(job_id))
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def read_job(job_id: str):
+    """작업 상태, 지금까지 끝난 페이지별 결과와 처리 시간"""
+    job = await job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_response(job)
+
 # To run this server:
 # 1. Make sure Ollama is running (e.g., 'ollama serve')
 # 2. Make sure you have a model pulled (e.g., 'ollama pull llama3')
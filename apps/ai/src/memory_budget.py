@@ -0,0 +1,204 @@
+"""
+프로세스 전체 메모리 예산
+
+PDF 요청마다 렌더링된 페이지 이미지를 들고 있고, 여러 요청이 서로 모르는 채로 동시에 실행되므로 부하가 몰리면
+메모리 사용량에 상한이 없었습니다 (200 DPI A4 한 장이 RGB로 약 15MB).
+페이지 렌더링과 이미지 디코딩은 버퍼를 만들기 전에 예상 크기만큼 MemoryBudget에서 예약하고, 페이지 처리가
+끝나면 반납합니다.
+
+- 예산이 남아 있지 않으면 FIFO 순서로 대기 (큰 요청이 작은 요청에 계속 밀려 굶지 않도록)
+- 낮춘 크기(낮은 DPI 등)를 함께 넘기면 degrade_after_seconds 동안 기다려도 원래 크기를 못 받을 때 낮춘 크기로 대기
+- 예산보다 큰 예약은 예산 크기로 잘라서 혼자 실행되도록 함 (영원히 대기하지 않음)
+- 예약량/대기 수는 GET /metrics와 GET /memory/stats로 노출
+"""
+
+import asyncio
+import collections
+import logging
+import time
+from typing import List, Sequence
+
+from src.metrics import (
+    MEMORY_BUDGET_BYTES, MEMORY_RESERVED_BYTES, MEMORY_WAITERS, MEMORY_WAIT_SECONDS, MEMORY_DEGRADED_TOTAL,
+    observe, count,
+)
+
+logger = logging.getLogger(__name__)
+
+# PIL은 RGB 이미지도 픽셀당 4바이트로 저장함
+BYTES_PER_PIXEL = 4
+
+
+def image_bytes(width: int, height: int) -> int:
+    """디코딩된 RGB 이미지 한 장의 예상 메모리 크기"""
+    return width * height * BYTES_PER_PIXEL
+
+
+class MemoryReservation:
+    """예약 하나 (release()를 여러 번 호출해도 한 번만 반납)"""
+
+    def __init__(self, budget: "MemoryBudget", nbytes: int, level: int = 0):
+        self.budget = budget
+        self.nbytes = nbytes
+        self.level = level  # 받은 크기의 순번 (0이면 원래 크기, 1 이상이면 낮춘 크기)
+        self._released = False
+
+    @property
+    def degraded(self) -> bool:
+        return self.level > 0
+
+    def split(self, parts: int) -> List["MemoryReservation"]:
+        """
+        예약을 parts개로 나눔 (페이지 범위를 한 번에 예약하고 페이지마다 따로 반납할 때)
+        나눈 뒤 원래 예약은 반납된 것으로 취급
+        """
+        if self._released or parts <= 1:
+            return [self]
+        self._released = True
+        share, remainder = divmod(self.nbytes, parts)
+        return [
+            MemoryReservation(self.budget, share + (remainder if i == 0 else 0), self.level)
+            for i in range(parts)
+        ]
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self.budget._release(self.nbytes)
+
+    def __enter__(self) -> "MemoryReservation":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class MemoryBudget:
+    def __init__(self, limit_bytes: int, degrade_after_seconds: float = 2.0):
+        """limit_bytes가 0이면 제한 없음 (예약량은 계속 집계)"""
+        self.limit_bytes = limit_bytes
+        self.degrade_after_seconds = degrade_after_seconds
+        self.reserved_bytes = 0
+        self._waiters: collections.deque = collections.deque()  # [future, nbytes]
+
+        self.reservations = 0
+        self.waits = 0
+        self.degraded = 0
+        self.peak_reserved_bytes = 0
+        self.total_wait_seconds = 0.0
+
+        MEMORY_BUDGET_BYTES.set(limit_bytes)
+
+    async def reserve(self, sizes: Sequence[int]) -> MemoryReservation:
+        """
+        sizes: 선호 순서의 예약 크기 (첫 값이 원래 크기, 이어지는 값은 낮춘 크기)
+        사용법:
+            reservation = await memory_budget.reserve([full_bytes, reduced_bytes])
+            if reservation.degraded: ...  # 낮춘 크기로 처리
+            ...
+            reservation.release()
+        """
+        sizes = [self._clamp(size) for size in sizes]
+        last_level = len(sizes) - 1
+
+        if not self._waiters and self._fits(sizes[0]):
+            return self._grant(sizes[0], 0)
+
+        wait_start = time.monotonic()
+        self.waits += 1
+        level = 0
+        MEMORY_WAITERS.inc()
+        try:
+            while True:
+                waiter = [asyncio.get_running_loop().create_future(), sizes[level]]
+                self._waiters.append(waiter)
+                timeout = self.degrade_after_seconds if level < last_level else None
+                try:
+                    await asyncio.wait({waiter[0]}, timeout=timeout)
+                except BaseException:
+                    self._abandon(waiter)
+                    raise
+
+                if waiter[0].done():
+                    break
+
+                # 원래 크기를 기다리는 시간이 길어지면 가장 작은 크기로 다시 대기 (대기열 순서는 맨 뒤)
+                self._abandon(waiter)
+                level = last_level
+                logger.info(f"[MEMORY] Budget exhausted for {self.degrade_after_seconds:.1f}s - degrading reservation "
+                            f"from {sizes[0] / (1024 * 1024):.1f}MB to {sizes[level] / (1024 * 1024):.1f}MB")
+        finally:
+            MEMORY_WAITERS.dec()
+
+        wait_seconds = time.monotonic() - wait_start
+        self.total_wait_seconds += wait_seconds
+        observe(MEMORY_WAIT_SECONDS, wait_seconds)
+        return self._reservation(sizes[level], level)
+
+    def stats(self) -> dict:
+        return {
+            "limit_bytes": self.limit_bytes,
+            "reserved_bytes": self.reserved_bytes,
+            "peak_reserved_bytes": self.peak_reserved_bytes,
+            "waiters": len(self._waiters),
+            "reservations": self.reservations,
+            "waits": self.waits,
+            "degraded": self.degraded,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.waits, 4) if self.waits else 0.0,
+        }
+
+    # --- 내부 구현 ---
+    def _clamp(self, nbytes: int) -> int:
+        nbytes = max(0, int(nbytes))
+        return min(nbytes, self.limit_bytes) if self.limit_bytes else nbytes
+
+    def _fits(self, nbytes: int) -> bool:
+        return not self.limit_bytes or self.reserved_bytes + nbytes <= self.limit_bytes
+
+    def _grant(self, nbytes: int, level: int) -> MemoryReservation:
+        self._add(nbytes)
+        return self._reservation(nbytes, level)
+
+    def _reservation(self, nbytes: int, level: int) -> MemoryReservation:
+        self.reservations += 1
+        if level > 0:
+            self.degraded += 1
+            count(MEMORY_DEGRADED_TOTAL)
+        return MemoryReservation(self, nbytes, level)
+
+    def _add(self, nbytes: int) -> None:
+        self.reserved_bytes += nbytes
+        self.peak_reserved_bytes = max(self.peak_reserved_bytes, self.reserved_bytes)
+        MEMORY_RESERVED_BYTES.set(self.reserved_bytes)
+
+    def _release(self, nbytes: int) -> None:
+        self.reserved_bytes -= nbytes
+        MEMORY_RESERVED_BYTES.set(self.reserved_bytes)
+        self._wake()
+
+    def _wake(self) -> None:
+        """대기열 앞에서부터 들어가는 만큼 예약 승인 (앞 대기자가 안 들어가면 뒤도 기다림)"""
+        while self._waiters:
+            future, nbytes = self._waiters[0]
+            if future.done():  # 취소된 대기자
+                self._waiters.popleft()
+                continue
+            if not self._fits(nbytes):
+                return
+            self._waiters.popleft()
+            self._add(nbytes)
+            future.set_result(None)
+
+    def _abandon(self, waiter: list) -> None:
+        """대기 중단: 이미 승인된 상태면 반납, 아니면 대기열에서 제거 후 뒤 대기자 확인"""
+        future, nbytes = waiter
+        if future.done() and not future.cancelled():
+            self._release(nbytes)
+            return
+        future.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        self._wake()
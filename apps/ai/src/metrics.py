@@ -0,0 +1,137 @@
+"""
+Prometheus 메트릭
+
+단계별 시간은 [PERF] 로그로만 남아 집계할 수 없었으므로, GET /metrics로 히스토그램/카운터/게이지를 노출해
+운영 환경에서 단계별 p50/p99를 볼 수 있게 합니다.
+
+모든 메트릭은 endpoint, content_type 라벨을 가집니다. 요청 진입 시 set_request_labels()로 contextvar에 라벨을
+넣어 두면, 같은 요청에서 만든 태스크/스레드(asyncio.create_task, asyncio.to_thread)에서도 같은 라벨로 기록됩니다.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+REQUEST_LABELS = ("endpoint", "content_type")
+
+# 페이지 OCR, LLM 호출은 수 초 ~ 수십 초, 전체 요청은 수 분까지 걸릴 수 있음
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+# --- Histograms ---
+FILE_READ_SECONDS = Histogram(
+    "recipflash_file_read_seconds", "업로드 파일 읽기 시간", REQUEST_LABELS, buckets=DURATION_BUCKETS
+)
+RASTERIZE_SECONDS = Histogram(
+    "recipflash_rasterize_seconds", "PDF 페이지 범위 렌더링 시간 (pdftoppm 호출 1회)", REQUEST_LABELS, buckets=DURATION_BUCKETS
+)
+OCR_PAGE_SECONDS = Histogram(
+    "recipflash_ocr_page_seconds", "페이지(이미지) 1장 OCR 시간", REQUEST_LABELS, buckets=DURATION_BUCKETS
+)
+LLM_PARSE_SECONDS = Histogram(
+    "recipflash_llm_parse_seconds", "메뉴 추출 LLM 호출 1회 시간 (스케줄러 대기 포함)", REQUEST_LABELS, buckets=DURATION_BUCKETS
+)
+TRANSLATION_SECONDS = Histogram(
+    "recipflash_translation_seconds", "LLM 호출 1회 분량 메뉴 번역 시간", REQUEST_LABELS, buckets=DURATION_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "recipflash_request_seconds", "요청 전체 처리 시간", REQUEST_LABELS, buckets=DURATION_BUCKETS
+)
+OCR_PREPROCESS_SECONDS = Histogram(
+    "recipflash_ocr_preprocess_seconds", "OCR 전처리 단계별 시간 (이미지 1장)", REQUEST_LABELS + ("step",), buckets=DURATION_BUCKETS
+)
+MEMORY_WAIT_SECONDS = Histogram(
+    "recipflash_memory_wait_seconds", "메모리 예산 예약 대기 시간 (대기한 예약만)", REQUEST_LABELS, buckets=DURATION_BUCKETS
+)
+
+# --- Counters ---
+PAGES_TOTAL = Counter(
+    "recipflash_pages_total", "텍스트를 추출한 페이지 수", REQUEST_LABELS + ("source", "triage")
+)
+MENUS_TOTAL = Counter("recipflash_menus_total", "생성한 메뉴 수", REQUEST_LABELS)
+ERRORS_TOTAL = Counter("recipflash_errors_total", "실패한 요청/작업 수", REQUEST_LABELS)
+CACHE_HITS_TOTAL = Counter("recipflash_cache_hits_total", "캐시 히트 수", REQUEST_LABELS + ("cache",))
+CACHE_MISSES_TOTAL = Counter("recipflash_cache_misses_total", "캐시 미스 수", REQUEST_LABELS + ("cache",))
+ADMISSION_DECISIONS_TOTAL = Counter(
+    "recipflash_admission_decisions_total",
+    "업로드 승인 결과 (admitted, queue_full, too_many_pages, over_deadline, cached, coalesced)",
+    REQUEST_LABELS + ("decision",),
+)
+MEMORY_DEGRADED_TOTAL = Counter(
+    "recipflash_memory_degraded_total", "메모리 예산이 부족해 낮은 해상도로 처리한 예약 수", REQUEST_LABELS
+)
+
+# --- Gauges ---
+REQUESTS_IN_FLIGHT = Gauge("recipflash_requests_in_flight", "처리 중인 요청 수", REQUEST_LABELS)
+LLM_CALLS_IN_FLIGHT = Gauge("recipflash_llm_calls_in_flight", "진행 중인 LLM 호출 수", REQUEST_LABELS + ("model",))
+
+# 메모리 예산은 프로세스 전체 값이므로 요청 라벨 없음
+MEMORY_BUDGET_BYTES = Gauge("recipflash_memory_budget_bytes", "페이지 이미지 메모리 예산 (0이면 제한 없음)")
+MEMORY_RESERVED_BYTES = Gauge("recipflash_memory_reserved_bytes", "현재 예약된 페이지 이미지 메모리")
+MEMORY_WAITERS = Gauge("recipflash_memory_waiters", "메모리 예산 예약을 기다리는 수")
+
+# 승인 제어 상태도 프로세스 전체 값
+ADMISSION_RUNNING = Gauge("recipflash_admission_running", "실행 슬롯을 받아 처리 중인 업로드 요청 수")
+ADMISSION_QUEUED = Gauge("recipflash_admission_queued", "승인됐지만 실행 슬롯을 기다리는 업로드 요청 수")
+ADMISSION_PENDING_PAGES = Gauge("recipflash_admission_pending_pages", "승인된 요청들의 처리 중인 페이지 합")
+ADMISSION_PAGE_SECONDS = Gauge("recipflash_admission_page_seconds", "승인 판단에 쓰는 페이지당 처리 시간 추정치")
+
+_request_labels: contextvars.ContextVar[dict] = contextvars.ContextVar(
+    "metrics_request_labels", default={"endpoint": "none", "content_type": "none"}
+)
+
+
+def content_type_label(content_type: Optional[str]) -> str:
+    """라벨 카디널리티를 제한하기 위해 pdf / image / other로 묶음"""
+    if content_type == "application/pdf":
+        return "pdf"
+    if content_type and content_type.startswith("image/"):
+        return "image"
+    return "other"
+
+
+def set_request_labels(endpoint: str, content_type: Optional[str]) -> None:
+    """현재 요청(컨텍스트)의 endpoint, content_type 라벨 설정"""
+    _request_labels.set({"endpoint": endpoint, "content_type": content_type_label(content_type)})
+
+
+def request_labels() -> dict:
+    return _request_labels.get()
+
+
+def observe(histogram: Histogram, seconds: float, **extra_labels) -> None:
+    histogram.labels(**request_labels(), **extra_labels).observe(seconds)
+
+
+def count(counter: Counter, amount: float = 1, **extra_labels) -> None:
+    if amount:
+        counter.labels(**request_labels(), **extra_labels).inc(amount)
+
+
+@contextmanager
+def in_flight(gauge: Gauge, **extra_labels):
+    """블록 실행 중 게이지를 1 올림"""
+    child = gauge.labels(**request_labels(), **extra_labels)
+    child.inc()
+    try:
+        yield
+    finally:
+        child.dec()
+
+
+@contextmanager
+def track_request():
+    """블록 실행 중 처리 중인 요청 수를 올리고, 끝나면 전체 처리 시간 기록 (스트리밍은 스트림이 끝날 때까지)"""
+    start = time.time()
+    with in_flight(REQUESTS_IN_FLIGHT):
+        try:
+            yield
+        finally:
+            observe(REQUEST_SECONDS, time.time() - start)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """/metrics 응답 본문과 Content-Type"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,185 @@
+"""
+multipart/form-data 스트리밍 파서
+
+FastAPI의 List[UploadFile]은 요청 본문 전체를 받은 뒤에야 엔드포인트를 호출하므로, 레시피 바인더를 한 장씩 찍은
+사진 30장을 한 번에 올리면 마지막 사진이 도착할 때까지 첫 사진의 OCR을 시작할 수 없습니다.
+
+iter_multipart_files()는 요청 본문을 청크 단위로 python-multipart 파서에 넣고, 파일 파트 하나가 끝날 때마다
+스풀 파일(SpooledUpload)로 내보냅니다. 앞 파트를 처리하는 동안 뒤 파트를 계속 받을 수 있습니다.
+
+- 파트마다 스풀 파일에 쓰면서 SHA-256 계산 (upload_spool과 같은 방식)
+- 파트 하나가 max_file_bytes를 넘거나 지금까지 받은 본문이 max_total_bytes를 넘으면 UploadTooLargeError,
+  파일 수가 max_files를 넘으면 TooManyFilesError
+  (Content-Length 검사는 미들웨어에서 하지만 chunked 전송은 길이 헤더가 없으므로 본문을 읽으며 다시 검사)
+- 파일이 아닌 폼 필드는 무시
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from typing import AsyncIterator, List, Optional
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart 0.0.13 이전
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from src.upload_spool import SpooledUpload, UploadTooLargeError, _remove, _write_chunk
+
+
+class TooManyFilesError(Exception):
+    def __init__(self, max_files: int):
+        super().__init__(f"Upload contains more than {max_files} files")
+        self.max_files = max_files
+
+
+class MultipartFile:
+    """스풀 파일로 저장된 파일 파트 하나"""
+
+    def __init__(self, field_name: str, filename: str, content_type: Optional[str], upload: SpooledUpload):
+        self.field_name = field_name
+        self.filename = filename
+        self.content_type = content_type
+        self.upload = upload
+
+
+class _PartWriter:
+    """파서 콜백에서 모은 이벤트를 적용해 파일 파트를 스풀 파일에 씀 (파일 I/O는 to_thread에서 실행)"""
+
+    def __init__(self, spool_dir: Optional[str], max_file_bytes: int, max_files: int):
+        self.spool_dir = spool_dir
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.files = 0
+        self._headers = {}
+        self._field = b""
+        self._value = b""
+        self._file = None
+        self._path = None
+        self._digest = None
+        self._size = 0
+        self._part = None
+
+    def apply(self, events: List[tuple]) -> List[MultipartFile]:
+        completed = []
+        try:
+            self._apply(events, completed)
+        except BaseException:
+            for part in completed:
+                part.upload.release()
+            raise
+        return completed
+
+    def _apply(self, events: List[tuple], completed: List[MultipartFile]) -> None:
+        for kind, data in events:
+            if kind == "part_begin":
+                self._headers = {}
+            elif kind == "header_field":
+                self._field += data
+            elif kind == "header_value":
+                self._value += data
+            elif kind == "header_end":
+                self._headers[self._field.lower()] = self._value
+                self._field = b""
+                self._value = b""
+            elif kind == "headers_finished":
+                self._begin_part()
+            elif kind == "part_data" and self._file is not None:
+                self._size += len(data)
+                if self.max_file_bytes and self._size > self.max_file_bytes:
+                    raise UploadTooLargeError(self.max_file_bytes)
+                _write_chunk(self._file, self._digest, data)
+            elif kind == "part_end" and self._file is not None:
+                completed.append(self._end_part())
+
+    def abort(self) -> None:
+        """쓰는 중이던 파트 파일 삭제"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            _remove(self._path)
+
+    def _begin_part(self) -> None:
+        _, disposition = parse_options_header(self._headers.get(b"content-disposition", b""))
+        filename = disposition.get(b"filename")
+        if filename is None:
+            return  # 일반 폼 필드
+        self.files += 1
+        if self.max_files and self.files > self.max_files:
+            raise TooManyFilesError(self.max_files)
+
+        content_type = self._headers.get(b"content-type")
+        self._part = (
+            disposition.get(b"name", b"").decode("utf-8", "replace"),
+            filename.decode("utf-8", "replace"),
+            content_type.decode("latin-1").strip() if content_type else None,
+        )
+        if self.spool_dir:
+            os.makedirs(self.spool_dir, exist_ok=True)
+        fd, self._path = tempfile.mkstemp(prefix="upload-", dir=self.spool_dir or None)
+        self._file = os.fdopen(fd, "wb")
+        self._digest = hashlib.sha256()
+        self._size = 0
+
+    def _end_part(self) -> MultipartFile:
+        self._file.close()
+        self._file = None
+        upload = SpooledUpload(self._path, self._size, self._digest.hexdigest())
+        return MultipartFile(*self._part, upload)
+
+
+async def iter_multipart_files(
+    content_type: str, body: AsyncIterator[bytes], spool_dir: Optional[str], max_file_bytes: int, max_files: int,
+    max_total_bytes: int = 0,
+) -> AsyncIterator[MultipartFile]:
+    """
+    요청 본문을 읽으며 파일 파트가 끝나는 대로 내보냄 (받은 쪽에서 다 쓰면 part.upload.release() 호출)
+    content_type: 요청의 Content-Type 헤더 (boundary 포함). multipart/form-data가 아니면 ValueError
+    max_total_bytes: 본문 전체 크기 상한 (0이면 제한 없음)
+    """
+    mime_type, params = parse_options_header(content_type)
+    boundary = params.get(b"boundary")
+    if mime_type != b"multipart/form-data" or not boundary:
+        raise ValueError("Expected a multipart/form-data request with a boundary")
+
+    events: List[tuple] = []
+
+    def on_data(kind):
+        return lambda data, start, end: events.append((kind, bytes(data[start:end])))
+
+    def on_event(kind):
+        return lambda: events.append((kind, None))
+
+    parser = MultipartParser(boundary, callbacks={
+        "on_part_begin": on_event("part_begin"),
+        "on_header_field": on_data("header_field"),
+        "on_header_value": on_data("header_value"),
+        "on_header_end": on_event("header_end"),
+        "on_headers_finished": on_event("headers_finished"),
+        "on_part_data": on_data("part_data"),
+        "on_part_end": on_event("part_end"),
+    })
+    writer = _PartWriter(spool_dir, max_file_bytes, max_files)
+    completed: List[MultipartFile] = []
+    received = 0
+    try:
+        async for chunk in body:
+            if not chunk:
+                continue
+            received += len(chunk)
+            if max_total_bytes and received > max_total_bytes:
+                raise UploadTooLargeError(max_total_bytes)
+            parser.write(chunk)
+            if not events:
+                continue
+            pending, events[:] = list(events), []
+            completed = await asyncio.to_thread(writer.apply, pending)
+            while completed:
+                yield completed.pop(0)
+        parser.finalize()
+    finally:
+        # 중간에 멈추면 아직 넘기지 못한 파트와 쓰는 중이던 파트 삭제
+        for part in completed:
+            part.upload.release()
+        writer.abort()
@@ -0,0 +1,139 @@
+"""
+OCR 엔진
+
+pytesseract는 호출마다 이미지를 임시 PNG 파일로 저장하고 tesseract 프로세스를 새로 띄워
+kor+eng traineddata를 다시 로드합니다. 짧은 페이지에서는 이 고정 비용이 OCR 시간의 상당 부분을 차지합니다.
+
+TesseractPool은 tesserocr(Tesseract C++ API 바인딩)로 초기화된 API 핸들을 워커 수만큼 유지하고,
+PIL 이미지의 원시 픽셀 버퍼를 그대로 넘깁니다 (PNG 인코딩, 임시 파일, 프로세스 생성 없음).
+tesserocr가 설치되어 있지 않거나 초기화에 실패하면 기존 pytesseract 경로를 사용합니다.
+
+tesserocr는 Recognize 중 GIL을 해제하므로 asyncio.to_thread로 여러 페이지를 병렬 처리할 수 있습니다.
+"""
+
+import logging
+import os
+import queue
+import threading
+from typing import Optional
+
+import pytesseract
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:  # 선택 의존성: pip install tesserocr
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
+
+class PytesseractEngine:
+    """기존 방식: 호출마다 tesseract 프로세스 실행"""
+
+    name = "pytesseract"
+
+    def __init__(self, lang: str):
+        self.lang = lang
+
+    def image_to_string(self, image: Image.Image) -> str:
+        return pytesseract.image_to_string(image, self.lang)
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+class TesseractPool:
+    """초기화된 tesserocr API 핸들 풀 (스레드 하나가 핸들 하나를 빌려 씀)"""
+
+    name = "tesserocr"
+
+    # PIL 모드 → 픽셀당 바이트 수 (Tesseract는 8비트 그레이/RGB/RGBA 버퍼를 받음)
+    _BYTES_PER_PIXEL = {"L": 1, "RGB": 3, "RGBA": 4}
+
+    def __init__(self, lang: str, size: int, tessdata_path: Optional[str] = None):
+        self.lang = lang
+        self.size = size
+        self.tessdata_path = tessdata_path
+        self._handles: "queue.Queue" = queue.Queue()
+        self._created = 0
+        self._create_lock = threading.Lock()
+        self.calls = 0
+
+        # 첫 핸들은 바로 만들어 언어 데이터/설치 문제를 시작 시점에 드러냄
+        self._handles.put(self._create_handle())
+
+    def _create_handle(self):
+        kwargs = {"lang": self.lang}
+        if self.tessdata_path:
+            kwargs["path"] = self.tessdata_path
+        handle = tesserocr.PyTessBaseAPI(**kwargs)
+        self._created += 1
+        return handle
+
+    def _acquire(self):
+        try:
+            return self._handles.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._create_lock:
+            if self._created < self.size:
+                return self._create_handle()
+
+        return self._handles.get()  # 모든 핸들이 사용 중이면 반납될 때까지 대기
+
+    def image_to_string(self, image: Image.Image) -> str:
+        if image.mode not in self._BYTES_PER_PIXEL:
+            image = image.convert("RGB")
+        bytes_per_pixel = self._BYTES_PER_PIXEL[image.mode]
+        width, height = image.size
+
+        handle = self._acquire()
+        try:
+            handle.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+            text = handle.GetUTF8Text()
+        finally:
+            handle.Clear()
+            self._handles.put(handle)
+
+        self.calls += 1
+        return text
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "pool_size": self.size,
+            "handles_created": self._created,
+            "handles_idle": self._handles.qsize(),
+            "calls": self.calls,
+        }
+
+
+def create_ocr_engine(lang: str, backend: str = "auto", pool_size: Optional[int] = None):
+    """
+    backend:
+        "auto"        - tesserocr 사용 가능하면 풀, 아니면 pytesseract
+        "tesserocr"   - 풀 강제 (실패 시 예외)
+        "pytesseract" - 기존 subprocess 방식
+    """
+    if backend == "pytesseract":
+        return PytesseractEngine(lang)
+
+    if tesserocr is None:
+        if backend == "tesserocr":
+            raise RuntimeError("OCR_BACKEND=tesserocr but the tesserocr package is not installed")
+        logger.warning("[OCR] tesserocr not installed - falling back to pytesseract")
+        return PytesseractEngine(lang)
+
+    size = pool_size or os.cpu_count() or 1
+    try:
+        engine = TesseractPool(lang, size, tessdata_path=os.getenv("TESSDATA_PREFIX"))
+    except Exception as e:
+        if backend == "tesserocr":
+            raise
+        logger.warning(f"[OCR] Failed to initialize tesserocr pool ({e}) - falling back to pytesseract")
+        return PytesseractEngine(lang)
+
+    logger.info(f"[OCR] Using tesserocr engine pool (size: {size}, lang: {lang})")
+    return engine
@@ -0,0 +1,203 @@
+"""
+레이아웃 분석 기반 타일 OCR
+
+빽빽한 메뉴판 사진 한 장은 Tesseract 호출 한 번이 되어 코어 하나에서만 돌고 나머지 코어는 놉니다.
+사진 한 장짜리 요청이 많으므로, 페이지를 글자 블록 단위 타일로 나눠 여러 코어에서 동시에 OCR하고
+읽는 순서대로 이어 붙입니다.
+
+split_into_tiles()는 투영 프로파일(행/열별 잉크 픽셀 유무)로 재귀 XY-cut을 합니다.
+- 세로 방향 빈 띠(단 사이 여백)가 있으면 단으로 나눔 (왼쪽 → 오른쪽). 글자 줄 높이의 2배 이상 여백이고
+  양쪽 단이 영역 너비의 MIN_COLUMN_RATIO 이상일 때만 (이름과 수치 사이 여백처럼 한 줄을 가르는 여백은 무시)
+- 아니면 가로 방향 빈 띠(보통 줄 간격보다 넓은 문단 사이 여백)로 나눔 (위 → 아래)
+- 타일 수(max_tiles)는 나눈 영역들에 면적 비례로 배분하고, 조각이 배분된 수보다 많으면 이웃 조각끼리 합침
+- 더 나눌 여백이 없는 블록은 줄 사이 빈 행에서 가로로 잘라 배분된 타일 수를 맞춤 (글자 줄을 자르지 않음)
+
+타일은 읽는 순서로 반환하며, 타일별 OCR 결과는 join_tile_texts()로 이어 붙입니다.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from src.image_preprocess import INK_CONTRAST, estimate_text_height
+
+Box = Tuple[int, int, int, int]
+
+# 단으로 나누려면 양쪽 단이 각각 영역 너비의 이 비율 이상이어야 함
+MIN_COLUMN_RATIO = 0.3
+# 재귀 깊이 한계 (병적인 이미지에서 과도한 분할 방지)
+MAX_DEPTH = 8
+
+
+def split_into_tiles(image: Image.Image, max_tiles: int) -> List[Image.Image]:
+    """
+    최대 max_tiles개 타일 이미지 (읽는 순서). 나눌 필요가 없거나 글자 줄을 찾지 못하면 [image]
+    CPU 작업이므로 asyncio.to_thread에서 호출
+    """
+    if max_tiles <= 1:
+        return [image]
+    gray = image if image.mode == "L" else image.convert("L")
+    text_height = estimate_text_height(gray)
+    if not text_height:
+        return [image]
+    tiles = plan_tiles(gray, max_tiles, text_height)
+    if len(tiles) <= 1:
+        return [image]
+
+    # Tesseract는 글자 주변에 여백이 있어야 잘 읽으므로 흰 테두리를 붙임
+    # (타일 좌표를 넓히면 옆 타일의 글자가 일부 들어오므로 잘라낸 뒤 테두리를 덧붙임)
+    margin = max(4, int(text_height // 2))
+    return [ImageOps.expand(image.crop(tile), border=margin, fill="white") for tile in tiles]
+
+
+def plan_tiles(gray: Image.Image, max_tiles: int, text_height: float) -> List[Box]:
+    """그레이스케일 이미지의 OCR 타일 좌표 목록 (읽는 순서, 최대 max_tiles개)"""
+    full = (0, 0, gray.width, gray.height)
+
+    pixels = np.asarray(gray, dtype=np.int16)
+    ink = pixels < np.median(pixels) - INK_CONTRAST
+    region = _trim(ink, full)
+    if region is None:
+        return [full]
+
+    planner = _TilePlanner(ink, text_height)
+    planner.cut(region, max_tiles, 0)
+    return planner.tiles
+
+
+def join_tile_texts(texts: List[str]) -> str:
+    """타일별 OCR 결과를 읽는 순서대로 이어 붙임 (빈 타일 제외)"""
+    return "\n\n".join(text.strip() for text in texts if text.strip())
+
+
+class _TilePlanner:
+    def __init__(self, ink: np.ndarray, text_height: float):
+        self.ink = ink
+        self.min_row_gap = max(2, int(text_height // 2))
+        self.min_column_gap = max(4, int(text_height * 2))
+        self.tiles: List[Box] = []
+
+    def cut(self, region: Box, budget: int, depth: int) -> None:
+        """region을 최대 budget개 타일로 나눔"""
+        if budget <= 1 or depth >= MAX_DEPTH:
+            self.tiles.append(region)
+            return
+        left, top, right, bottom = region
+        block = self.ink[top:bottom, left:right]
+
+        columns = _segments(block.any(axis=0), self.min_column_gap)
+        min_width = (right - left) * MIN_COLUMN_RATIO
+        if len(columns) > 1 and all(end - start >= min_width for start, end in columns):
+            self._cut_groups([(left + start, top, left + end, bottom) for start, end in columns], budget, depth, axis=0)
+            return
+
+        rows = self._paragraphs(block.any(axis=1))
+        if len(rows) > 1:
+            self._cut_groups([(left, top + start, right, top + end) for start, end in rows], budget, depth, axis=1)
+            return
+
+        self.tiles.extend(self._split_lines(region, budget))
+
+    def _paragraphs(self, has_ink: np.ndarray) -> List[Tuple[int, int]]:
+        """
+        문단 단위 가로 구간: 보통 줄 간격보다 확실히 넓은 빈 행에서만 나눔
+        (줄 간격마다 나누면 나란히 놓인 두 단이 줄 단위로 섞여 읽는 순서가 깨짐)
+        """
+        lines = _segments(has_ink, 1)
+        if len(lines) < 2:
+            return lines
+        gaps = np.array([lines[i + 1][0] - lines[i][1] for i in range(len(lines) - 1)])
+        min_gap = max(self.min_row_gap, int(np.median(gaps) * 1.5))
+        return _segments(has_ink, min_gap)
+
+    def _cut_groups(self, regions: List[Box], budget: int, depth: int, axis: int) -> None:
+        """이웃한 조각을 최대 budget개 묶음으로 합치고, 묶음마다 면적에 비례해 타일 수를 나눠 재귀"""
+        groups = _group(regions, budget, axis)
+        shares = _allocate([_area(group) for group in groups], budget)
+        for group, share in zip(groups, shares):
+            trimmed = _trim(self.ink, group)
+            if trimmed is not None:
+                self.cut(trimmed, share, depth + 1)
+
+    def _split_lines(self, region: Box, pieces: int) -> List[Box]:
+        """여백으로 더 나눌 수 없는 블록: 같은 높이에 가장 가까운 줄 사이 빈 행에서 가로로 자름"""
+        left, top, right, bottom = region
+        lines = _segments(self.ink[top:bottom, left:right].any(axis=1), 1)
+        if len(lines) < 2:
+            return [region]
+        gaps = np.array([(lines[i][1] + lines[i + 1][0]) // 2 for i in range(len(lines) - 1)])
+        targets = (bottom - top) * np.arange(1, pieces) / pieces
+        cuts = sorted({int(gaps[np.argmin(np.abs(gaps - target))]) for target in targets})
+        edges = [0, *cuts, bottom - top]
+        return [(left, top + start, right, top + end) for start, end in zip(edges, edges[1:]) if end > start]
+
+
+def _group(regions: List[Box], count: int, axis: int) -> List[Box]:
+    """
+    axis 방향(0: 단, 1: 가로 구간)으로 나란히 놓인 조각들을 위치 기준으로 최대 count개 묶음으로 합침
+    (묶음 = 첫 조각 ~ 마지막 조각을 덮는 영역)
+    """
+    if len(regions) <= count:
+        return regions
+    axis_start, axis_end = axis, axis + 2
+    first, extent = regions[0][axis_start], regions[-1][axis_end] - regions[0][axis_start]
+    groups: List[list] = []
+    for region in regions:
+        middle = (region[axis_start] + region[axis_end]) / 2 - first
+        index = min(count - 1, int(middle * count // max(1, extent)))
+        if groups and groups[-1][1] == index:
+            groups[-1][0] = _union(groups[-1][0], region)
+        else:
+            groups.append([region, index])
+    return [region for region, _ in groups]
+
+
+def _allocate(areas: List[int], budget: int) -> List[int]:
+    """
+    타일 수 budget을 면적에 비례해 나눔 (합계는 budget 이하)
+    묶음마다 1개씩 먼저 주고 남는 budget - 묶음 수만 면적 비례로, 나머지는 면적이 큰 묶음부터
+    (묶음 수는 _group으로 budget 이하로 줄인 뒤 호출)
+    """
+    shares = [1] * len(areas)
+    spare = budget - len(areas)
+    if spare <= 0:
+        return shares
+    total = sum(areas) or 1
+    for index, area in enumerate(areas):
+        shares[index] += int(spare * area / total)
+    left = budget - sum(shares)
+    for index in sorted(range(len(areas)), key=lambda i: -areas[i])[:left]:
+        shares[index] += 1
+    return shares
+
+
+def _union(a: Box, b: Box) -> Box:
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+
+def _segments(has_ink: np.ndarray, min_gap: int) -> List[Tuple[int, int]]:
+    """잉크가 있는 구간 [(시작, 끝)] (min_gap보다 짧은 빈 구간은 이어진 것으로 봄)"""
+    positions = np.flatnonzero(has_ink)
+    if not len(positions):
+        return []
+    breaks = np.flatnonzero(np.diff(positions) > min_gap)
+    starts = np.concatenate(([positions[0]], positions[breaks + 1]))
+    ends = np.concatenate((positions[breaks], [positions[-1]])) + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def _trim(ink: np.ndarray, region: Box):
+    """영역을 잉크가 있는 범위로 줄임 (잉크가 없으면 None)"""
+    left, top, right, bottom = region
+    block = ink[top:bottom, left:right]
+    rows = np.flatnonzero(block.any(axis=1))
+    if not len(rows):
+        return None
+    columns = np.flatnonzero(block.any(axis=0))
+    return left + int(columns[0]), top + int(rows[0]), left + int(columns[-1]) + 1, top + int(rows[-1]) + 1
+
+
+def _area(region: Box) -> int:
+    left, top, right, bottom = region
+    return (right - left) * (bottom - top)
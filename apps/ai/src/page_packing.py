@@ -0,0 +1,181 @@
+"""
+토큰 예산 기반 페이지 묶기/나누기
+
+메뉴 추출 LLM 호출은 페이지당 1회였기 때문에
+- 거의 빈 페이지도 매번 프롬프트 전체 비용을 내고
+- 아주 빽빽한 페이지는 긴 응답을 한 번에 생성하느라 느렸습니다.
+
+pack_pages는 페이지별 토큰 수를 세어
+- 작은 페이지(small_page_tokens 이하)가 연속되면 max_tokens까지 한 번의 호출로 묶고
+- max_tokens를 넘는 페이지는 줄 단위로 나눠 여러 호출로 병렬 처리합니다.
+각 묶음(PageChunk)은 원래 페이지 번호를 가지고 있어 결과를 페이지별로 되돌릴 수 있습니다.
+여러 페이지를 묶은 텍스트는 페이지마다 PAGE_MARKER 줄로 시작하고, 모델이 메뉴마다 페이지 번호를 함께 돌려줍니다.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+try:
+    import tiktoken  # langchain-openai 의존성
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# 모델별 토크나이저 (불러오지 못한 모델은 None → 바이트 기반 추정)
+_encodings: Dict[str, object] = {}
+
+# 묶음 텍스트에서 각 페이지의 시작을 표시하는 줄 (page: 1부터 시작하는 페이지 번호)
+PAGE_MARKER = "=== PAGE {page} ==="
+
+
+def count_tokens(text: str, model: str) -> int:
+    """모델 토크나이저로 토큰 수 계산 (tiktoken이 없거나 토크나이저를 불러오지 못하면 UTF-8 바이트 기반 추정)"""
+    if model not in _encodings:
+        _encodings[model] = _load_encoding(model)
+    encoding = _encodings[model]
+    if encoding is None:
+        return len(text.encode("utf-8")) // 3
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _load_encoding(model: str):
+    """
+    tiktoken은 처음 쓸 때 BPE 파일을 내려받으므로 네트워크가 없는 서버에서는 실패할 수 있음
+    (토큰 수는 묶기/나누기 판단에만 쓰므로 실패해도 요청을 실패시키지 않고 추정값 사용)
+    """
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"[PACK] Failed to load tokenizer for {model}, using byte-based token estimate: {e}")
+        return None
+
+
+class PageChunk:
+    """LLM 호출 1회 분량의 텍스트와 그 출처 페이지"""
+
+    def __init__(self, pages: List[int], text: str, part: int = 1, parts: int = 1,
+                 page_texts: Optional[List[str]] = None):
+        self.pages = pages  # 0부터 시작하는 페이지 인덱스 (묶음이면 여러 개)
+        self.text = text
+        self.page_texts = page_texts or [text]  # 페이지별 원문 (묶음 결과의 페이지 판정용)
+        self.part = part    # 나뉜 페이지의 몇 번째 조각인지 (1부터)
+        self.parts = parts  # 나뉜 조각 수 (나뉘지 않았으면 1)
+
+    @property
+    def first_page(self) -> int:
+        return self.pages[0]
+
+    @property
+    def packed(self) -> bool:
+        """여러 페이지를 묶은 호출인지 (페이지 표시가 있는 프롬프트 사용)"""
+        return len(self.pages) > 1
+
+    def page_for(self, page_number: Optional[int], name: str) -> int:
+        """
+        결과 메뉴 하나가 속한 페이지 인덱스
+        모델이 알려준 페이지 번호(1부터) → 메뉴 이름이 원문에 나오는 페이지 → 첫 페이지 순으로 판정
+        """
+        if not self.packed:
+            return self.first_page
+        if page_number is not None and page_number - 1 in self.pages:
+            return page_number - 1
+        for index, text in zip(self.pages, self.page_texts):
+            if name and name in text:
+                return index
+        return self.first_page
+
+    def __repr__(self) -> str:
+        return f"PageChunk(pages={self.pages}, part={self.part}/{self.parts}, chars={len(self.text)})"
+
+
+def split_text_by_lines(text: str, max_tokens: int, model: str) -> List[str]:
+    """줄 경계에서 max_tokens 이하 조각으로 나눔 (한 줄이 max_tokens보다 길면 그 줄만 단독 조각)"""
+    parts = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for line in text.splitlines(keepends=True):
+        line_tokens = count_tokens(line, model)
+        if current and current_tokens + line_tokens > max_tokens:
+            parts.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += line_tokens
+
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def pack_pages(texts: List[str], model: str, max_tokens: int, small_page_tokens: int,
+               page_indices: Optional[List[int]] = None) -> List[PageChunk]:
+    """
+    페이지 텍스트 목록을 LLM 호출 단위(PageChunk) 목록으로 변환 (페이지 순서 유지)
+    page_indices: texts 각각의 원래 페이지 인덱스 (기본값: 0, 1, 2, ...)
+    선별 단계에서 비운 페이지(빈 페이지, 중복 페이지, 텍스트 부족)처럼 공백뿐인 페이지는 어느 묶음에도 넣지 않음
+    (그런 페이지만 있으면 빈 목록 → LLM 호출 없음, attribute_chunk_results에서 빈 결과)
+    """
+    if page_indices is None:
+        page_indices = list(range(len(texts)))
+
+    chunks: List[PageChunk] = []
+    pack_indices: List[int] = []
+    pack_texts: List[str] = []
+    pack_tokens = 0
+
+    def flush():
+        nonlocal pack_indices, pack_texts, pack_tokens
+        if len(pack_indices) == 1:
+            chunks.append(PageChunk(pack_indices, pack_texts[0]))
+        elif pack_indices:
+            text = "\n\n".join(
+                f"{PAGE_MARKER.format(page=index + 1)}\n{page_text}" for index, page_text in zip(pack_indices, pack_texts)
+            )
+            chunks.append(PageChunk(pack_indices, text, page_texts=pack_texts))
+        pack_indices, pack_texts, pack_tokens = [], [], 0
+
+    for index, text in zip(page_indices, texts):
+        if not text.strip():
+            continue
+        tokens = count_tokens(text, model)
+
+        if tokens > max_tokens:
+            flush()
+            parts = split_text_by_lines(text, max_tokens, model)
+            for part_number, part_text in enumerate(parts, start=1):
+                chunks.append(PageChunk([index], part_text, part_number, len(parts)))
+            continue
+
+        if tokens > small_page_tokens:
+            flush()
+            chunks.append(PageChunk([index], text))
+            continue
+
+        # 작은 페이지: 예산 안에서 이어 붙임
+        if pack_indices and pack_tokens + tokens > max_tokens:
+            flush()
+        pack_indices.append(index)
+        pack_texts.append(text)
+        pack_tokens += tokens
+
+    flush()
+    return chunks
+
+
+def attribute_chunk_results(chunks: List[PageChunk], chunk_results: List[list], page_count: int) -> List[list]:
+    """
+    묶음별 결과를 페이지별 결과로 되돌림 (결과 항목은 page, name 속성을 가진 메뉴)
+    - 여러 페이지를 묶은 호출의 결과는 메뉴마다 chunk.page_for()로 판정한 페이지에 귀속
+    - 나뉜 페이지는 모든 조각의 결과를 순서대로 합침
+    """
+    per_page: List[list] = [[] for _ in range(page_count)]
+    for chunk, result in zip(chunks, chunk_results):
+        for menu in result:
+            per_page[chunk.page_for(menu.page, menu.name)].append(menu)
+    return per_page
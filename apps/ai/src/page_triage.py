@@ -0,0 +1,109 @@
+"""
+페이지 선별 (triage)
+
+본사에서 내려오는 PDF에는 표지, 사진만 있는 페이지, 반복 페이지가 많고 이들도 Tesseract 전체 패스와
+LLM 호출 비용을 그대로 냅니다. OCR 전에 렌더링된 이미지로 값싼 판단을 먼저 합니다.
+
+- blank: 축소한 그레이스케일 이미지의 픽셀 통계로 빈 페이지 판정 → OCR/LLM 생략
+- duplicate: 같은 문서 안에서 렌더링된 픽셀이 완전히 같은 페이지 → OCR/LLM 생략 (원본 페이지에서 같은 메뉴가 추출됨)
+- near_duplicate: 지각 해시(dHash)와 썸네일이 거의 같은 페이지 → 원본 페이지의 OCR 결과를 재사용하되 LLM은 실행
+  (같은 양식에 메뉴 이름만 다른 페이지도 해시가 비슷하므로, 결과를 건너뛰는 판단은 정확히 같은 페이지에만 적용)
+- low_text: OCR 결과에 의미 있는 문자가 너무 적은 페이지(사진, 로고 등) → LLM 생략
+"""
+
+import asyncio
+import hashlib
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+_MEANINGFUL_CHAR = re.compile(r"[가-힣A-Za-z0-9]")
+
+# dHash 크기: (HASH_SIZE + 1) x HASH_SIZE 그레이 이미지의 가로 인접 픽셀 비교 → HASH_SIZE² 비트
+HASH_SIZE = 16
+# 해시가 비슷한 페이지를 최종 확인할 때 쓰는 썸네일 크기
+THUMBNAIL_SIZE = (128, 128)
+# 거의 같은 페이지 최종 확인용 축소 이미지 크기 (블록 평균). 한 줄의 글자만 달라도 그 블록의 차이가 커짐
+DETAIL_SIZE = (256, 256)
+
+
+class PageFingerprint:
+    """렌더링된 페이지 한 장의 값싼 통계 (OCR 전 판단용)"""
+
+    def __init__(self, blank: bool, ink_ratio: float, dhash: np.ndarray, thumbnail: np.ndarray, detail: np.ndarray,
+                 pixel_hash: str):
+        self.blank = blank
+        self.ink_ratio = ink_ratio
+        self.dhash = dhash          # bool 배열 (HASH_SIZE²)
+        self.thumbnail = thumbnail  # float32 그레이 썸네일
+        self.detail = detail        # uint8 그레이 축소 이미지 (DETAIL_SIZE)
+        self.pixel_hash = pixel_hash  # 렌더링된 픽셀 전체의 SHA-256 (정확히 같은 페이지 판정용)
+
+
+def fingerprint_page(image: Image.Image, blank_ink_ratio: float) -> PageFingerprint:
+    """
+    빈 페이지 여부와 지각 해시 계산 (축소 이미지로만 계산하므로 페이지당 수 ms)
+    ink_ratio: 배경(중앙값)보다 40단계 이상 어두운 픽셀 비율
+    """
+    gray = image.convert("L")
+    thumbnail = np.asarray(gray.resize(THUMBNAIL_SIZE, Image.Resampling.BILINEAR), dtype=np.float32)
+
+    background = float(np.median(thumbnail))
+    ink_ratio = float(np.mean(thumbnail < background - 40))
+    blank = ink_ratio < blank_ink_ratio or float(thumbnail.std()) < 2.0
+
+    small = np.asarray(gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR), dtype=np.int16)
+    dhash = (small[:, 1:] > small[:, :-1]).flatten()
+
+    detail = np.asarray(gray.resize(DETAIL_SIZE, Image.Resampling.BOX), dtype=np.uint8)
+
+    pixel_hash = hashlib.sha256(f"{image.mode}:{image.size}".encode())
+    pixel_hash.update(image.tobytes())
+
+    return PageFingerprint(blank, ink_ratio, dhash, thumbnail, detail, pixel_hash.hexdigest())
+
+
+def has_enough_text(text: str, min_chars: int) -> bool:
+    """OCR 결과에 한글/영문/숫자가 min_chars개 이상 있는지"""
+    return len(_MEANINGFUL_CHAR.findall(text)) >= min_chars
+
+
+class DuplicatePageDetector:
+    """
+    문서 하나 안에서 중복 페이지를 찾고, 원본 페이지의 OCR 결과를 기다렸다가 재사용할 수 있게 함
+    (원본 페이지는 register()로 등록한 뒤 OCR이 끝나면 반환된 Future에 텍스트를 채움)
+    """
+
+    def __init__(self, max_hash_distance: int = 4, max_thumbnail_diff: float = 2.0, max_detail_diff: int = 24):
+        self.max_hash_distance = max_hash_distance
+        self.max_thumbnail_diff = max_thumbnail_diff
+        self.max_detail_diff = max_detail_diff
+        self._pages: List[Tuple[int, PageFingerprint, asyncio.Future]] = []
+
+    def find(self, fingerprint: PageFingerprint) -> Optional[Tuple[int, asyncio.Future, bool]]:
+        """
+        중복이면 (원본 페이지 인덱스, 원본 OCR 텍스트 Future, 픽셀까지 같은지) 반환
+        픽셀까지 같은 페이지를 먼저 찾고, 없으면 거의 같은 페이지를 찾음
+        """
+        for index, other, text_future in self._pages:
+            if fingerprint.pixel_hash == other.pixel_hash:
+                return index, text_future, True
+        for index, other, text_future in self._pages:
+            distance = int(np.count_nonzero(fingerprint.dhash != other.dhash))
+            if distance > self.max_hash_distance:
+                continue
+            if float(np.mean(np.abs(fingerprint.thumbnail - other.thumbnail))) > self.max_thumbnail_diff:
+                continue
+            # 같은 양식에 메뉴 이름만 다른 페이지는 해시/썸네일 평균이 거의 같으므로,
+            # 블록별 차이의 최댓값으로 달라진 부분이 한 군데도 없는지 확인
+            detail_diff = int(np.max(np.abs(fingerprint.detail.astype(np.int16) - other.detail.astype(np.int16))))
+            if detail_diff <= self.max_detail_diff:
+                return index, text_future, False
+        return None
+
+    def register(self, index: int, fingerprint: PageFingerprint) -> asyncio.Future:
+        text_future = asyncio.get_running_loop().create_future()
+        self._pages.append((index, fingerprint, text_future))
+        return text_future
@@ -0,0 +1,138 @@
+"""
+스트리밍 PDF 래스터라이저
+
+convert_from_bytes는 문서 전체를 렌더링한 뒤에야 반환하고, 모든 페이지를 원본 해상도 PIL 이미지로
+동시에 메모리에 들고 있습니다. PdfRasterizer는 작은 페이지 범위 단위로 렌더링하며 비동기 제너레이터로
+한 페이지씩 내보내므로, 2페이지를 렌더링하는 동안 1페이지 OCR이 진행됩니다.
+
+- 렌더링은 백그라운드 태스크에서 진행되고, prefetch_pages 크기의 큐로 앞서 나가는 양을 제한
+- 업로드 스풀 파일 경로를 페이지 범위마다 그대로 사용 (PDF 바이트를 메모리에 올리지 않음)
+- 소비자가 이미지 참조를 놓으면 바로 해제됨
+- 렌더링 전에 페이지 범위 크기만큼 메모리 예산을 예약하고, 오래 기다려야 하면 degraded_dpi로 렌더링
+  예약은 페이지별로 나눠 이미지와 함께 넘기므로 소비자가 페이지 처리를 끝내면 release() 호출
+"""
+
+import asyncio
+import re
+import time
+from typing import AsyncIterator, List, Optional, Tuple
+
+from pdf2image import convert_from_path, pdfinfo_from_path
+from PIL import Image
+
+from src.memory_budget import MemoryBudget, MemoryReservation, image_bytes
+from src.metrics import RASTERIZE_SECONDS, observe
+from src.tracing import span
+
+_END = object()
+
+# pdfinfo가 페이지 크기를 알려주지 않을 때 쓰는 크기 (A4, pt 단위)
+DEFAULT_PAGE_SIZE_PTS = (595.0, 842.0)
+
+
+class PdfRasterizer:
+    def __init__(self, poppler_path: Optional[str], batch_size: int = 2, prefetch_pages: int = 2, dpi: int = 200,
+                 memory_budget: Optional[MemoryBudget] = None, degraded_dpi: Optional[int] = None):
+        self.poppler_path = poppler_path
+        self.batch_size = batch_size
+        self.prefetch_pages = prefetch_pages
+        self.dpi = dpi
+        self.memory_budget = memory_budget or MemoryBudget(0)
+        self.degraded_dpi = degraded_dpi if degraded_dpi and degraded_dpi < dpi else None
+
+    async def page_count(self, pdf_path: str) -> int:
+        pages, _ = await self.inspect(pdf_path)
+        return pages
+
+    async def inspect(self, pdf_path: str) -> Tuple[int, Tuple[float, float]]:
+        """(페이지 수, 첫 페이지 크기 (pt)). 페이지 크기는 렌더링 메모리 예약량 계산에 사용"""
+        info = await asyncio.to_thread(pdfinfo_from_path, pdf_path, poppler_path=self.poppler_path)
+        match = re.match(r"\s*([\d.]+) x ([\d.]+) pts", str(info.get("Page size", "")))
+        page_size = (float(match.group(1)), float(match.group(2))) if match else DEFAULT_PAGE_SIZE_PTS
+        return int(info["Pages"]), page_size
+
+    def page_bytes(self, page_size: Tuple[float, float], dpi: int) -> int:
+        """dpi로 렌더링한 페이지 한 장의 예상 메모리 크기"""
+        width_pts, height_pts = page_size
+        return image_bytes(int(width_pts * dpi / 72), int(height_pts * dpi / 72))
+
+    def _render_range(self, pdf_path: str, first_page: int, last_page: int, dpi: int):
+        return convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            first_page=first_page,
+            last_page=last_page,
+            poppler_path=self.poppler_path,
+        )
+
+    async def iter_pages(
+        self, pdf_path: str, page_indices: List[int], page_size: Tuple[float, float] = DEFAULT_PAGE_SIZE_PTS
+    ) -> AsyncIterator[Tuple[int, Image.Image, MemoryReservation]]:
+        """
+        지정한 페이지들(0부터 시작하는 인덱스)을 순서대로 렌더링하여 (페이지 인덱스, 이미지, 메모리 예약)을 내보냄
+        연속된 페이지는 batch_size 단위의 페이지 범위로 묶어 pdftoppm 호출 수를 줄임
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.prefetch_pages)
+
+        async def produce():
+            pending = []  # 아직 소비자에게 넘기지 않은 페이지 예약
+            try:
+                for first_page, last_page in self._page_ranges(page_indices):
+                    pages = last_page - first_page + 1
+                    sizes = [self.page_bytes(page_size, self.dpi) * pages]
+                    if self.degraded_dpi:
+                        sizes.append(self.page_bytes(page_size, self.degraded_dpi) * pages)
+                    with span("memory.reserve", pages=pages) as reserve_span:
+                        reservation = await self.memory_budget.reserve(sizes)
+                        reserve_span.set(bytes=reservation.nbytes, degraded=reservation.degraded)
+                    pending = reservation.split(pages)
+                    dpi = self.degraded_dpi if reservation.degraded else self.dpi
+
+                    render_start = time.time()
+                    with span("pdf.rasterize", first_page=first_page, last_page=last_page, dpi=dpi):
+                        images = await asyncio.to_thread(self._render_range, pdf_path, first_page, last_page, dpi)
+                    observe(RASTERIZE_SECONDS, time.time() - render_start)
+                    for offset, image in enumerate(images):
+                        await queue.put((first_page - 1 + offset, image, pending[0]))
+                        pending.pop(0)
+                    while pending:  # pdftoppm이 페이지를 덜 돌려준 경우
+                        pending.pop().release()
+                    del images
+                await queue.put(_END)
+            except Exception as e:
+                await queue.put(e)
+            finally:
+                # 렌더링 도중 취소/실패하면 아직 넘기지 못한 페이지의 예약 반납
+                for leftover in pending:
+                    leftover.release()
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+                del item  # 소비자가 처리 후 참조를 놓으면 이미지가 바로 해제되도록
+        finally:
+            if not producer.done():
+                producer.cancel()
+            # 소비자가 받지 않은 채 큐에 남은 페이지의 예약 반납
+            while not queue.empty():
+                item = queue.get_nowait()
+                if isinstance(item, tuple):
+                    item[2].release()
+
+    def _page_ranges(self, page_indices: List[int]) -> List[Tuple[int, int]]:
+        """[0, 1, 2, 5, 6] → [(1, 2), (3, 3), (6, 7)] (batch_size=2, 1부터 시작하는 페이지 번호)"""
+        ranges = []
+        for index in sorted(page_indices):
+            page = index + 1
+            if ranges and ranges[-1][1] == page - 1 and ranges[-1][1] - ranges[-1][0] + 1 < self.batch_size:
+                ranges[-1] = (ranges[-1][0], page)
+            else:
+                ranges.append((page, page))
+        return ranges
+
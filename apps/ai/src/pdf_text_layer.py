@@ -0,0 +1,62 @@
+"""
+디지털 PDF 텍스트 레이어 추출
+
+Word/Excel에서 내보낸 PDF는 이미 텍스트 레이어를 가지고 있으므로 래스터화 + OCR 없이
+poppler의 pdftotext로 페이지별 텍스트를 바로 꺼낼 수 있습니다 (결과도 결정적).
+스캔 문서나 폰트 매핑이 깨진 페이지는 품질 기준을 통과하지 못하므로 기존 OCR 경로로 처리합니다.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import subprocess
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 의미 있는 문자: 한글 음절, 영문/숫자
+_MEANINGFUL_CHAR = re.compile(r"[가-힣A-Za-z0-9]")
+# 유니코드 매핑이 없는 글리프를 pdftotext가 출력하는 형식
+_CID_GLYPH = re.compile(r"\(cid:\d+\)")
+
+
+def text_layer_quality(text: str) -> float:
+    """공백을 제외한 문자 중 의미 있는 문자(한글/영문/숫자)의 비율 (깨진 글리프, (cid:123) 등이 많으면 낮아짐)"""
+    visible = _CID_GLYPH.sub("\x00", re.sub(r"\s+", "", text))
+    if not visible:
+        return 0.0
+    return len(_MEANINGFUL_CHAR.findall(visible)) / len(visible)
+
+
+def is_usable_text_layer(text: str, min_chars: int, min_quality: float) -> bool:
+    if "\ufffd" in text:  # 유니코드 매핑이 없는 폰트 (대체 문자) → OCR이 더 정확
+        return False
+    meaningful = len(_MEANINGFUL_CHAR.findall(_CID_GLYPH.sub("", text)))
+    return meaningful >= min_chars and text_layer_quality(text) >= min_quality
+
+
+def _run_pdftotext(pdf_path: str, poppler_path: Optional[str]) -> str:
+    command = os.path.join(poppler_path, "pdftotext") if poppler_path else "pdftotext"
+    completed = subprocess.run(
+        [command, "-enc", "UTF-8", pdf_path, "-"],
+        capture_output=True,
+        check=True,
+        timeout=60,
+    )
+    return completed.stdout.decode("utf-8", errors="replace")
+
+
+async def extract_text_layer(pdf_path: str, page_count: int, poppler_path: Optional[str]) -> List[str]:
+    """
+    페이지별 텍스트 레이어를 반환 (pdftotext는 페이지를 \\f로 구분)
+    추출에 실패하면 모든 페이지를 빈 문자열로 반환하여 OCR 경로로 넘김
+    """
+    try:
+        output = await asyncio.to_thread(_run_pdftotext, pdf_path, poppler_path)
+    except Exception as e:
+        logger.warning(f"[TEXT-LAYER] pdftotext failed ({e}) - falling back to OCR for all pages")
+        return [""] * page_count
+
+    pages = output.split("\f")[:page_count]
+    return pages + [""] * (page_count - len(pages))
@@ -0,0 +1,201 @@
+"""
+업로드 결과 캐시 (content-addressed)
+
+같은 PDF/사진이 반복 업로드되는 경우 OCR + LLM 파이프라인 전체를 건너뛰기 위한 캐시입니다.
+- 키: 업로드 바이트의 SHA-256 + OCR 언어 + 모델 이름 + 프롬프트 버전
+- 값: 페이지별 메뉴 목록과 페이지 처리 시간 (스트리밍 엔드포인트에서 progress 이벤트 재생용)
+- 1차: 메모리 LRU (직렬화된 바이트 크기 기준으로 제거)
+- 2차: 디스크 (서버 재시작 후에도 유지)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(content_hash: str, *parts: str) -> str:
+    """콘텐츠 해시와 처리 파라미터(OCR 언어, 모델, 프롬프트 버전 등)를 합쳐 캐시 키를 만듭니다."""
+    key_source = "\x00".join([content_hash, *parts])
+    return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, cache_dir: str, max_memory_bytes: int, max_disk_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        # 메모리 계층: {key: 직렬화된 JSON 바이트}, 가장 최근에 사용한 항목이 뒤쪽
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+
+        # 디스크 계층은 to_thread로 접근하므로 크기 계산은 락으로 보호
+        self._disk_lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        self.errors = 0
+
+    # --- 공개 API ---
+    async def get(self, key: str) -> Optional[dict]:
+        payload = self._memory_get(key)
+        if payload is not None:
+            self.memory_hits += 1
+            return json.loads(payload)
+
+        try:
+            payload = await asyncio.to_thread(self._disk_get, key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"[CACHE] Disk read failed for {key[:12]}: {e}")
+            payload = None
+
+        if payload is None:
+            self.misses += 1
+            return None
+
+        self.disk_hits += 1
+        self._memory_put(key, payload)  # 디스크 히트는 메모리로 승격
+        return json.loads(payload)
+
+    async def contains(self, key: str) -> bool:
+        """값을 읽지 않고 항목 존재 여부만 확인 (히트/미스 통계에 넣지 않음)"""
+        if key in self._memory:
+            return True
+        return await asyncio.to_thread(os.path.exists, self._path_for(key))
+
+    async def put(self, key: str, value: dict) -> None:
+        payload = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        self._memory_put(key, payload)
+        self.stores += 1
+        try:
+            await asyncio.to_thread(self._disk_put, key, payload)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"[CACHE] Disk write failed for {key[:12]}: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "memory_evictions": self.memory_evictions,
+            "disk_bytes": self._disk_bytes or 0,
+            "disk_evictions": self.disk_evictions,
+            "errors": self.errors,
+        }
+
+    # --- 메모리 계층 ---
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        payload = self._memory.get(key)
+        if payload is not None:
+            self._memory.move_to_end(key)
+        return payload
+
+    def _memory_put(self, key: str, payload: bytes) -> None:
+        if len(payload) > self.max_memory_bytes:
+            return  # 한 항목이 메모리 한도보다 크면 디스크에만 저장
+
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+
+        self._memory[key] = payload
+        self._memory_bytes += len(payload)
+
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.memory_evictions += 1
+
+    # --- 디스크 계층 ---
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        path = self._path_for(key)
+        try:
+            with open(path, "rb") as f:
+                payload = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # mtime을 최근 사용 시각으로 갱신 (디스크 정리 시 LRU 순서로 사용)
+        return payload
+
+    def _disk_put(self, key: str, payload: bytes) -> None:
+        path = self._path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # 임시 파일에 쓴 뒤 rename하여 중간에 죽어도 깨진 파일이 남지 않도록 함
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += len(payload) - previous_size
+            if self._disk_bytes > self.max_disk_bytes:
+                self._prune_disk()
+
+    def _iter_disk_entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for shard in os.listdir(self.cache_dir):
+            shard_dir = os.path.join(self.cache_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if name.endswith(".json"):
+                    path = os.path.join(shard_dir, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, st.st_size, st.st_mtime
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(size for _, size, _ in self._iter_disk_entries())
+
+    def _prune_disk(self) -> None:
+        # 한도를 넘으면 오래 사용되지 않은 파일부터 90% 수준까지 삭제
+        target = int(self.max_disk_bytes * 0.9)
+        entries = sorted(self._iter_disk_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.disk_evictions += 1
+        self._disk_bytes = total
@@ -0,0 +1,130 @@
+"""
+동일 요청 합치기 (single-flight)
+
+매장 관리자가 메뉴 PDF를 공유하면 직원 여러 명이 몇 초 안에 같은 파일을 올리고, 결과 캐시는 첫 요청이
+끝나야 채워지므로 업로드마다 OCR + LLM 파이프라인 전체가 따로 돌았습니다.
+같은 키(파일 내용 해시 등)로 이미 실행 중인 작업이 있으면 새로 시작하지 않고 그 결과를 함께 받습니다.
+
+- run(): 코루틴 결과를 공유 (/generate/menus)
+- stream(): 이벤트 스트림을 공유 (SSE 엔드포인트). 늦게 붙은 요청은 지금까지의 이벤트를 먼저 재생받은 뒤
+  이어지는 이벤트를 실시간으로 받음
+
+작업은 요청과 분리된 태스크에서 실행되므로, 먼저 시작한 클라이언트가 연결을 끊어도 다른 요청은 계속 결과를 받습니다.
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EventBroadcast:
+    """이벤트 기록 + 구독자 알림 (작업 하나 분량)"""
+
+    def __init__(self):
+        self.history: List = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._changed = asyncio.Event()
+
+    def publish(self, event) -> None:
+        self.history.append(event)
+        self._notify()
+
+    def close(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def subscribe(self) -> AsyncIterator:
+        position = 0
+        while True:
+            while position < len(self.history):
+                yield self.history[position]
+                position += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+    def _notify(self) -> None:
+        # 기다리던 구독자를 모두 깨우고 다음 알림용 이벤트로 교체
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._streams: Dict[Hashable, EventBroadcast] = {}
+        self._tasks: set = set()  # 스트림 생산 태스크가 GC되지 않도록 참조 유지
+
+        self.leaders = 0    # 새로 시작한 작업 수
+        self.followers = 0  # 실행 중인 작업에 합쳐진 요청 수
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable]):
+        """key로 실행 중인 작업이 있으면 그 결과를, 없으면 factory()를 실행해 결과를 반환"""
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.create_task(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda finished: self._finish_call(key, finished))
+        else:
+            self.followers += 1
+            logger.info(f"[SINGLE-FLIGHT] Joining in-flight call {key!r}")
+
+        # 한 요청이 취소되어도 공유 작업은 계속 실행
+        return await asyncio.shield(task)
+
+    async def stream(self, key: Hashable, factory: Callable[[], AsyncIterator]) -> AsyncIterator:
+        """key로 실행 중인 스트림이 있으면 처음부터 재생하며 구독, 없으면 factory()로 새 스트림 시작"""
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            self.leaders += 1
+            broadcast = EventBroadcast()
+            self._streams[key] = broadcast
+            task = asyncio.create_task(self._produce(key, broadcast, factory()))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            self.followers += 1
+            logger.info(f"[SINGLE-FLIGHT] Joining in-flight stream {key!r} ({len(broadcast.history)} events to replay)")
+
+        async for event in broadcast.subscribe():
+            yield event
+
+    def in_flight(self, key: Hashable) -> bool:
+        """key로 실행 중인 작업/스트림이 있는지 (지금 요청하면 합쳐지는지)"""
+        return key in self._calls or key in self._streams
+
+    def stats(self) -> dict:
+        return {
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "in_flight_calls": len(self._calls),
+            "in_flight_streams": len(self._streams),
+        }
+
+    # --- 내부 구현 ---
+    def _finish_call(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # 모든 요청이 취소된 경우에도 예외가 '회수되지 않음' 경고로 남지 않도록
+
+    async def _produce(self, key: Hashable, broadcast: EventBroadcast, events: AsyncIterator) -> None:
+        try:
+            async for event in events:
+                broadcast.publish(event)
+            broadcast.close()
+        except Exception as e:
+            broadcast.close(e)
+        finally:
+            if not broadcast.done:  # 서버 종료 등으로 취소된 경우 구독자가 무한히 기다리지 않도록
+                broadcast.close(RuntimeError("Shared stream was cancelled"))
+            # 끝난 스트림에 새로 오는 요청은 결과 캐시에서 처리
+            if self._streams.get(key) is broadcast:
+                del self._streams[key]
@@ -0,0 +1,90 @@
+"""
+LLM 토큰 스트림용 증분 JSON 파서
+
+{"menus": [{...}, {...}]} 형태의 응답을 토큰 단위로 받으면서, 배열 안의 객체가 닫히는 즉시
+해당 객체를 dict로 돌려줍니다. 전체 응답을 기다린 뒤 정규식 3단계로 파싱하는 대신
+첫 메뉴를 수백 ms 안에 내보낼 수 있습니다.
+
+각 문자는 한 번만 스캔하고(문자열/이스케이프/중첩 상태만 유지), 완성된 객체 구간만 json.loads 하므로
+전체 응답 길이에 대해 선형 시간입니다.
+"""
+
+import json
+from typing import List
+
+
+class IncrementalJsonArrayItemParser:
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._buffer = ""        # 아직 닫히지 않은 배열 원소 객체가 시작된 위치부터의 텍스트
+        self._buffer_offset = 0  # _buffer[0]의 전체 텍스트 기준 위치
+        self._position = 0       # 지금까지 스캔한 전체 문자 수
+
+        self._containers: List[str] = []  # 열린 괄호 스택 ('{' 또는 '[')
+        self._object_starts: List[int] = []  # 열린 '{'의 전체 텍스트 기준 위치
+        self._object_is_item: List[bool] = []  # 열린 '{'가 배열의 원소인지
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def text(self) -> str:
+        """지금까지 받은 전체 텍스트 (스트림이 끝난 뒤 폴백 파싱용)"""
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> List[dict]:
+        """청크를 추가하고, 이번 청크에서 닫힌 '배열 원소 객체'들을 반환"""
+        self._chunks.append(chunk)
+        completed = []
+
+        # 버퍼에는 아직 닫히지 않은 가장 바깥 원소 객체의 시작부터만 남겨 크기를 원소 하나 수준으로 유지
+        item_starts = [start for start, is_item in zip(self._object_starts, self._object_is_item) if is_item]
+        if item_starts:
+            self._buffer = self._buffer[item_starts[0] - self._buffer_offset:]
+            self._buffer_offset = item_starts[0]
+        else:
+            self._buffer = ""
+            self._buffer_offset = self._position
+        self._buffer += chunk
+
+        for char in chunk:
+            position = self._position
+            self._position += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char == "[":
+                self._containers.append("[")
+            elif char == "{":
+                self._object_is_item.append(bool(self._containers) and self._containers[-1] == "[")
+                self._containers.append("{")
+                self._object_starts.append(position)
+            elif char == "]":
+                if self._containers and self._containers[-1] == "[":
+                    self._containers.pop()
+            elif char == "}":
+                if not self._containers or self._containers[-1] != "{":
+                    continue
+                self._containers.pop()
+                start = self._object_starts.pop()
+                is_item = self._object_is_item.pop()
+
+                # 배열의 원소인 객체만 내보냄 (바깥 {"menus": ...} 객체나 중첩된 값 객체는 제외)
+                if is_item:
+                    raw = self._buffer[start - self._buffer_offset:position - self._buffer_offset + 1]
+                    try:
+                        item = json.loads(raw)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(item, dict):
+                        completed.append(item)
+
+        return completed
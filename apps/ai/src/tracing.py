@@ -0,0 +1,231 @@
+"""
+요청별 트레이싱
+
+동시 요청의 로그가 섞여 있어 느린 업로드 하나가 렌더링, 특정 페이지 OCR, 메뉴 추출 LLM, 번역 중 어디서 느렸는지
+알 수 없었습니다. 요청마다 request ID를 붙이고, 단계/LLM 호출마다 중첩된 span(시작/종료 시각, 속성)을 기록해
+요청이 끝나면 트레이스 한 건을 JSONL 파일 한 줄로 내보냅니다 (크기 기준 로테이션).
+
+- request ID와 현재 span은 contextvars로 전달되므로 asyncio.create_task / to_thread로 만든 작업의 span도
+  만든 쪽 span의 자식으로 기록됨
+- 활성 트레이스가 없으면 span()은 아무것도 기록하지 않음
+- 루트 span이 끝난 뒤에 끝나는 span(연결이 끊긴 뒤에도 계속되는 공유 작업 등)은 기록되지 않음
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List, Optional
+
+
+class Span:
+    def __init__(self, trace: Optional["Trace"], name: str, parent_id: Optional[str], attributes: dict):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = dict(attributes)
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.status = "ok"
+
+    def set(self, **attributes) -> None:
+        """span 속성 추가 (결과 메뉴 수, 캐시 히트 여부 등)"""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "end": round(self.end, 6) if self.end is not None else None,
+            "duration_ms": round((self.end - self.start) * 1000, 2) if self.end is not None else None,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """요청 하나의 span 모음"""
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.spans: List[Span] = []
+        self.exported = False
+
+    def to_dict(self, root: Span) -> dict:
+        return {
+            "request_id": self.request_id,
+            "name": root.name,
+            "start": round(root.start, 6),
+            "duration_ms": round((root.end - root.start) * 1000, 2),
+            "status": root.status,
+            "spans": [span.to_dict() for span in sorted(self.spans, key=lambda span: span.start)],
+        }
+
+
+class TraceExporter:
+    """
+    끝난 트레이스를 JSONL 파일에 한 줄씩 기록 (RotatingFileHandler, 별도 스레드에서 쓰기)
+    최근 트레이스는 메모리에도 보관해 GET /traces/{request_id}에 바로 응답
+    """
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int, recent_traces: int = 200):
+        self.path = path
+        self.backup_count = backup_count
+        self.recent_traces = recent_traces
+        self._recent: "OrderedDict[str, dict]" = OrderedDict()
+        self._recent_lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+
+        trace_queue: queue.Queue = queue.Queue(-1)
+        self._listener = logging.handlers.QueueListener(trace_queue, file_handler)
+        self._listener.start()
+
+        self._logger = logging.getLogger(f"recipflash.traces.{id(self)}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(logging.handlers.QueueHandler(trace_queue))
+        self._logger.propagate = False
+
+    def export(self, trace: dict) -> None:
+        with self._recent_lock:
+            self._recent[trace["request_id"]] = trace
+            while len(self._recent) > self.recent_traces:
+                self._recent.popitem(last=False)
+        self._logger.info(json.dumps(trace, ensure_ascii=False))
+
+    def get(self, request_id: str) -> Optional[dict]:
+        """메모리에 없으면 트레이스 파일(로테이션된 파일 포함)을 최신 것부터 검색 (블로킹, to_thread로 호출)"""
+        with self._recent_lock:
+            trace = self._recent.get(request_id)
+        if trace is not None:
+            return trace
+
+        paths = [self.path] + [f"{self.path}.{i}" for i in range(1, self.backup_count + 1)]
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in reversed(f.readlines()):
+                    if request_id not in line:
+                        continue
+                    trace = json.loads(line)
+                    if trace.get("request_id") == request_id:
+                        return trace
+        return None
+
+    def close(self) -> None:
+        self._listener.stop()
+
+
+_exporter: Optional[TraceExporter] = None
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_request_id", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("trace_current_span", default=None)
+
+
+def set_trace_exporter(exporter: Optional[TraceExporter]) -> None:
+    global _exporter
+    _exporter = exporter
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+def set_request_id(request_id: str) -> None:
+    _request_id.set(request_id)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def start_trace(name: str, **attributes):
+    """
+    요청의 루트 span 시작 (request ID가 없으면 새로 발급)
+    블록이 끝나면 트레이스 전체를 내보냄
+    """
+    request_id = current_request_id()
+    if request_id is None:
+        request_id = new_request_id()
+        set_request_id(request_id)
+
+    trace = Trace(request_id)
+    root = Span(trace, name, None, attributes)
+    trace.spans.append(root)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException:
+        root.status = "error"
+        raise
+    finally:
+        root.end = time.time()
+        _reset_current_span(token, None)
+        trace.exported = True
+        if _exporter is not None:
+            _exporter.export(trace.to_dict(root))
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """현재 span의 자식 span 기록 (활성 트레이스가 없으면 기록하지 않는 span 반환)"""
+    parent = _current_span.get()
+    trace = parent.trace if parent is not None else None
+    if trace is None or trace.exported:
+        yield Span(None, name, None, attributes)
+        return
+
+    child = Span(trace, name, parent.span_id, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.status = "error"
+        child.attributes.setdefault("error", str(e) or type(e).__name__)
+        raise
+    finally:
+        child.end = time.time()
+        _reset_current_span(token, parent)
+        if not trace.exported:
+            trace.spans.append(child)
+
+
+def traced(name: Optional[str] = None):
+    """비동기 함수 호출 전체를 span으로 기록하는 데코레이터 (이름 기본값: 함수 이름)"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(name or func.__name__):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _reset_current_span(token: contextvars.Token, parent: Optional[Span]) -> None:
+    # 비동기 제너레이터가 다른 컨텍스트에서 재개되면 토큰으로 되돌릴 수 없으므로 부모 span을 직접 설정
+    try:
+        _current_span.reset(token)
+    except ValueError:
+        _current_span.set(parent)
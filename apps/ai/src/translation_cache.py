@@ -0,0 +1,183 @@
+"""
+번역 결과 캐시
+
+"Espresso shot", "Vanilla syrup 2P" 같은 문자열은 업로드마다 반복해서 번역되므로,
+정규화된 원문 + 모델 이름을 키로 번역 결과를 저장해 LLM 호출을 건너뜁니다.
+- 1차: 프로세스 내 LRU
+- 2차: 로컬 SQLite (서버 재시작 후에도 유지)
+
+요청별 히트율은 contextvars로 추적합니다 (asyncio.gather로 만든 태스크도 같은 통계 객체를 공유).
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_source_text(text: str) -> str:
+    """전각/반각, 공백, 대소문자 차이를 없애 같은 문자열이 같은 키가 되도록 정규화"""
+    text = unicodedata.normalize("NFKC", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.casefold()
+
+
+class TranslationStats:
+    """요청 하나의 번역 캐시 히트/미스 집계"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return round(self.hits / total, 4) if total else 0.0
+
+    def to_dict(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": self.hit_ratio}
+
+
+_current_stats: contextvars.ContextVar[Optional[TranslationStats]] = contextvars.ContextVar(
+    "translation_stats", default=None
+)
+
+
+def start_request_stats() -> TranslationStats:
+    """현재 요청(컨텍스트)에 새 통계 객체를 연결하고 반환"""
+    stats = TranslationStats()
+    _current_stats.set(stats)
+    return stats
+
+
+def current_request_stats() -> Optional[TranslationStats]:
+    return _current_stats.get()
+
+
+class TranslationCache:
+    def __init__(self, db_path: str, max_memory_entries: int):
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+
+        self._memory: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+        # SQLite 연결은 하나만 열고 to_thread에서 락으로 직렬화
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    # --- 공개 API ---
+    async def get(self, text: str, model: str) -> Optional[str]:
+        key = (model, normalize_source_text(text))
+
+        translated = self._memory.get(key)
+        if translated is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            self._record(hit=True)
+            return translated
+
+        try:
+            translated = await asyncio.to_thread(self._db_get, key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"[TRANSLATION-CACHE] SQLite read failed: {e}")
+            translated = None
+
+        if translated is None:
+            self.misses += 1
+            self._record(hit=False)
+            return None
+
+        self.db_hits += 1
+        self._record(hit=True)
+        self._memory_put(key, translated)
+        return translated
+
+    async def put(self, text: str, model: str, translated: str) -> None:
+        key = (model, normalize_source_text(text))
+        self._memory_put(key, translated)
+        try:
+            await asyncio.to_thread(self._db_put, key, translated)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"[TRANSLATION-CACHE] SQLite write failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        hits = self.memory_hits + self.db_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "errors": self.errors,
+        }
+
+    # --- 내부 구현 ---
+    def _record(self, hit: bool) -> None:
+        stats = _current_stats.get()
+        if stats is None:
+            return
+        if hit:
+            stats.hits += 1
+        else:
+            stats.misses += 1
+
+    def _memory_put(self, key: Tuple[str, str], translated: str) -> None:
+        self._memory[key] = translated
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS translations (
+                    model TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    translated TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (model, source)
+                )
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _db_get(self, key: Tuple[str, str]) -> Optional[str]:
+        with self._db_lock:
+            row = self._connection().execute(
+                "SELECT translated FROM translations WHERE model = ? AND source = ?", key
+            ).fetchone()
+        return row[0] if row else None
+
+    def _db_put(self, key: Tuple[str, str], translated: str) -> None:
+        with self._db_lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO translations (model, source, translated, created_at) VALUES (?, ?, ?, ?)",
+                (*key, translated, time.time()),
+            )
+            conn.commit()
@@ -0,0 +1,127 @@
+"""
+업로드 파일 디스크 스풀
+
+기존에는 엔드포인트마다 await file.read()로 업로드 전체를 bytes 하나로 읽은 뒤 요청이 끝날 때까지 들고 다니며
+PDF 임시 파일 쓰기 / PIL 디코딩에 다시 복사했으므로, 50MB PDF 몇 개가 동시에 들어오면 워커가 OOM에 가까워졌습니다.
+
+업로드는 청크 단위로 스풀 파일에 쓰면서 SHA-256(결과 캐시 키)을 같이 계산하고, 이후 단계(pdftoppm, pdftotext,
+PIL)는 파일 경로로 읽으므로 요청당 메모리는 업로드 크기와 거의 무관합니다.
+
+- 최대 크기를 넘으면 쓰기를 멈추고 UploadTooLargeError (엔드포인트에서 413으로 변환)
+- 이미 디스크에 있는 파일(작업 저장소 등)은 open_upload()로 열며 해시는 mmap으로 계산 (파일 전체를 읽어 복사하지 않음)
+- 스풀 파일은 참조 카운트로 관리: 요청과 공유 작업(single_flight) 중 마지막으로 끝나는 쪽이 삭제
+"""
+
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+from typing import AsyncIterator, Awaitable, Optional
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds the maximum size of {max_bytes / (1024 * 1024):.0f}MB")
+        self.max_bytes = max_bytes
+
+
+class SpooledUpload:
+    """디스크에 저장된 업로드 파일 (경로, 크기, SHA-256)"""
+
+    def __init__(self, path: str, size: int, sha256: str, delete: bool = True):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.delete = delete
+        self._refs = 1
+
+    def retain(self) -> "SpooledUpload":
+        self._refs += 1
+        return self
+
+    def release(self) -> None:
+        """참조를 하나 놓고, 마지막 참조였으면 파일 삭제"""
+        self._refs -= 1
+        if self._refs == 0 and self.delete:
+            _remove(self.path)
+
+    def hold(self, awaitable: Awaitable) -> Awaitable:
+        """awaitable이 끝날 때까지 파일 유지 (요청이 먼저 끝나도 공유 작업은 파일을 계속 사용)"""
+        self.retain()
+        return self._hold(awaitable)
+
+    async def hold_stream(self, events: AsyncIterator) -> AsyncIterator:
+        """이벤트 스트림이 끝날 때까지 파일 유지"""
+        self.retain()
+        try:
+            async for event in events:
+                yield event
+        finally:
+            self.release()
+
+    async def _hold(self, awaitable: Awaitable):
+        try:
+            return await awaitable
+        finally:
+            self.release()
+
+
+async def spool_upload(file, spool_dir: Optional[str], max_bytes: int, chunk_size: int = CHUNK_SIZE) -> SpooledUpload:
+    """
+    UploadFile을 청크 단위로 스풀 파일에 쓰고 SHA-256 계산 (spool_dir가 비어 있으면 시스템 임시 디렉터리)
+    max_bytes(0이면 제한 없음)를 넘으면 지금까지 쓴 파일을 지우고 UploadTooLargeError
+    """
+    if spool_dir:
+        await asyncio.to_thread(os.makedirs, spool_dir, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="upload-", dir=spool_dir or None)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                await asyncio.to_thread(_write_chunk, f, digest, chunk)
+    except BaseException:
+        _remove(path)
+        raise
+    return SpooledUpload(path, size, digest.hexdigest())
+
+
+async def open_upload(path: str, delete: bool = False) -> SpooledUpload:
+    """이미 디스크에 있는 파일을 SpooledUpload로 열기 (기본값: 다 써도 파일을 지우지 않음)"""
+    size, sha256 = await asyncio.to_thread(_hash_file, path)
+    return SpooledUpload(path, size, sha256, delete=delete)
+
+
+def _write_chunk(f, digest, chunk: bytes) -> None:
+    f.write(chunk)
+    digest.update(chunk)
+
+
+def _hash_file(path: str) -> tuple[int, str]:
+    size = os.path.getsize(path)
+    digest = hashlib.sha256()
+    if size:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            digest.update(mapped)
+    return size, digest.hexdigest()
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass  # 작업 저장소로 옮겨진 파일 등
+    except OSError as e:
+        logger.warning(f"[UPLOAD] Failed to remove spool file {path}: {e}")
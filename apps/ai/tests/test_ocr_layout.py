@@ -0,0 +1,42 @@
+"""
+ocr_layout 회귀 테스트
+
+실행: cd apps/ai && python -m pytest tests
+"""
+
+from PIL import Image, ImageDraw
+
+from src.image_preprocess import estimate_text_height
+from src.ocr_layout import _allocate, plan_tiles
+
+
+def _menu_page() -> Image.Image:
+    """한 줄짜리 문단 세 개 아래에 빽빽한 두 단 블록이 있는 페이지 (글자 줄은 검은 막대로 흉내)"""
+    image = Image.new("L", (1600, 2400), 255)
+    draw = ImageDraw.Draw(image)
+    top = 80
+    for _ in range(3):
+        draw.rectangle((100, top, 900, top + 24), fill=0)
+        top += 160
+    for line in range(40):
+        y = top + line * 44
+        draw.rectangle((100, y, 700, y + 24), fill=0)
+        draw.rectangle((900, y, 1500, y + 24), fill=0)
+    return image
+
+
+def test_allocate_never_exceeds_budget():
+    assert _allocate([1, 1, 1, 97], 4) == [1, 1, 1, 1]
+    for areas in ([1, 1, 1, 97], [50, 50], [10, 20, 70], [5] * 8):
+        for budget in range(len(areas), 12):
+            shares = _allocate(areas, budget)
+            assert sum(shares) <= budget
+            assert min(shares) >= 1
+
+
+def test_plan_tiles_respects_max_tiles():
+    gray = _menu_page()
+    text_height = estimate_text_height(gray)
+    assert text_height
+    for max_tiles in range(1, 13):
+        assert len(plan_tiles(gray, max_tiles, text_height)) <= max_tiles
@@ -0,0 +1,52 @@
+"""
+page_packing 회귀 테스트
+
+실행: cd apps/ai && python -m pytest tests
+"""
+
+from src import page_packing
+from src.page_packing import attribute_chunk_results, pack_pages
+
+MODEL = "gpt-4o-mini"
+
+
+class _Menu:
+    def __init__(self, name: str, page=None):
+        self.name = name
+        self.page = page
+
+
+def test_all_triaged_pages_make_no_llm_calls():
+    # 선별 단계에서 비운 페이지(빈 페이지, 중복 페이지, 텍스트 부족)만 있는 문서: LLM 호출 단위가 하나도 없어야 함
+    texts = ["", "  \n", "", "\n\n"]
+    chunks = pack_pages(texts, MODEL, max_tokens=3000, small_page_tokens=500)
+    assert chunks == []
+    assert attribute_chunk_results(chunks, [], len(texts)) == [[], [], [], []]
+
+
+def test_triaged_pages_are_left_out_of_packed_chunks():
+    texts = ["", "아메리카노 샷 물", " ", "카페라떼 샷 우유", ""]
+    chunks = pack_pages(texts, MODEL, max_tokens=3000, small_page_tokens=500)
+    assert [chunk.pages for chunk in chunks] == [[1, 3]]
+    assert "=== PAGE 1 ===" not in chunks[0].text
+    assert "=== PAGE 2 ===" in chunks[0].text and "=== PAGE 4 ===" in chunks[0].text
+
+    per_page = attribute_chunk_results(chunks, [[_Menu("아메리카노", 2), _Menu("카페라떼", 4)]], len(texts))
+    assert [[menu.name for menu in menus] for menus in per_page] == [[], ["아메리카노"], [], ["카페라떼"], []]
+
+
+def test_tokenizer_load_failure_falls_back_to_byte_estimate(monkeypatch):
+    # tiktoken이 BPE 파일을 내려받지 못해도 (네트워크 없는 서버) 요청이 실패하지 않아야 함
+    class _OfflineTiktoken:
+        @staticmethod
+        def encoding_for_model(model):
+            raise ConnectionError("Max retries exceeded ... cl100k_base.tiktoken")
+
+        @staticmethod
+        def get_encoding(name):
+            raise ConnectionError("Max retries exceeded ... cl100k_base.tiktoken")
+
+    monkeypatch.setattr(page_packing, "tiktoken", _OfflineTiktoken)
+    monkeypatch.setattr(page_packing, "_encodings", {})
+    assert page_packing.count_tokens("abcdef", "offline-model") == 2
+    assert [chunk.pages for chunk in pack_pages(["a", "b"], "offline-model", 3000, 500)] == [[0, 1]]